@@ -1,7 +1,16 @@
 """
 Meeting-to-Task Agent Module
 """
-from .agent import MeetingToTaskAgent
-from .schemas import AgentState, ActionItem, MeetingOutput
 
-__all__ = ['MeetingToTaskAgent', 'AgentState', 'ActionItem', 'MeetingOutput']
\ No newline at end of file
+__all__ = ['MeetingToTaskAgent', 'AgentState', 'ActionItem', 'MeetingOutput']
+
+
+def __getattr__(name):
+    # Lazy exports: importing a submodule (e.g. .tools) must not build LangGraph / LLM dependencies
+    if name == 'MeetingToTaskAgent':
+        from .agent import MeetingToTaskAgent
+        return MeetingToTaskAgent
+    if name in ('AgentState', 'ActionItem', 'MeetingOutput'):
+        from . import schemas
+        return getattr(schemas, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
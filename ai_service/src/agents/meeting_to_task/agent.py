@@ -3,6 +3,7 @@ import json
 import warnings
 from typing import List, Optional
 import os # Ensure os is imported as it is used
+import threading
 from pathlib import Path
 
 # from dotenv import load_dotenv
@@ -25,13 +26,17 @@ from .tools import (
     create_tasks, 
     send_notification
 )
-from ...models.models import call_llm
+from ...models.models import get_llm
 
 logger = logging.getLogger(__name__)
 
 # Global memory checkpointer to persist state across instances (requests)
 _memory_store = MemorySaver()
 
+# Compiled agent shared by all requests (see get_meeting_agent)
+_meeting_agent: Optional["MeetingToTaskAgent"] = None
+_meeting_agent_lock = threading.Lock()
+
 class MeetingToTaskAgent:
     """
     Agent xử lý meeting recordings và tạo tasks tự động
@@ -44,12 +49,15 @@ class MeetingToTaskAgent:
         Args:
             provider_name: Tên provider LLM để sử dụng
         """
-        self.model = call_llm(
+        self.model = get_llm(
             model_provider='gemini',
             model_name='gemini-2.5-flash',
             temperature=0.3,
             top_p=0.7,
         )
+        # Structured-output runnables are built once, not on every node call
+        self.meeting_llm = self.model.with_structured_output(MeetingOutput)
+        self.reflection_llm = self.model.with_structured_output(ReflectionOutput)
         self.memory = _memory_store # Use global instance
         self.graph = self._build_graph()
     
@@ -133,7 +141,7 @@ class MeetingToTaskAgent:
             ))
         ]
         
-        response = self.model.with_structured_output(MeetingOutput).invoke(messages)
+        response = self.meeting_llm.invoke(messages)
         
         if response is None:
             raise ValueError("LLM failed to generate structured output for meeting analysis")
@@ -168,7 +176,7 @@ class MeetingToTaskAgent:
             ))
         ]
         
-        response = self.model.with_structured_output(ReflectionOutput).invoke(messages)
+        response = self.reflection_llm.invoke(messages)
         
         logger.info(f"  📝 Critique: {response.critique}")
         logger.info(f"  🎯 Decision: {response.decision}")
@@ -193,7 +201,7 @@ class MeetingToTaskAgent:
             ))
         ]
         
-        response = self.model.with_structured_output(MeetingOutput).invoke(messages)
+        response = self.meeting_llm.invoke(messages)
         
         refined_action_items = [item.model_dump() for item in response.action_items]
         revision_count = state.get('revision_count', 0) + 1
@@ -378,4 +386,17 @@ class MeetingToTaskAgent:
         from IPython.display import Image, display
         
         img = self.graph.get_graph().draw_mermaid_png()
-        return display(Image(img))
\ No newline at end of file
+        return display(Image(img))
+
+
+def get_meeting_agent() -> MeetingToTaskAgent:
+    """
+    Agent dùng chung cho mọi request: LLM client và graph chỉ được tạo / compile một lần.
+    Graph đã compile có thể chạy đồng thời cho nhiều thread_id khác nhau.
+    """
+    global _meeting_agent
+    if _meeting_agent is None:
+        with _meeting_agent_lock:
+            if _meeting_agent is None:
+                _meeting_agent = MeetingToTaskAgent()
+    return _meeting_agent
@@ -0,0 +1,164 @@
+"""
+Local speech-to-text engine (faster-whisper), the offline fallback when the Gemini quota runs out.
+
+- The model is loaded once per process (get_stt_engine) and shared by every meeting.
+- CTranslate2 runs up to WHISPER_NUM_WORKERS transcriptions in parallel on one model; the engine
+  feeds it through a thread-safe job queue with exactly that many worker threads, so any number of
+  meetings / chunks can submit work without oversubscribing the CPU.
+- WHISPER_CPU_THREADS (0 = auto) threads per worker, so workers x threads ~= cores.
+- VAD filtering (Silero, built into faster-whisper) skips silence; WHISPER_BATCHED uses
+  BatchedInferencePipeline, which decodes several VAD segments of a chunk in one batch.
+"""
+
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, List
+
+import numpy as np
+
+from src.core.logging import logger
+
+WHISPER_MODEL_SIZE = os.getenv("WHISPER_MODEL_SIZE", "base")
+WHISPER_DEVICE = os.getenv("WHISPER_DEVICE", "cpu")
+WHISPER_COMPUTE_TYPE = os.getenv("WHISPER_COMPUTE_TYPE", "int8")
+WHISPER_NUM_WORKERS = int(os.getenv("WHISPER_NUM_WORKERS", "2"))
+WHISPER_CPU_THREADS = int(os.getenv("WHISPER_CPU_THREADS", "0"))  # 0 = cores / workers
+WHISPER_LANGUAGE = os.getenv("WHISPER_LANGUAGE", "vi")
+WHISPER_BEAM_SIZE = int(os.getenv("WHISPER_BEAM_SIZE", "3"))
+WHISPER_VAD_FILTER = os.getenv("WHISPER_VAD_FILTER", "true").lower() == "true"
+WHISPER_VAD_MIN_SILENCE_MS = int(os.getenv("WHISPER_VAD_MIN_SILENCE_MS", "500"))
+WHISPER_BATCHED = os.getenv("WHISPER_BATCHED", "false").lower() == "true"
+WHISPER_BATCH_SIZE = int(os.getenv("WHISPER_BATCH_SIZE", "8"))
+# Load the model during application warm-up instead of on the first offline transcription
+WHISPER_PRELOAD = os.getenv("WHISPER_PRELOAD", "false").lower() == "true"
+
+SAMPLE_RATE = 16000
+
+
+@dataclass
+class STTSegment:
+    start: float
+    end: float
+    text: str
+
+
+def pcm16_to_float32(data: bytes) -> np.ndarray:
+    """16-bit little-endian PCM (the live meeting stream format) -> float32 [-1, 1] samples."""
+    usable = len(data) // 2 * 2
+    return np.frombuffer(data[:usable], dtype="<i2").astype(np.float32) / 32768.0
+
+
+class LocalSTTEngine:
+    def __init__(self, model_size: str = WHISPER_MODEL_SIZE, device: str = WHISPER_DEVICE,
+                 compute_type: str = WHISPER_COMPUTE_TYPE, num_workers: int = WHISPER_NUM_WORKERS,
+                 cpu_threads: int = WHISPER_CPU_THREADS, batched: bool = WHISPER_BATCHED):
+        self.model_size = model_size
+        self.device = device
+        self.compute_type = compute_type
+        self.num_workers = max(1, num_workers)
+        self.cpu_threads = cpu_threads or max(1, (os.cpu_count() or 1) // self.num_workers)
+        self.batched = batched
+
+        self._model = None
+        self._pipeline = None
+        self._load_lock = threading.Lock()
+        # Job queue: the executor's internal queue is thread-safe; one thread per CTranslate2 worker
+        self._executor = ThreadPoolExecutor(max_workers=self.num_workers, thread_name_prefix="whisper")
+        self._stats_lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._completed = 0
+
+    def _load(self):
+        if self._model is None:
+            with self._load_lock:
+                if self._model is None:
+                    from faster_whisper import WhisperModel
+
+                    logger.info(f"🔊 Loading faster-whisper '{self.model_size}' ({self.device}/{self.compute_type}, "
+                                f"{self.num_workers} workers x {self.cpu_threads} threads)")
+                    model = WhisperModel(
+                        self.model_size,
+                        device=self.device,
+                        compute_type=self.compute_type,
+                        cpu_threads=self.cpu_threads,
+                        num_workers=self.num_workers,
+                    )
+                    if self.batched:
+                        try:
+                            from faster_whisper import BatchedInferencePipeline
+                            self._pipeline = BatchedInferencePipeline(model=model)
+                        except ImportError:
+                            logger.warning("BatchedInferencePipeline needs faster-whisper >= 1.1, using sequential decoding")
+                    self._model = model
+        return self._model
+
+    def warm_up(self):
+        """Load the model now instead of on the first meeting."""
+        self._load()
+
+    def _run(self, samples: np.ndarray, language: str, beam_size: int) -> List[STTSegment]:
+        with self._stats_lock:
+            self._queued -= 1
+            self._running += 1
+        try:
+            model = self._load()
+            options: Dict[str, Any] = {"language": language, "beam_size": beam_size}
+            if self._pipeline is not None:
+                # The batched pipeline always segments with VAD
+                segments, _ = self._pipeline.transcribe(samples, batch_size=WHISPER_BATCH_SIZE, **options)
+            else:
+                if WHISPER_VAD_FILTER:
+                    options["vad_filter"] = True
+                    options["vad_parameters"] = {"min_silence_duration_ms": WHISPER_VAD_MIN_SILENCE_MS}
+                segments, _ = model.transcribe(samples, **options)
+            # segments is a lazy generator: decode here, inside the worker
+            return [STTSegment(start=s.start, end=s.end, text=s.text.strip()) for s in segments]
+        finally:
+            with self._stats_lock:
+                self._running -= 1
+                self._completed += 1
+
+    def submit(self, samples: np.ndarray, language: str = WHISPER_LANGUAGE,
+               beam_size: int = WHISPER_BEAM_SIZE) -> Future:
+        """Queue 16 kHz mono float32 samples for transcription."""
+        with self._stats_lock:
+            self._queued += 1
+        return self._executor.submit(self._run, samples, language, beam_size)
+
+    def transcribe(self, samples: np.ndarray, language: str = WHISPER_LANGUAGE,
+                   beam_size: int = WHISPER_BEAM_SIZE) -> List[STTSegment]:
+        """Blocking version of submit()."""
+        return self.submit(samples, language, beam_size).result()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            return {
+                "model": self.model_size,
+                "loaded": self._model is not None,
+                "batched": self._pipeline is not None,
+                "workers": self.num_workers,
+                "cpu_threads": self.cpu_threads,
+                "queued": self._queued,
+                "running": self._running,
+                "completed": self._completed,
+            }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+_engine: "LocalSTTEngine | None" = None
+_engine_lock = threading.Lock()
+
+
+def get_stt_engine() -> LocalSTTEngine:
+    """Process-wide engine (the model is loaded on first transcription or warm_up())."""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = LocalSTTEngine()
+    return _engine
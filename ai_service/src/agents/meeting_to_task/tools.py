@@ -3,14 +3,12 @@ Tools for Meeting-to-Task Agent
 """
 from typing import Dict, List, Optional
 from datetime import datetime
-import time
 import smtplib
 import os  # Added missing import
 import requests
-from google import genai
-from google.genai import types
-from faster_whisper import WhisperModel
 from email.mime.text import MIMEText
+# google-genai and faster_whisper are imported where they are used: they are slow to import and
+# only needed by the selected transcription provider
 
 from src.core.config import settings
 
@@ -18,9 +16,15 @@ from src.core.config import settings
 from src.core.context import get_request_token
 
 from src.core.logging import logger
-
-# Cache
-_stt_model_cache = {}
+from .stt_engine import WHISPER_MODEL_SIZE, get_stt_engine
+from .transcript_cache import TRANSCRIPT_CACHE_ENABLED, hash_audio_file, transcript_cache
+from .transcription import (
+    GEMINI_TRANSCRIBE_MODEL,
+    Transcriber,
+    gemini_transcriber,
+    transcribe_chunked,
+    whisper_transcriber,
+)
 
 
 def _get_auth_headers() -> dict:
@@ -36,9 +40,12 @@ def _get_auth_headers() -> dict:
         
     return headers
 
-def transcribe_audio(audio_file_path: str, use_mock: bool = False, provider: str = 'gemini') -> str:
+def transcribe_audio(audio_file_path: str, use_mock: bool = False, provider: str = 'gemini',
+                     transcriber: Optional[Transcriber] = None) -> str:
     """
     Convert audio file to text.
+    Long recordings are split on silence and transcribed in parallel chunks (see transcription.py).
+    `transcriber` overrides the provider (e.g. a stub in offline tests).
     """
     try:
         # NOTE: Mock logic preserved for dev/demo purposes but defaulted to False
@@ -50,71 +57,35 @@ def transcribe_audio(audio_file_path: str, use_mock: bool = False, provider: str
              # Just a fallback check if it's a local path
              pass 
         
-        cache_key = f"{provider}:{audio_file_path}"
-        if cache_key in _stt_model_cache:
-            return _stt_model_cache[cache_key]
-        
-        transcript = ""
+        # Persistent cache keyed by the audio content (not the path) + provider + model.
+        # A custom transcriber has no stable identity, so it always runs.
+        cache_key = None
+        if transcriber is None and TRANSCRIPT_CACHE_ENABLED and os.path.isfile(audio_file_path):
+            model = WHISPER_MODEL_SIZE if provider == "faster-whisper" else GEMINI_TRANSCRIBE_MODEL
+            audio_hash = hash_audio_file(audio_file_path)
+            cache_key = transcript_cache.make_key(audio_hash, provider, model)
+            cached = transcript_cache.get(cache_key)
+            if cached is not None:
+                logger.info(f"  ♻️ Transcript cache hit ({provider}/{model}, audio {audio_hash[:12]})")
+                return cached
         
-        if provider == "faster-whisper":
-            model = WhisperModel("base", device="cpu", compute_type="int8")
-            segments, _ = model.transcribe(audio_file_path, language="vi", beam_size=3)
-            transcript = " ".join([segment.text for segment in segments])
-            
-        elif provider == "gemini":
-            if not settings.google_key:
-                raise ValueError("Missing Google API Key in settings")
-                
-            # --- NEW SDK MIGRATION (google-genai) ---
-            # Create a client instance instead of global configuration
-            client = genai.Client(api_key=settings.google_key)
-            
-            # Use 'files' service for upload (formerly genai.upload_file)
-            # Depending on version, this might be client.files.upload or similar
-            # Checking standard new pattern:
-            
-            logger.info(f"🚀 [Gemini] Uploading file: {audio_file_path}")
-            # Correcting argument name from 'path' to 'file'
-            upload_result = client.files.upload(file=audio_file_path)
-            
-            # Wait for processing (New SDK usually handles this or needs manual loop)
-            # Assuming 'upload_result' has 'name' and we can poll 'get'
-            file_name = upload_result.name
-            
-            while True:
-                # Retrieve file status
-                retrieved_file = client.files.get(name=file_name)
-                state = retrieved_file.state.name # e.g. "PROCESSING", "ACTIVE"
-                
-                if state == "ACTIVE":
-                    break
-                elif state == "FAILED":
-                    raise Exception("File upload failed.")
-                    
-                time.sleep(2)
-            
-            logger.info(f"✅ [Gemini] File ready. Generating content...")
-            
-            # Generate Content using the Client
-            response = client.models.generate_content(
-                model='gemini-2.0-flash', # Updated to latest or keep 1.5/2.0
-                contents=[
-                    types.Content(
-                        parts=[
-                            types.Part.from_text(text="Tạo bản ghi chép cuộc họp chính xác từng từ. Định dạng bắt buộc: [HH:MM:SS] Tên người nói: Nội dung hội thoại. Ngôn ngữ: Tiếng Việt."),
-                            types.Part.from_uri(
-                                file_uri=retrieved_file.uri,
-                                mime_type=retrieved_file.mime_type
-                            )
-                        ]
-                    )
-                ]
-            )
-            transcript = response.text
-        else:
-            raise ValueError(f"Unsupported provider: {provider}")
+        if transcriber is None:
+            if provider == "faster-whisper":
+                transcriber = whisper_transcriber(get_stt_engine())
+            elif provider == "gemini":
+                if not settings.google_key:
+                    raise ValueError("Missing Google API Key in settings")
+                transcriber = gemini_transcriber(settings.google_key)
+            else:
+                raise ValueError(f"Unsupported provider: {provider}")
+
+        transcript = transcribe_chunked(audio_file_path, transcriber)
         
-        _stt_model_cache[cache_key] = transcript
+        if cache_key is not None and transcript:
+            try:
+                transcript_cache.put(cache_key, transcript, provider=provider, audio_sha256=audio_hash, model=model)
+            except OSError as e:
+                logger.warning(f"⚠️ Could not store transcript in cache: {e}")
         return transcript
         
     except Exception as e:
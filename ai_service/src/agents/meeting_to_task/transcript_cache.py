@@ -0,0 +1,119 @@
+"""
+Persistent, content-addressed transcript cache.
+
+Key = sha256(audio bytes) + STT provider + model, so:
+- a recording re-uploaded to the same path with new content is a miss (no stale transcript);
+- the same audio under another path / meeting is a hit;
+- every AI-service worker (and restarts) sharing TRANSCRIPT_CACHE_DIR shares the cache.
+
+Entries are JSON files written atomically (temp file + os.replace). A hit refreshes the file mtime,
+and when the directory grows past TRANSCRIPT_CACHE_MAX_BYTES the least recently used entries are
+deleted down to 90% of the limit.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+from src.core.logging import logger
+
+TRANSCRIPT_CACHE_DIR = os.getenv("TRANSCRIPT_CACHE_DIR", os.path.join("data", "transcript_cache"))
+TRANSCRIPT_CACHE_MAX_BYTES = int(os.getenv("TRANSCRIPT_CACHE_MAX_BYTES", str(500 * 1024 * 1024)))
+TRANSCRIPT_CACHE_ENABLED = os.getenv("TRANSCRIPT_CACHE_ENABLED", "true").lower() == "true"
+
+_HASH_BLOCK = 1024 * 1024
+
+
+def hash_audio_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(_HASH_BLOCK), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class TranscriptCache:
+    def __init__(self, directory: str = TRANSCRIPT_CACHE_DIR, max_bytes: int = TRANSCRIPT_CACHE_MAX_BYTES):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._evict_lock = threading.Lock()
+
+    def make_key(self, audio_hash: str, provider: str, model: str) -> str:
+        return hashlib.sha256(f"{audio_hash}|{provider}|{model}".encode()).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> Optional[str]:
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️ Unreadable transcript cache entry {path.name}: {e}")
+            return None
+        try:
+            os.utime(path)  # LRU: a hit makes the entry recent
+        except OSError:
+            pass
+        return entry.get("transcript")
+
+    def put(self, key: str, transcript: str, **metadata):
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        entry = {"transcript": transcript, "created_at": time.time(), **metadata}
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=".tmp-", suffix=".json")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+        self.evict()
+
+    def evict(self):
+        """Delete least recently used entries while the cache is over max_bytes."""
+        if not self._evict_lock.acquire(blocking=False):
+            return  # another thread is already evicting
+        try:
+            entries = []
+            total = 0
+            for path in self.directory.glob("*/*.json"):
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue  # removed by another worker
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+            if total <= self.max_bytes:
+                return
+
+            target = int(self.max_bytes * 0.9)
+            entries.sort()
+            removed = 0
+            for _, size, path in entries:
+                if total <= target:
+                    break
+                try:
+                    path.unlink()
+                except FileNotFoundError:
+                    pass
+                total -= size
+                removed += 1
+            logger.info(f"🧹 Transcript cache evicted {removed} entries ({total} bytes left)")
+        finally:
+            self._evict_lock.release()
+
+
+transcript_cache = TranscriptCache()
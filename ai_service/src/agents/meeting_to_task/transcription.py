@@ -0,0 +1,368 @@
+"""
+Chunked, parallel transcription for long meeting recordings.
+
+Pipeline:
+1. Decode the recording incrementally to 16 kHz mono float32 blocks (PyAV, the decoder behind
+   faster_whisper.decode_audio, imported directly so the Gemini path never loads faster_whisper).
+2. Split on silence while decoding: every ~TRANSCRIBE_CHUNK_SECONDS the cut is moved to the quietest
+   TRANSCRIBE_SILENCE_FRAME_MS frame window nearby (frame RMS energy), so words are not cut.
+   Each chunk is padded with TRANSCRIBE_OVERLAP_SECONDS of audio on both sides. Only the audio up to
+   the next cut is buffered, never the whole recording.
+3. Transcribe chunks concurrently (bounded thread pool, TRANSCRIBE_MAX_WORKERS) with an injectable
+   transcriber: Gemini (inline WAV bytes, no upload / polling), faster-whisper, or any callable.
+   At most TRANSCRIBE_MAX_WORKERS chunks are in flight; decoding waits for a free worker, and a
+   chunk's samples are released once it is transcribed.
+4. Stitch: segment times are shifted by the chunk start; each chunk only keeps segments starting in
+   the part it owns (between its cut points), so the overlap is not duplicated; an identical line
+   repeated across the boundary is dropped as well.
+
+Output format (same as before): one "[HH:MM:SS] Speaker: text" line per segment.
+"""
+
+import io
+import os
+import re
+import wave
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Iterable, Iterator, List, Optional
+
+import numpy as np
+
+from src.core.logging import logger
+
+SAMPLE_RATE = 16000
+
+TRANSCRIBE_CHUNK_SECONDS = float(os.getenv("TRANSCRIBE_CHUNK_SECONDS", "300"))
+# How far (seconds) around the target cut we look for silence
+TRANSCRIBE_SPLIT_SEARCH_SECONDS = float(os.getenv("TRANSCRIBE_SPLIT_SEARCH_SECONDS", "30"))
+TRANSCRIBE_OVERLAP_SECONDS = float(os.getenv("TRANSCRIBE_OVERLAP_SECONDS", "2"))
+TRANSCRIBE_SILENCE_FRAME_MS = int(os.getenv("TRANSCRIBE_SILENCE_FRAME_MS", "300"))
+TRANSCRIBE_MAX_WORKERS = int(os.getenv("TRANSCRIBE_MAX_WORKERS", "4"))
+# Decoded audio is handed to the splitter in blocks of this many seconds
+TRANSCRIBE_DECODE_BLOCK_SECONDS = float(os.getenv("TRANSCRIBE_DECODE_BLOCK_SECONDS", "30"))
+
+DEFAULT_SPEAKER = "Người nói"
+
+GEMINI_TRANSCRIBE_MODEL = os.getenv("GEMINI_TRANSCRIBE_MODEL", "gemini-2.0-flash")
+GEMINI_CHUNK_PROMPT = (
+    "Tạo bản ghi chép cuộc họp chính xác từng từ. "
+    "Định dạng bắt buộc: [HH:MM:SS] Tên người nói: Nội dung hội thoại. "
+    "Thời gian tính từ đầu đoạn âm thanh này (bắt đầu từ 00:00:00). Ngôn ngữ: Tiếng Việt."
+)
+
+
+@dataclass
+class AudioChunk:
+    index: int
+    start: float       # seconds, including the leading overlap
+    end: float         # seconds, including the trailing overlap
+    own_start: float   # segments starting in [own_start, own_end) belong to this chunk
+    own_end: float
+    samples: np.ndarray
+
+
+@dataclass
+class TranscriptSegment:
+    start: float       # seconds from the beginning of the chunk (absolute after stitching)
+    text: str
+    speaker: Optional[str] = None
+
+
+# A transcriber turns one chunk into segments timed relative to the chunk start
+Transcriber = Callable[[AudioChunk], List[TranscriptSegment]]
+
+
+# ==================== AUDIO ====================
+
+def iter_audio(audio_file_path: str, sample_rate: int = SAMPLE_RATE,
+               block_seconds: float = TRANSCRIBE_DECODE_BLOCK_SECONDS) -> Iterator[np.ndarray]:
+    """Decode a recording to mono float32 at sample_rate, yielding ~block_seconds blocks as it goes."""
+    import av
+
+    block = max(int(block_seconds * sample_rate), 1)
+    resampler = av.audio.resampler.AudioResampler(format="s16", layout="mono", rate=sample_rate)
+    pending: List[np.ndarray] = []
+    pending_len = 0
+
+    with av.open(audio_file_path, mode="r", metadata_errors="ignore") as container:
+        def decoded():
+            frames = container.decode(audio=0)
+            while True:
+                try:
+                    yield next(frames)
+                except StopIteration:
+                    return
+                except av.error.InvalidDataError:
+                    continue  # skip corrupt frames instead of failing the whole recording
+
+        def resampled():
+            for frame in decoded():
+                frame.pts = None  # the resampler keeps its own timing (as in faster_whisper.decode_audio)
+                yield from resampler.resample(frame)
+            yield from resampler.resample(None)  # flush
+
+        for frame in resampled():
+            samples = frame.to_ndarray().reshape(-1)
+            pending.append(samples)
+            pending_len += len(samples)
+            if pending_len >= block:
+                yield np.concatenate(pending).astype(np.float32) / 32768.0
+                pending, pending_len = [], 0
+
+    if pending:
+        yield np.concatenate(pending).astype(np.float32) / 32768.0
+
+
+def load_audio(audio_file_path: str) -> np.ndarray:
+    """Whole recording as one array; only for short clips (transcribe_chunked streams instead)."""
+    blocks = list(iter_audio(audio_file_path))
+    return np.concatenate(blocks) if blocks else np.zeros(0, dtype=np.float32)
+
+
+def to_wav_bytes(samples: np.ndarray, sample_rate: int = SAMPLE_RATE) -> bytes:
+    """float32 [-1, 1] mono samples -> 16-bit PCM WAV."""
+    pcm = (np.clip(samples, -1.0, 1.0) * 32767).astype("<i2")
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(pcm.tobytes())
+    return buffer.getvalue()
+
+
+def _frame_energy(samples: np.ndarray, frame: int) -> np.ndarray:
+    usable = len(samples) // frame * frame
+    frames = samples[:usable].reshape(-1, frame)
+    return np.sqrt(np.mean(frames.astype(np.float64) ** 2, axis=1))
+
+
+def _find_cut(buffer: np.ndarray, offset: int, position: int, total: int,
+              chunk: int, search: int, frame: int) -> int:
+    """
+    Absolute sample offset of the cut after `position`: the middle of a lowest-energy frame within
+    +-search of position + chunk (the one nearest to the target when several are equally quiet).
+    `buffer` holds the audio from absolute sample `offset` on; `total` is how far audio is known.
+    Frames are aligned to absolute offsets, so the cut does not depend on how the audio was buffered.
+    """
+    target = position + chunk
+    low = max(position + chunk // 2, target - search, offset + frame - 1) // frame
+    high = min(total, target + search) // frame
+    if high <= low:
+        return target
+
+    window = _frame_energy(buffer[low * frame - offset:high * frame - offset], frame)
+    # Among the (near-)quietest frames, take the one closest to the target
+    quiet = np.flatnonzero(window <= window.min() + 0.1 * (np.median(window) - window.min()))
+    best = quiet[np.argmin(np.abs(low + quiet - target // frame))]
+    return (low + int(best)) * frame + frame // 2
+
+
+def find_split_points(samples: np.ndarray, sample_rate: int = SAMPLE_RATE,
+                      chunk_seconds: float = TRANSCRIBE_CHUNK_SECONDS,
+                      search_seconds: float = TRANSCRIBE_SPLIT_SEARCH_SECONDS,
+                      frame_ms: int = TRANSCRIBE_SILENCE_FRAME_MS) -> List[int]:
+    """Sample offsets where in-memory audio is cut (excluding 0 and the end)."""
+    total = len(samples)
+    chunk = int(chunk_seconds * sample_rate)
+    frame = max(int(sample_rate * frame_ms / 1000), 1)
+    search = int(search_seconds * sample_rate)
+
+    cuts = []
+    position = 0
+    while total - position > chunk:
+        position = _find_cut(samples, 0, position, total, chunk, search, frame)
+        cuts.append(position)
+    return cuts
+
+
+def iter_chunks(blocks: Iterable[np.ndarray], sample_rate: int = SAMPLE_RATE,
+                chunk_seconds: float = TRANSCRIBE_CHUNK_SECONDS,
+                overlap_seconds: float = TRANSCRIBE_OVERLAP_SECONDS,
+                search_seconds: float = TRANSCRIBE_SPLIT_SEARCH_SECONDS,
+                frame_ms: int = TRANSCRIBE_SILENCE_FRAME_MS) -> Iterator[AudioChunk]:
+    """
+    Split a stream of sample blocks on silence into chunks padded with overlap_seconds on both sides.
+    A cut is placed as soon as the audio up to its search window (plus overlap) has arrived, and the
+    buffer is trimmed to the next chunk's leading overlap; cuts match find_split_points on the whole array.
+    """
+    chunk = int(chunk_seconds * sample_rate)
+    overlap = int(overlap_seconds * sample_rate)
+    search = int(search_seconds * sample_rate)
+    frame = max(int(sample_rate * frame_ms / 1000), 1)
+
+    buffer = np.zeros(0, dtype=np.float32)
+    offset = 0      # absolute sample index of buffer[0]
+    position = 0    # own_start of the chunk being built
+    index = 0
+
+    def make_chunk(own_end: int, total: int, last: bool) -> AudioChunk:
+        start = max(0, position - overlap)
+        end = min(total, own_end + overlap)
+        return AudioChunk(
+            index=index,
+            start=start / sample_rate,
+            end=end / sample_rate,
+            own_start=position / sample_rate,
+            own_end=float("inf") if last else own_end / sample_rate,
+            # Copy, so the chunk does not keep the decode buffer alive
+            samples=buffer[start - offset:end - offset].copy(),
+        )
+
+    def advance(cut: int):
+        nonlocal buffer, offset, position, index
+        index += 1
+        position = cut
+        drop = position - overlap - offset
+        if drop > 0:
+            buffer = buffer[drop:]
+            offset += drop
+
+    for block in blocks:
+        buffer = np.concatenate([buffer, block.astype(np.float32, copy=False)])
+        total = offset + len(buffer)
+        # Enough audio to place the cut with its full search window and the trailing overlap
+        while total - position > chunk + search + overlap:
+            cut = _find_cut(buffer, offset, position, total, chunk, search, frame)
+            yield make_chunk(cut, total, last=False)
+            advance(cut)
+
+    total = offset + len(buffer)
+    while total - position > chunk:
+        cut = _find_cut(buffer, offset, position, total, chunk, search, frame)
+        yield make_chunk(cut, total, last=False)
+        advance(cut)
+    yield make_chunk(total, total, last=True)
+
+
+def split_audio(samples: np.ndarray, sample_rate: int = SAMPLE_RATE,
+                chunk_seconds: float = TRANSCRIBE_CHUNK_SECONDS,
+                overlap_seconds: float = TRANSCRIBE_OVERLAP_SECONDS) -> List[AudioChunk]:
+    """Split in-memory audio on silence into chunks padded with overlap_seconds on both sides."""
+    return list(iter_chunks([samples], sample_rate, chunk_seconds, overlap_seconds))
+
+
+# ==================== TRANSCRIPT TEXT ====================
+
+_LINE_RE = re.compile(r"^\s*\[(\d{1,2}):(\d{2}):(\d{2})\]\s*(?:([^:\n]{1,100}?)\s*:\s*)?(.*)$")
+
+
+def parse_transcript(text: str) -> List[TranscriptSegment]:
+    """Parse "[HH:MM:SS] Speaker: text" lines; lines without a timestamp continue the previous segment."""
+    segments: List[TranscriptSegment] = []
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        match = _LINE_RE.match(line)
+        if match:
+            hours, minutes, seconds, speaker, content = match.groups()
+            segments.append(TranscriptSegment(
+                start=int(hours) * 3600 + int(minutes) * 60 + int(seconds),
+                text=content.strip(),
+                speaker=speaker.strip() if speaker else None,
+            ))
+        elif segments:
+            segments[-1].text = f"{segments[-1].text} {line.strip()}".strip()
+        else:
+            segments.append(TranscriptSegment(start=0.0, text=line.strip()))
+    return segments
+
+
+def format_timestamp(seconds: float) -> str:
+    seconds = int(max(seconds, 0))
+    return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+
+def format_transcript(segments: List[TranscriptSegment]) -> str:
+    return "\n".join(
+        f"[{format_timestamp(s.start)}] {s.speaker or DEFAULT_SPEAKER}: {s.text}" for s in segments if s.text
+    )
+
+
+def _same_text(a: str, b: str) -> bool:
+    return re.sub(r"\W+", " ", a).strip().lower() == re.sub(r"\W+", " ", b).strip().lower()
+
+
+def stitch_segments(chunks: List[AudioChunk], results: List[List[TranscriptSegment]]) -> List[TranscriptSegment]:
+    """Shift chunk-relative times to absolute ones and drop what the overlap transcribed twice."""
+    stitched: List[TranscriptSegment] = []
+    for chunk, segments in zip(chunks, results):
+        for segment in segments:
+            absolute = chunk.start + segment.start
+            if not (chunk.own_start <= absolute < chunk.own_end):
+                continue
+            if stitched and _same_text(stitched[-1].text, segment.text) and absolute - stitched[-1].start <= 2 * TRANSCRIBE_OVERLAP_SECONDS + 1:
+                continue
+            stitched.append(TranscriptSegment(start=absolute, text=segment.text, speaker=segment.speaker))
+    return stitched
+
+
+# ==================== TRANSCRIBERS ====================
+
+def gemini_transcriber(api_key: str, model: str = GEMINI_TRANSCRIBE_MODEL) -> Transcriber:
+    """Send each chunk inline as WAV bytes (a 5 minute 16 kHz chunk is ~10 MB, under the inline limit)."""
+    from google import genai
+    from google.genai import types
+
+    client = genai.Client(api_key=api_key)
+
+    def transcribe(chunk: AudioChunk) -> List[TranscriptSegment]:
+        response = client.models.generate_content(
+            model=model,
+            contents=[
+                types.Content(parts=[
+                    types.Part.from_text(text=GEMINI_CHUNK_PROMPT),
+                    types.Part.from_bytes(data=to_wav_bytes(chunk.samples), mime_type="audio/wav"),
+                ])
+            ],
+        )
+        return parse_transcript(response.text or "")
+
+    return transcribe
+
+
+def whisper_transcriber(engine) -> Transcriber:
+    """Local faster-whisper via the shared LocalSTTEngine (stt_engine.py); no speaker labels."""
+    def transcribe(chunk: AudioChunk) -> List[TranscriptSegment]:
+        return [TranscriptSegment(start=s.start, text=s.text) for s in engine.transcribe(chunk.samples)]
+
+    return transcribe
+
+
+# ==================== PIPELINE ====================
+
+def transcribe_chunked(audio: "str | np.ndarray", transcriber: Transcriber,
+                       max_workers: int = TRANSCRIBE_MAX_WORKERS,
+                       chunk_seconds: float = TRANSCRIBE_CHUNK_SECONDS,
+                       overlap_seconds: float = TRANSCRIBE_OVERLAP_SECONDS) -> str:
+    """
+    Transcribe a recording (file path or 16 kHz mono samples) chunk by chunk, in parallel.
+    A file is decoded while earlier chunks are being transcribed, with at most max_workers
+    chunks held in memory. Returns the stitched transcript text.
+    """
+    blocks = iter_audio(audio) if isinstance(audio, str) else [audio]
+    workers = max(1, max_workers)
+    chunks: List[AudioChunk] = []
+    results: List[List[TranscriptSegment]] = []
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="stt") as pool:
+        in_flight = deque()
+
+        def collect():
+            chunk, future = in_flight.popleft()
+            results.append(future.result())  # in chunk order; the first failing chunk raises here
+            chunk.samples = chunk.samples[:0]  # stitching only needs the chunk times
+            chunks.append(chunk)
+
+        for chunk in iter_chunks(blocks, SAMPLE_RATE, chunk_seconds, overlap_seconds):
+            in_flight.append((chunk, pool.submit(transcriber, chunk)))
+            if len(in_flight) >= workers:
+                collect()
+        while in_flight:
+            collect()
+
+    duration = max((chunk.end for chunk in chunks), default=0.0)
+    logger.info(f"🎧 Transcribed {duration:.0f}s of audio in {len(chunks)} chunk(s)")
+    return format_transcript(stitch_segments(chunks, results))
@@ -1,21 +1,33 @@
 
+import asyncio
 import json
 import logging
 from typing import TypedDict, Annotated, Literal, List, Optional
-import operator
 from pydantic import BaseModel, Field
 
 
 from langgraph.graph import StateGraph, END
-from langchain_core.messages import SystemMessage, HumanMessage, AIMessage, ToolMessage, AnyMessage
+from langgraph.graph.message import add_messages
+from langchain_core.messages import SystemMessage, HumanMessage, AIMessage, ToolMessage, AnyMessage, RemoveMessage
+from langchain_core.runnables import RunnableConfig
 
 # Relative imports
-from ...models.models import call_llm
+from ...models.models import get_llm
 
 from .api_tools import ALL_API_TOOLS
+from .intent import IntentClassifier
+from .semantic_cache import SemanticCache
+from .history import (
+    AGENT_CHECKPOINT_PRUNE_INTERVAL,
+    SUMMARY_PROMPT,
+    fallback_summary,
+    format_for_summary,
+    run_pruning_loop,
+    split_for_compaction,
+)
 import os
-from langgraph.checkpoint.postgres import PostgresSaver
-from psycopg_pool import ConnectionPool
+from langgraph.checkpoint.postgres.aio import AsyncPostgresSaver
+from psycopg_pool import AsyncConnectionPool
 
 
 
@@ -43,11 +55,20 @@ param_dict = {
         'temperature': 0.3,
         'top_p': 0.5,
     },
+    'summary_kwargs': { # history compaction
+        'model_provider': 'gemini',
+        'model_name': 'gemini-2.5-flash-lite',
+        'temperature': 0.2,
+        'top_p': 0.5,
+        'max_tokens': 400,
+    },
 }
 
 # --- SCHEMAS ---
 class AgentState(TypedDict):
-    messages: Annotated[list[AnyMessage], operator.add]
+    # add_messages (instead of operator.add) lets compact_history remove old messages with RemoveMessage
+    messages: Annotated[list[AnyMessage], add_messages]
+    summary: str # summary of the turns removed from messages
     query: str
     router_decision: str #"DIRECT" or "TOOL_CALL"
 
@@ -57,6 +78,12 @@ class RouterOutput(BaseModel):
         description="Quyết định phân luồng: 'TOOL_CALL' cho các yêu cầu cần gọi API/công cụ, 'DIRECT' cho hội thoại/trả lời trực tiếp."
     )
 
+# Checkpointer connection pool (shared by all concurrent chats; each checkpoint read/write is short)
+AGENT_DB_POOL_MIN_SIZE = int(os.getenv("AGENT_DB_POOL_MIN_SIZE", "1"))
+AGENT_DB_POOL_MAX_SIZE = int(os.getenv("AGENT_DB_POOL_MAX_SIZE", "20"))
+# Max tool calls of one model turn executed at the same time
+AGENT_TOOL_CONCURRENCY = int(os.getenv("AGENT_TOOL_CONCURRENCY", "4"))
+
 # --- AGENT CLASS ---
 class AgenticProjectManager:
     def __init__(self, tools: Optional[List] = None):
@@ -68,32 +95,72 @@ class AgenticProjectManager:
         """
         # self.current_user_id = current_user_id # Removed per refactor
         
-        self.llm_router = call_llm(**param_dict['router_kwargs'])
-        self.llm_direct = call_llm(**param_dict['direct_kwargs'])
-        self.llm_tool_call = call_llm(**param_dict['large_deterministic_kwargs'])
+        self.llm_router = get_llm(**param_dict['router_kwargs'])
+        self.llm_direct = get_llm(**param_dict['direct_kwargs'])
+        self.llm_tool_call = get_llm(**param_dict['large_deterministic_kwargs'])
+        self.llm_summary = get_llm(**param_dict['summary_kwargs'])
         
         # Use provided tools or fallback to ALL_API_TOOLS
         self.tools_list = tools if tools is not None else ALL_API_TOOLS
         self.tools = {t.name: t for t in self.tools_list}
         self.llm_tool_call = self.llm_tool_call.bind_tools(self.tools_list)
+
+        # Local intent classifier: answers the router without an LLM call when it is confident
+        self.intent_classifier = IntentClassifier()
+        # Near-duplicate DIRECT questions are answered from here instead of the LLM
+        self.semantic_cache = SemanticCache()
         
-        # Memory Checkpointer Setup
+        # Memory Checkpointer Setup (async, created in AgenticProjectManager.create)
         self.db_url = os.getenv("DATABASE_URL")
         if not self.db_url:
             logger.warning("DATABASE_URL not found. Memory persistence will effectively be disabled (or fail if graph requires it).")
-        
-        # Initialize the connection pool (basic setup)
-        # Note: In a production app, you might want to share this pool or manage it globally.
-        self.pool = ConnectionPool(conninfo=self.db_url, min_size=1, max_size=10, kwargs={"autocommit": True})
-        self.checkpointer = PostgresSaver(self.pool)
 
-        # Ensure tables exist (Blocking call on init)
-        self.checkpointer.setup()
+        self.pool: Optional[AsyncConnectionPool] = None
+        self.checkpointer: Optional[AsyncPostgresSaver] = None
+        self.graph = None
+        self._pruning_task: Optional[asyncio.Task] = None
 
-        self.graph = self.build_graph()
+    @classmethod
+    async def create(cls, tools: Optional[List] = None) -> "AgenticProjectManager":
+        """
+        Build the agent with an async Postgres checkpointer.
+        Opening the pool and creating the checkpoint tables are async, so they cannot live in __init__.
+        """
+        agent = cls(tools)
+        agent.pool = AsyncConnectionPool(
+            conninfo=agent.db_url,
+            min_size=AGENT_DB_POOL_MIN_SIZE,
+            max_size=AGENT_DB_POOL_MAX_SIZE,
+            kwargs={"autocommit": True, "prepare_threshold": 0},
+            open=False,
+        )
+        await agent.pool.open()
+        agent.checkpointer = AsyncPostgresSaver(agent.pool)
+
+        # Ensure tables exist
+        await agent.checkpointer.setup()
+
+        agent.graph = agent.build_graph()
+        if AGENT_CHECKPOINT_PRUNE_INTERVAL > 0:
+            agent._pruning_task = asyncio.create_task(run_pruning_loop(agent.pool))
+        return agent
+
+    async def aclose(self):
+        """Stop checkpoint pruning and close the checkpointer connection pool."""
+        if self._pruning_task is not None:
+            self._pruning_task.cancel()
+            try:
+                await self._pruning_task
+            except asyncio.CancelledError:
+                pass
+        if self.pool is not None:
+            await self.pool.close()
     
     def build_graph(self) -> StateGraph:
         builder = StateGraph(AgentState)
+
+        # Keeps the checkpointed history bounded
+        builder.add_node('compact_history', self.compact_history)
         
         # Intent classifier
         builder.add_node('router', self.router)
@@ -105,7 +172,8 @@ class AgenticProjectManager:
         # DIRECT nodes
         builder.add_node('direct_generator', self.direct_generator)
         
-        builder.set_entry_point('router')
+        builder.set_entry_point('compact_history')
+        builder.add_edge('compact_history', 'router')
         # Edges
         builder.add_conditional_edges(
             'router',
@@ -132,11 +200,49 @@ class AgenticProjectManager:
         return builder.compile(checkpointer=self.checkpointer)
     
     
+    # History node
+    async def compact_history(self, state: AgentState, config: RunnableConfig):
+        """Fold old turns into the running summary so the checkpoint stays small."""
+        messages = state['messages']
+        cut = split_for_compaction(messages)
+        if not cut:
+            return {}
+
+        previous_summary = state.get('summary', '')
+        old_messages = messages[:cut]
+        try:
+            response = await self.llm_summary.ainvoke([
+                SystemMessage(content=SUMMARY_PROMPT),
+                HumanMessage(content=format_for_summary(previous_summary, old_messages)),
+            ], config=config)
+            summary = response.content
+        except Exception as e:
+            logger.error(f"History summarization failed, using fallback summary: {e}")
+            summary = fallback_summary(previous_summary, old_messages)
+
+        logger.info(f"Compacted {len(old_messages)} messages into the conversation summary")
+        return {
+            'summary': summary,
+            'messages': [RemoveMessage(id=m.id) for m in old_messages],
+        }
+
+    def _summary_messages(self, state: AgentState) -> List[SystemMessage]:
+        summary = state.get('summary')
+        if not summary:
+            return []
+        return [SystemMessage(content=f"Tóm tắt cuộc trò chuyện trước đó:\n{summary}")]
+
     # Router node
-    def router(self, state: AgentState):
+    async def router(self, state: AgentState, config: RunnableConfig):
         """Router node to decide between Tool Call and Direct generation"""
         
         query = state['query']
+
+        local = await self.intent_classifier.classify(query)
+        if local is not None:
+            logger.info(f"Router decision: {local.decision} (local {local.source}, confidence {local.confidence:.2f})")
+            return {'router_decision': local.decision}
+
         prompt = """Phân loại câu hỏi vào 1 trong 3 nhánh:
 
 DIRECT - Trả lời trực tiếp:
@@ -158,7 +264,7 @@ VÍ DỤ:
             HumanMessage(content=query)
         ]
         
-        response = self.llm_router.with_structured_output(RouterOutput).invoke(messages)
+        response = await self.llm_router.with_structured_output(RouterOutput).ainvoke(messages, config=config)
         
         if not response:
             logger.error("Router response is None or empty")
@@ -177,7 +283,7 @@ VÍ DỤ:
         return {'router_decision': decision}
     
     # Tool nodes
-    def tool_generator(self, state: AgentState) -> None:
+    async def tool_generator(self, state: AgentState, config: RunnableConfig) -> None:
         """Generate tool calls if necessary"""
         
         messages = state['messages'][-5:]
@@ -220,12 +326,14 @@ QUY TẮC TRẢ LỜI (RẤT QUAN TRỌNG):
             # First turn
             input_messages = [
                 SystemMessage(content=tool_prompt),
+                *self._summary_messages(state),
                 HumanMessage(content=query)
             ]
         else:
             # Subsequent turns
             input_messages = [
                 SystemMessage(content=tool_prompt),
+                *self._summary_messages(state),
                 HumanMessage(content=query),
                 *messages
             ]
@@ -236,7 +344,8 @@ QUY TẮC TRẢ LỜI (RẤT QUAN TRỌNG):
                     HumanMessage(content="Tool đã trả về kết quả trên. Hãy xem xét: 1. Cần gọi tool nào tiếp theo không? (VD: lấy ID xong thì lấy tasks). 2. Nếu xong rồi, hãy tóm tắt kết quả cho user.")
                 )
 
-        response = self.llm_tool_call.invoke(input_messages)
+        # config is passed explicitly so astream_events sees (and streams) the call on every Python version
+        response = await self.llm_tool_call.ainvoke(input_messages, config=config)
         
         # LOGGING
         logger.info(f"Tool generator raw response content: {response.content}")
@@ -252,48 +361,47 @@ QUY TẮC TRẢ LỜI (RẤT QUAN TRỌNG):
 
         return {'messages': [response]}
     
-    def take_action(self, state: AgentState) -> None:
-        last_message = state['messages'][-1]
-        
-        if not last_message or not hasattr(last_message, 'tool_calls'):
-            return {'messages': []}    
-            
-        tool_messages = []
-        for tool_call in last_message.tool_calls:
-            tool_name = tool_call['name']
-            tool_args = tool_call['args']
-            tool_id = tool_call['id']
-            
+    async def _run_tool_call(self, tool_call: dict, config: RunnableConfig, semaphore: asyncio.Semaphore) -> ToolMessage:
+        """Execute one tool call; errors become a ToolMessage so the model can react to them."""
+        tool_name = tool_call['name']
+        tool_args = tool_call['args']
+        tool_id = tool_call['id']
+
+        if tool_name not in self.tools:
+            return ToolMessage(content=f"Unknown tool: {tool_name}", tool_call_id=tool_id)
+
+        async with semaphore:
             logger.info(f"Executing: {tool_name}")
             logger.info(f"Args: {tool_args}")
-            
-            # Execute tool
-            if tool_name in self.tools:
-                try:
-                    result = self.tools[tool_name].invoke(tool_args)
-                    logger.info(f"Success: {result}")
-                    
-                    tool_messages.append(ToolMessage(
-                        content=json.dumps(result, ensure_ascii=False, default=str),
-                        tool_call_id=tool_id
-                    ))
-                    
-                except Exception as e:
-                    logger.error(f"Error: {str(e)}")
-                    tool_messages.append(ToolMessage(
-                        content=f"Error: {str(e)}",
-                        tool_call_id=tool_id
-                    ))
-            else:
-                tool_messages.append(ToolMessage(
-                    content=f"Unknown tool: {tool_name}",
+            try:
+                result = await self.tools[tool_name].ainvoke(tool_args, config=config)
+                logger.info(f"Success: {result}")
+                return ToolMessage(
+                    content=json.dumps(result, ensure_ascii=False, default=str),
                     tool_call_id=tool_id
-                ))
-                    
-        return {'messages': tool_messages}
+                )
+            except Exception as e:
+                logger.error(f"Error: {str(e)}")
+                return ToolMessage(content=f"Error: {str(e)}", tool_call_id=tool_id)
+
+    async def take_action(self, state: AgentState, config: RunnableConfig) -> None:
+        """
+        Run all tool calls of the last model turn concurrently (at most AGENT_TOOL_CONCURRENCY at once).
+        gather() keeps the results in the order of the tool calls, so tool_call_id order is preserved.
+        """
+        last_message = state['messages'][-1]
+        
+        if not last_message or not getattr(last_message, 'tool_calls', None):
+            return {'messages': []}    
+
+        semaphore = asyncio.Semaphore(AGENT_TOOL_CONCURRENCY)
+        tool_messages = await asyncio.gather(
+            *(self._run_tool_call(tool_call, config, semaphore) for tool_call in last_message.tool_calls)
+        )
+        return {'messages': list(tool_messages)}
 
     # Direct answer node
-    def direct_generator(self, state: AgentState) -> None:
+    async def direct_generator(self, state: AgentState, config: RunnableConfig) -> None:
         """Generate direct answer non-related queries"""
         
         messages = state['messages'][-5:]
@@ -307,13 +415,20 @@ NGUYÊN TẮC:
 
         messages = [
             SystemMessage(content=system_prompt),
+            *self._summary_messages(state),
             *messages,
             HumanMessage(content=query)
         ]
         
-        response = self.llm_direct.invoke(messages)
+        cached_answer, query_vector = await self.semantic_cache.lookup(query)
+        if cached_answer is not None:
+            return {"messages": [AIMessage(content=cached_answer)]}
+
+        response = await self.llm_direct.ainvoke(messages, config=config)
         
         logger.info(f"Direct generator response: {response.content}")
+        if isinstance(response.content, str):
+            self.semantic_cache.store(query, query_vector, response.content)
         
         return {"messages": [response]}
         
@@ -4,9 +4,11 @@ Gọi trực tiếp Backend API để truy vấn và thao tác dữ liệu
 """
 from typing import Dict, Any, Optional, List
 from datetime import datetime
+import asyncio
 import os
-import requests
-from langchain_core.tools import tool
+import time
+import httpx
+from langchain_core.tools import StructuredTool
 from pydantic import BaseModel, Field
 from dotenv import load_dotenv
 
@@ -15,12 +17,24 @@ load_dotenv()
 # Backend API base URL (points to FastAPI backend in this workspace)
 API_BASE_URL = os.environ.get('API_BASE_URL', 'http://localhost:8000/api')
 
+# HTTP connection pool to the backend (shared by every tool call)
+API_TOOLS_TIMEOUT = float(os.environ.get('API_TOOLS_TIMEOUT', '30'))
+API_TOOLS_MAX_CONNECTIONS = int(os.environ.get('API_TOOLS_MAX_CONNECTIONS', '50'))
+API_TOOLS_MAX_KEEPALIVE = int(os.environ.get('API_TOOLS_MAX_KEEPALIVE', '20'))
+API_TOOLS_KEEPALIVE_EXPIRY = float(os.environ.get('API_TOOLS_KEEPALIVE_EXPIRY', '60'))
+# Retries only for idempotent GETs (network errors and 502/503/504)
+API_TOOLS_GET_RETRIES = int(os.environ.get('API_TOOLS_GET_RETRIES', '2'))
+API_TOOLS_RETRY_BACKOFF = float(os.environ.get('API_TOOLS_RETRY_BACKOFF', '0.3'))
+
 from src.core.config import settings
 from src.core.context import get_request_token
+from .tool_cache import acached_read, ainvalidating_write, cached_read, invalidating_write
 
 # Cache
 _auth_token_cache: Optional[str] = None # Kept for backward compat if needed, but context is preferred
 
+_RETRY_STATUS = {502, 503, 504}
+
 
 def _get_auth_headers() -> dict:
     """Return headers including Authorization using the request-scoped token."""
@@ -35,57 +49,146 @@ def _get_auth_headers() -> dict:
     # print("[project_manager.api_tools] No request token found.")
     return headers
 
+# HTTP CLIENTS (keep-alive pools, created on first use)
+_client: Optional[httpx.Client] = None
+_async_client: Optional[httpx.AsyncClient] = None
+_async_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _client_kwargs() -> Dict[str, Any]:
+    return {
+        "base_url": API_BASE_URL,
+        "timeout": API_TOOLS_TIMEOUT,
+        # Same behaviour as requests (used before): follow FastAPI's trailing-slash 307 redirects
+        "follow_redirects": True,
+        "limits": httpx.Limits(
+            max_connections=API_TOOLS_MAX_CONNECTIONS,
+            max_keepalive_connections=API_TOOLS_MAX_KEEPALIVE,
+            keepalive_expiry=API_TOOLS_KEEPALIVE_EXPIRY,
+        ),
+    }
+
+
+def _get_client() -> httpx.Client:
+    global _client
+    if _client is None:
+        _client = httpx.Client(**_client_kwargs())
+    return _client
+
+
+def _get_async_client() -> httpx.AsyncClient:
+    """AsyncClient connections belong to one event loop, so a new loop (e.g. a notebook) gets its own client."""
+    global _async_client, _async_client_loop
+    loop = asyncio.get_running_loop()
+    if _async_client is None or _async_client_loop is not loop:
+        _async_client = httpx.AsyncClient(**_client_kwargs())
+        _async_client_loop = loop
+    return _async_client
+
+
+async def aclose_api_clients():
+    """Close the pooled clients (application shutdown)."""
+    global _client, _async_client, _async_client_loop
+    if _async_client is not None:
+        await _async_client.aclose()
+        _async_client, _async_client_loop = None, None
+    if _client is not None:
+        _client.close()
+        _client = None
+
+
+def _to_result(method: str, endpoint: str, response: httpx.Response, ok_status: int) -> Dict[str, Any]:
+    if response.status_code == ok_status:
+        return {"success": True, "data": response.json()}
+    if method == "GET":
+        print(f"[API ERROR] GET {endpoint} failed. Status: {response.status_code}, Body: {response.text}")
+    return {"success": False, "error": f"API error ({response.status_code}): {response.text}"}
+
+
+def _should_retry(method: str, attempt: int, response: Optional[httpx.Response]) -> bool:
+    if method != "GET" or attempt >= API_TOOLS_GET_RETRIES:
+        return False
+    return response is None or response.status_code in _RETRY_STATUS
+
+
+def _request(method: str, endpoint: str, ok_status: int, params: Dict = None, data: Dict = None) -> Dict[str, Any]:
+    """Sync request through the shared pool; GETs are retried on network errors / 502-504."""
+    attempt = 0
+    while True:
+        response = None
+        try:
+            response = _get_client().request(method, endpoint, params=params, json=data, headers=_get_auth_headers())
+        except httpx.HTTPError as e:
+            if not _should_retry(method, attempt, None):
+                print(f"[API NETWORK ERROR] {method} {endpoint} failed: {e!r}")
+                return {"success": False, "error": f"Network error: {e!r}"}
+        else:
+            if not _should_retry(method, attempt, response):
+                return _to_result(method, endpoint, response, ok_status)
+        time.sleep(API_TOOLS_RETRY_BACKOFF * (2 ** attempt))
+        attempt += 1
+
+
+async def _arequest(method: str, endpoint: str, ok_status: int, params: Dict = None, data: Dict = None) -> Dict[str, Any]:
+    """Async version of _request."""
+    attempt = 0
+    while True:
+        response = None
+        try:
+            response = await _get_async_client().request(method, endpoint, params=params, json=data, headers=_get_auth_headers())
+        except httpx.HTTPError as e:
+            if not _should_retry(method, attempt, None):
+                print(f"[API NETWORK ERROR] {method} {endpoint} failed: {e!r}")
+                return {"success": False, "error": f"Network error: {e!r}"}
+        else:
+            if not _should_retry(method, attempt, response):
+                return _to_result(method, endpoint, response, ok_status)
+        await asyncio.sleep(API_TOOLS_RETRY_BACKOFF * (2 ** attempt))
+        attempt += 1
+
 # HELPER FUNCTIONS
 def _api_get(endpoint: str, params: Dict = None) -> Dict[str, Any]:
     """Helper để gọi GET API"""
-    url = f"{API_BASE_URL}{endpoint}"
-    try:
-        response = requests.get(
-            url,
-            params=params,
-            headers=_get_auth_headers(),
-            timeout=30
-        )
-        if response.status_code == 200:
-            return {"success": True, "data": response.json()}
-        else:
-            print(f"[API ERROR] GET {url} failed. Status: {response.status_code}, Body: {response.text}")
-            return {"success": False, "error": f"API error ({response.status_code}): {response.text}"}
-    except requests.RequestException as e:
-        print(f"[API NETWORK ERROR] GET {url} failed: {e}")
-        return {"success": False, "error": f"Network error: {e}"}
+    return _request("GET", endpoint, 200, params=params)
 
 def _api_post(endpoint: str, data: Dict) -> Dict[str, Any]:
     """Helper để gọi POST API"""
-    try:
-        response = requests.post(
-            f"{API_BASE_URL}{endpoint}",
-            json=data,
-            headers=_get_auth_headers(),
-            timeout=30
-        )
-        if response.status_code == 201:
-            return {"success": True, "data": response.json()}
-        else:
-            return {"success": False, "error": f"API error ({response.status_code}): {response.text}"}
-    except requests.RequestException as e:
-        return {"success": False, "error": f"Network error: {e}"}
+    return _request("POST", endpoint, 201, data=data)
 
-def _api_patch(endpoint: str, data: Dict) -> Dict[str, Any]:
+def _api_patch(endpoint: str, data: Dict, params: Dict = None) -> Dict[str, Any]:
     """Helper để gọi PATCH API"""
-    try:
-        response = requests.patch(
-            f"{API_BASE_URL}{endpoint}",
-            json=data,
-            headers=_get_auth_headers(),
-            timeout=30
-        )
-        if response.status_code == 200:
-            return {"success": True, "data": response.json()}
-        else:
-            return {"success": False, "error": f"API error ({response.status_code}): {response.text}"}
-    except requests.RequestException as e:
-        return {"success": False, "error": f"Network error: {e}"}
+    return _request("PATCH", endpoint, 200, params=params, data=data)
+
+async def _aapi_get(endpoint: str, params: Dict = None) -> Dict[str, Any]:
+    """Helper để gọi GET API (async)"""
+    return await _arequest("GET", endpoint, 200, params=params)
+
+async def _aapi_post(endpoint: str, data: Dict) -> Dict[str, Any]:
+    """Helper để gọi POST API (async)"""
+    return await _arequest("POST", endpoint, 201, data=data)
+
+async def _aapi_patch(endpoint: str, data: Dict, params: Dict = None) -> Dict[str, Any]:
+    """Helper để gọi PATCH API (async)"""
+    return await _arequest("PATCH", endpoint, 200, params=params, data=data)
+
+
+def _make_tool(func, coroutine, args_schema=None, *, read_only: bool = False, invalidates_cache: bool = False) -> StructuredTool:
+    """Build a tool with both a sync (invoke) and an async (ainvoke) implementation; description = func docstring.
+
+    read_only: results go through the read-through cache (see tool_cache).
+    invalidates_cache: a successful call clears cached reads (write tools).
+    """
+    name = func.__name__.lstrip("_")
+    if read_only:
+        func, coroutine = cached_read(name, func), acached_read(name, coroutine)
+    elif invalidates_cache:
+        func, coroutine = invalidating_write(func), ainvalidating_write(coroutine)
+    return StructuredTool.from_function(
+        func=func,
+        coroutine=coroutine,
+        name=name,
+        args_schema=args_schema,
+    )
 
 # INPUT SCHEMAS
 class CreateTaskInput(BaseModel):
@@ -105,8 +208,36 @@ class UpdateTaskStatusInput(BaseModel):
     status: str = Field(description="Trạng thái mới: To Do, In Progress, Done")
 
 # TASK TOOLS
-@tool(args_schema=CreateTaskInput)
-def create_task(
+# Each tool has a sync body (invoke) and an async body (ainvoke, used by the async agent);
+# both share the same request building and result shaping.
+
+def _create_task_payload(title, project_id, author_user_id, description, priority, status, due_date, assigned_user_id) -> Dict[str, Any]:
+    payload = {
+        "title": title,
+        "project_id": project_id,
+        "description": description or "",
+        "priority": priority,
+        "status": status,
+        "tags": [],  # Default empty list
+        "due_date": due_date,
+        "assignee_id": assigned_user_id,
+    }
+    # Chỉ gửi author_id nếu có (dù backend thường ignore và dùng token)
+    if author_user_id:
+        payload["author_id"] = author_user_id
+    return payload
+
+def _create_task_result(title: str, result: Dict[str, Any]) -> Dict[str, Any]:
+    if result["success"]:
+        task = result["data"]
+        return {
+            "success": True,
+            "message": f"Task '{title}' đã được tạo thành công",
+            "task": task
+        }
+    return result
+
+def _create_task(
     title: str,
     project_id: str,
     author_user_id: Optional[str] = None,
@@ -134,33 +265,36 @@ def create_task(
     Returns:
         Task mới được tạo với ID
     """
-    payload = {
-        "title": title,
-        "project_id": project_id,
-        "description": description or "",
-        "priority": priority,
-        "status": status,
-        "tags": [],  # Default empty list
-        "due_date": due_date,
-        "assignee_id": assigned_user_id,
-    }
-    # Chỉ gửi author_id nếu có (dù backend thường ignore và dùng token)
-    if author_user_id:
-        payload["author_id"] = author_user_id
-    
-    result = _api_post("/v1/tasks", payload)
-    
+    payload = _create_task_payload(title, project_id, author_user_id, description, priority, status, due_date, assigned_user_id)
+    return _create_task_result(title, _api_post("/v1/tasks/", payload))
+
+async def _acreate_task(
+    title: str,
+    project_id: str,
+    author_user_id: Optional[str] = None,
+    description: Optional[str] = None,
+    priority: Optional[str] = "Medium",
+    status: Optional[str] = "To Do",
+    due_date: Optional[str] = None,
+    assigned_user_id: Optional[str] = None
+) -> Dict[str, Any]:
+    payload = _create_task_payload(title, project_id, author_user_id, description, priority, status, due_date, assigned_user_id)
+    return _create_task_result(title, await _aapi_post("/v1/tasks/", payload))
+
+create_task = _make_tool(_create_task, _acreate_task, CreateTaskInput, invalidates_cache=True)
+
+
+def _update_task_status_result(status: str, result: Dict[str, Any]) -> Dict[str, Any]:
     if result["success"]:
         task = result["data"]
         return {
             "success": True,
-            "message": f"Task '{title}' đã được tạo thành công",
+            "message": f"Task đã được cập nhật sang '{status}'",
             "task": task
         }
     return result
 
-@tool(args_schema=UpdateTaskStatusInput)
-def update_task_status(task_id: str, status: str) -> Dict[str, Any]:
+def _update_task_status(task_id: str, status: str) -> Dict[str, Any]:
     """Cập nhật trạng thái của task.
     
     SỬ DỤNG KHI: Thay đổi status của task.
@@ -173,32 +307,18 @@ def update_task_status(task_id: str, status: str) -> Dict[str, Any]:
     Returns:
         Task sau khi update
     """
-    valid_statuses = ["To Do", "In Progress", "Done"]
-    # Backend expects 'new_status' as query param for this specific endpoint
-    # We pass empty body {} as the second argument to _api_patch
-    result = _api_patch(f"/v1/tasks/{task_id}/status?new_status={status}", {})
-    
-    if result["success"]:
-        task = result["data"]
-        return {
-            "success": True,
-            "message": f"Task đã được cập nhật sang '{status}'",
-            "task": task
-        }
-    return result
+    # Backend expects 'new_status' as query param for this specific endpoint (empty body)
+    result = _api_patch(f"/v1/tasks/{task_id}/status", {}, params={"new_status": status})
+    return _update_task_status_result(status, result)
 
-@tool
-def get_user_projects() -> Dict[str, Any]:
-    """Lấy danh sách các dự án mà người dùng hiện tại là thành viên.
-    
-    SỬ DỤNG KHI: Xem các project của user.
-    VÍ DỤ: "Danh sách projects của tôi", "Các dự án tôi tham gia"
-    
-    Returns:
-        List các projects user là member
-    """
-    result = _api_get("/v1/projects")
-    
+async def _aupdate_task_status(task_id: str, status: str) -> Dict[str, Any]:
+    result = await _aapi_patch(f"/v1/tasks/{task_id}/status", {}, params={"new_status": status})
+    return _update_task_status_result(status, result)
+
+update_task_status = _make_tool(_update_task_status, _aupdate_task_status, UpdateTaskStatusInput, invalidates_cache=True)
+
+
+def _user_projects_result(result: Dict[str, Any]) -> Dict[str, Any]:
     if not result["success"]:
         return result
     
@@ -209,11 +329,27 @@ def get_user_projects() -> Dict[str, Any]:
         "projects": projects
     }
 
+def _get_user_projects() -> Dict[str, Any]:
+    """Lấy danh sách các dự án mà người dùng hiện tại là thành viên.
+    
+    SỬ DỤNG KHI: Xem các project của user.
+    VÍ DỤ: "Danh sách projects của tôi", "Các dự án tôi tham gia"
+    
+    Returns:
+        List các projects user là member
+    """
+    return _user_projects_result(_api_get("/v1/projects/"))
+
+async def _aget_user_projects() -> Dict[str, Any]:
+    return _user_projects_result(await _aapi_get("/v1/projects/"))
+
+get_user_projects = _make_tool(_get_user_projects, _aget_user_projects, read_only=True)
+
+
 class GetProjectDetailsInput(BaseModel):
     project_id: str = Field(description="ID của dự án cần lấy thông tin")
 
-@tool(args_schema=GetProjectDetailsInput)
-def get_project_details(project_id: str) -> Dict[str, Any]:
+def _get_project_details(project_id: str) -> Dict[str, Any]:
     """Lấy thông tin chi tiết của một dự án.
     
     SỬ DỤNG KHI: User hỏi về chi tiết một dự án cụ thể (deadline, mô tả, members...).
@@ -222,24 +358,18 @@ def get_project_details(project_id: str) -> Dict[str, Any]:
     Args:
         project_id: ID của dự án
     """
-    result = _api_get(f"/v1/projects/{project_id}")
-    return result
+    return _api_get(f"/v1/projects/{project_id}")
+
+async def _aget_project_details(project_id: str) -> Dict[str, Any]:
+    return await _aapi_get(f"/v1/projects/{project_id}")
+
+get_project_details = _make_tool(_get_project_details, _aget_project_details, GetProjectDetailsInput, read_only=True)
+
 
 class GetProjectTasksInput(BaseModel):
     project_id: str = Field(description="ID của dự án cần lấy danh sách task")
 
-@tool(args_schema=GetProjectTasksInput)
-def get_project_tasks(project_id: str) -> Dict[str, Any]:
-    """Lấy danh sách task của một dự án cụ thể.
-    
-    SỬ DỤNG KHI: User muốn xem task trong 1 project nhất định.
-    VÍ DỤ: "Các task của dự án A", "Project X có việc gì cần làm?"
-    
-    Args:
-        project_id: ID của dự án
-    """
-    result = _api_get(f"/v1/tasks/{project_id}")
-    
+def _project_tasks_result(result: Dict[str, Any]) -> Dict[str, Any]:
     if not result["success"]:
         return result
         
@@ -250,21 +380,27 @@ def get_project_tasks(project_id: str) -> Dict[str, Any]:
         "tasks": tasks,
     }
 
-class GetProjectMeetingsInput(BaseModel):
-    project_id: str = Field(description="ID của dự án cần lấy danh sách cuộc họp")
-
-@tool(args_schema=GetProjectMeetingsInput)
-def get_project_meetings(project_id: str) -> Dict[str, Any]:
-    """Lấy danh sách các cuộc họp (meetings) của một dự án.
+def _get_project_tasks(project_id: str) -> Dict[str, Any]:
+    """Lấy danh sách task của một dự án cụ thể.
     
-    SỬ DỤNG KHI: User muốn xem lịch họp, danh sách cuộc họp của dự án.
-    VÍ DỤ: "Lịch họp của dự án A", "Dự án này có cuộc họp nào?"
+    SỬ DỤNG KHI: User muốn xem task trong 1 project nhất định.
+    VÍ DỤ: "Các task của dự án A", "Project X có việc gì cần làm?"
     
     Args:
         project_id: ID của dự án
     """
-    result = _api_get(f"/v1/meetings/{project_id}")
-    
+    return _project_tasks_result(_api_get(f"/v1/tasks/{project_id}"))
+
+async def _aget_project_tasks(project_id: str) -> Dict[str, Any]:
+    return _project_tasks_result(await _aapi_get(f"/v1/tasks/{project_id}"))
+
+get_project_tasks = _make_tool(_get_project_tasks, _aget_project_tasks, GetProjectTasksInput, read_only=True)
+
+
+class GetProjectMeetingsInput(BaseModel):
+    project_id: str = Field(description="ID của dự án cần lấy danh sách cuộc họp")
+
+def _project_meetings_result(result: Dict[str, Any]) -> Dict[str, Any]:
     if not result["success"]:
         return result
         
@@ -275,8 +411,24 @@ def get_project_meetings(project_id: str) -> Dict[str, Any]:
         "meetings": meetings
     }
 
-@tool
-def get_current_user_info() -> Dict[str, Any]:
+def _get_project_meetings(project_id: str) -> Dict[str, Any]:
+    """Lấy danh sách các cuộc họp (meetings) của một dự án.
+    
+    SỬ DỤNG KHI: User muốn xem lịch họp, danh sách cuộc họp của dự án.
+    VÍ DỤ: "Lịch họp của dự án A", "Dự án này có cuộc họp nào?"
+    
+    Args:
+        project_id: ID của dự án
+    """
+    return _project_meetings_result(_api_get(f"/v1/meetings/{project_id}"))
+
+async def _aget_project_meetings(project_id: str) -> Dict[str, Any]:
+    return _project_meetings_result(await _aapi_get(f"/v1/meetings/{project_id}"))
+
+get_project_meetings = _make_tool(_get_project_meetings, _aget_project_meetings, GetProjectMeetingsInput, read_only=True)
+
+
+def _get_current_user_info() -> Dict[str, Any]:
     """Lấy thông tin của người dùng hiện tại đang đăng nhập.
     
     SỬ DỤNG KHI: Cần biết thông tin chi tiết của user (id, name, email).
@@ -285,8 +437,12 @@ def get_current_user_info() -> Dict[str, Any]:
     Returns:
         Thông tin user (id, username, email, name...)
     """
-    result = _api_get("/v1/users/me")
-    return result
+    return _api_get("/v1/users/me")
+
+async def _aget_current_user_info() -> Dict[str, Any]:
+    return await _aapi_get("/v1/users/me")
+
+get_current_user_info = _make_tool(_get_current_user_info, _aget_current_user_info, read_only=True)
 
 # EXPORT ALL TOOLS
 # Chỉ giữ lại các tools tương ứng với API thực tế
@@ -298,4 +454,4 @@ ALL_API_TOOLS = [
     update_task_status,
     get_project_tasks,
     get_project_meetings,
-]
\ No newline at end of file
+]
@@ -0,0 +1,181 @@
+"""
+Conversation history compaction and checkpoint pruning for the Project Manager agent.
+
+- Compaction (compact_history node): once a thread holds more than AGENT_HISTORY_MAX_MESSAGES
+  messages, everything before the last AGENT_HISTORY_KEEP_MESSAGES (cut at a user turn, so tool
+  calls stay with their results) is folded into a running summary and removed from the state.
+- Pruning (prune_checkpoints): only the latest checkpoint of a thread is ever read, so older
+  checkpoint rows, their writes and unreferenced blobs are deleted; idle threads are dropped entirely.
+  Runs periodically inside the service (AGENT_CHECKPOINT_PRUNE_INTERVAL) or once from the CLI:
+      python -m src.agents.project_manager.history --keep 2 --idle-days 30
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+from typing import Dict, List
+
+from langchain_core.messages import AIMessage, AnyMessage, HumanMessage, ToolMessage
+
+logger = logging.getLogger(__name__)
+
+AGENT_HISTORY_MAX_MESSAGES = int(os.getenv("AGENT_HISTORY_MAX_MESSAGES", "20"))
+AGENT_HISTORY_KEEP_MESSAGES = int(os.getenv("AGENT_HISTORY_KEEP_MESSAGES", "8"))
+# Tool results are long JSON blobs; only their beginning goes into the summary prompt
+SUMMARY_TOOL_RESULT_CHARS = 500
+
+AGENT_CHECKPOINT_KEEP_PER_THREAD = int(os.getenv("AGENT_CHECKPOINT_KEEP_PER_THREAD", "2"))
+AGENT_CHECKPOINT_IDLE_DAYS = int(os.getenv("AGENT_CHECKPOINT_IDLE_DAYS", "30"))
+AGENT_CHECKPOINT_PRUNE_INTERVAL = int(os.getenv("AGENT_CHECKPOINT_PRUNE_INTERVAL", "3600"))  # seconds, 0 = disabled
+
+SUMMARY_PROMPT = """Bạn tóm tắt lịch sử hội thoại giữa người dùng và PM Assistant.
+Viết bản tóm tắt ngắn gọn (tối đa 10 gạch đầu dòng) bằng Tiếng Việt, giữ lại:
+- Dự án, task, cuộc họp đã được nhắc tới (tên và ID nếu có) và trạng thái của chúng.
+- Các thao tác đã thực hiện (tạo / cập nhật task) và kết quả.
+- Yêu cầu hoặc sở thích của người dùng còn có giá trị cho các lượt sau.
+Bỏ qua chào hỏi và nội dung không còn ý nghĩa."""
+
+
+def split_for_compaction(messages: List[AnyMessage]) -> int:
+    """
+    Number of leading messages to fold into the summary (0 = nothing to do).
+    The cut is moved forward to a HumanMessage so an AIMessage with tool_calls is never separated
+    from its ToolMessages.
+    """
+    if len(messages) <= AGENT_HISTORY_MAX_MESSAGES:
+        return 0
+    cut = len(messages) - AGENT_HISTORY_KEEP_MESSAGES
+    while cut < len(messages) and not isinstance(messages[cut], HumanMessage):
+        cut += 1
+    return cut if cut < len(messages) else 0
+
+
+def format_for_summary(previous_summary: str, messages: List[AnyMessage]) -> str:
+    """Render the messages being dropped (and the previous summary) as plain text for the summarizer."""
+    lines = []
+    if previous_summary:
+        lines.append(f"TÓM TẮT TRƯỚC ĐÓ:\n{previous_summary}\n")
+    lines.append("HỘI THOẠI:")
+    for message in messages:
+        content = message.content if isinstance(message.content, str) else str(message.content)
+        if isinstance(message, HumanMessage):
+            lines.append(f"User: {content}")
+        elif isinstance(message, ToolMessage):
+            lines.append(f"Tool: {content[:SUMMARY_TOOL_RESULT_CHARS]}")
+        elif isinstance(message, AIMessage):
+            if content:
+                lines.append(f"Assistant: {content}")
+            for tool_call in getattr(message, "tool_calls", None) or []:
+                lines.append(f"Assistant gọi tool {tool_call['name']}({tool_call['args']})")
+    return "\n".join(lines)
+
+
+def fallback_summary(previous_summary: str, messages: List[AnyMessage]) -> str:
+    """Used when the summarizer fails: keep the user's requests so the window still shrinks."""
+    requests = [m.content for m in messages if isinstance(m, HumanMessage) and isinstance(m.content, str)]
+    parts = [previous_summary] if previous_summary else []
+    parts += [f"- Người dùng đã hỏi: {text[:200]}" for text in requests[-10:]]
+    return "\n".join(parts)
+
+
+# --- CHECKPOINT PRUNING (langgraph-checkpoint-postgres tables) ---
+_PRUNE_IDLE_THREADS = """
+    WITH idle AS (
+        SELECT thread_id FROM checkpoints
+        GROUP BY thread_id
+        HAVING max((checkpoint->>'ts')::timestamptz) < now() - make_interval(days => %(idle_days)s)
+    ), w AS (
+        DELETE FROM checkpoint_writes WHERE thread_id IN (SELECT thread_id FROM idle)
+    ), b AS (
+        DELETE FROM checkpoint_blobs WHERE thread_id IN (SELECT thread_id FROM idle)
+    )
+    DELETE FROM checkpoints WHERE thread_id IN (SELECT thread_id FROM idle)
+"""
+
+_PRUNE_OLD_CHECKPOINTS = """
+    DELETE FROM checkpoints c
+    USING (
+        SELECT thread_id, checkpoint_ns, checkpoint_id,
+               row_number() OVER (PARTITION BY thread_id, checkpoint_ns ORDER BY checkpoint_id DESC) AS rn
+        FROM checkpoints
+    ) ranked
+    WHERE c.thread_id = ranked.thread_id
+      AND c.checkpoint_ns = ranked.checkpoint_ns
+      AND c.checkpoint_id = ranked.checkpoint_id
+      AND ranked.rn > %(keep)s
+"""
+
+_PRUNE_ORPHAN_WRITES = """
+    DELETE FROM checkpoint_writes w
+    WHERE NOT EXISTS (
+        SELECT 1 FROM checkpoints c
+        WHERE c.thread_id = w.thread_id AND c.checkpoint_ns = w.checkpoint_ns AND c.checkpoint_id = w.checkpoint_id
+    )
+"""
+
+# A blob version is alive while any remaining checkpoint of the thread still points to it
+_PRUNE_ORPHAN_BLOBS = """
+    DELETE FROM checkpoint_blobs b
+    WHERE NOT EXISTS (
+        SELECT 1 FROM checkpoints c
+        WHERE c.thread_id = b.thread_id AND c.checkpoint_ns = b.checkpoint_ns
+          AND c.checkpoint->'channel_versions'->>b.channel = b.version
+    )
+"""
+
+
+async def prune_checkpoints(pool, keep_per_thread: int = AGENT_CHECKPOINT_KEEP_PER_THREAD,
+                            idle_days: int = AGENT_CHECKPOINT_IDLE_DAYS) -> Dict[str, int]:
+    """
+    Delete old checkpoints (keeping the latest keep_per_thread per thread) and threads idle for
+    more than idle_days (0 = keep idle threads). Returns the number of deleted rows per step.
+    """
+    keep_per_thread = max(keep_per_thread, 1)
+    deleted = {}
+    async with pool.connection() as conn:
+        async with conn.transaction():
+            if idle_days > 0:
+                cursor = await conn.execute(_PRUNE_IDLE_THREADS, {"idle_days": idle_days})
+                deleted["idle_thread_checkpoints"] = cursor.rowcount
+            cursor = await conn.execute(_PRUNE_OLD_CHECKPOINTS, {"keep": keep_per_thread})
+            deleted["checkpoints"] = cursor.rowcount
+            cursor = await conn.execute(_PRUNE_ORPHAN_WRITES)
+            deleted["writes"] = cursor.rowcount
+            cursor = await conn.execute(_PRUNE_ORPHAN_BLOBS)
+            deleted["blobs"] = cursor.rowcount
+    logger.info(f"Checkpoint pruning deleted {deleted}")
+    return deleted
+
+
+async def run_pruning_loop(pool, interval: int = AGENT_CHECKPOINT_PRUNE_INTERVAL):
+    """Background task: prune every `interval` seconds until cancelled."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await prune_checkpoints(pool)
+        except Exception as e:
+            logger.error(f"Checkpoint pruning failed: {e}")
+
+
+async def _main():
+    from dotenv import load_dotenv
+    from psycopg_pool import AsyncConnectionPool
+
+    load_dotenv()
+
+    parser = argparse.ArgumentParser(description="Prune old LangGraph checkpoints of the Project Manager agent")
+    parser.add_argument("--keep", type=int, default=AGENT_CHECKPOINT_KEEP_PER_THREAD, help="checkpoints kept per thread")
+    parser.add_argument("--idle-days", type=int, default=AGENT_CHECKPOINT_IDLE_DAYS, help="drop threads idle this long (0 = never)")
+    args = parser.parse_args()
+
+    async with AsyncConnectionPool(conninfo=os.environ["DATABASE_URL"], min_size=1, max_size=1,
+                                   kwargs={"autocommit": True, "prepare_threshold": 0}) as pool:
+        print(await prune_checkpoints(pool, args.keep, args.idle_days))
+
+
+if __name__ == "__main__":
+    import sys
+    if sys.platform == "win32":
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+    asyncio.run(_main())
@@ -0,0 +1,217 @@
+"""
+Local intent classifier for the Project Manager router (DIRECT vs TOOL_CALL).
+
+Runs before the LLM router so most messages skip a model round trip:
+1. Keyword / regex rules (accent-insensitive, Vietnamese + English).
+2. Optional embedding similarity against labelled examples (INTENT_EMBEDDING_PROVIDER):
+   - "local": cached sentence-transformers model (INTENT_LOCAL_EMBEDDING_MODEL), runs in a thread
+   - "gemini" / "openai": models.embedding_model
+Only when neither stage reaches INTENT_CONFIDENCE_THRESHOLD does the router call the LLM.
+"""
+
+import asyncio
+import logging
+import os
+import re
+import threading
+import unicodedata
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+INTENT_CLASSIFIER_ENABLED = os.getenv("INTENT_CLASSIFIER_ENABLED", "true").lower() == "true"
+INTENT_CONFIDENCE_THRESHOLD = float(os.getenv("INTENT_CONFIDENCE_THRESHOLD", "0.8"))
+INTENT_EMBEDDING_PROVIDER = os.getenv("INTENT_EMBEDDING_PROVIDER", "")  # "", "local", "gemini", "openai"
+INTENT_LOCAL_EMBEDDING_MODEL = os.getenv(
+    "INTENT_LOCAL_EMBEDDING_MODEL", "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
+)
+# Nearest example must be at least this similar, and beat the best example of the other label by MARGIN
+INTENT_EMBEDDING_MIN_SIMILARITY = float(os.getenv("INTENT_EMBEDDING_MIN_SIMILARITY", "0.6"))
+INTENT_EMBEDDING_MARGIN = float(os.getenv("INTENT_EMBEDDING_MARGIN", "0.08"))
+
+TOOL_CALL = "TOOL_CALL"
+DIRECT = "DIRECT"
+
+
+@dataclass
+class IntentResult:
+    decision: str
+    confidence: float
+    source: str  # "rules" | "embedding"
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase and strip Vietnamese diacritics so "tạo task" and "tao task" match the same rules."""
+    text = unicodedata.normalize("NFD", text.lower())
+    text = "".join(ch for ch in text if unicodedata.category(ch) != "Mn")
+    return text.replace("đ", "d")
+
+
+# --- RULES (patterns are written without diacritics) ---
+_DOMAIN = re.compile(
+    r"\b(tasks?|cong viec|viec can lam|du an|projects?|cuoc hop|lich hop|meetings?|deadline|sprint|backlog)\b"
+)
+_PERSONAL = re.compile(r"\b(cua toi|cua minh|toi|minh|my|mine|me|i)\b")
+_ACTION = re.compile(
+    r"\b(tao|them|cap nhat|chuyen|danh dau|xem|liet ke|danh sach|kiem tra|co bao nhieu|nao|cac|nhung|tat ca"
+    r"|create|add|update|mark|move|show|list|check|how many|which|all)\b"
+)
+_IDENTIFIER = re.compile(r"#\d+|\b[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\b")
+_ACCOUNT = re.compile(r"\b(toi la ai|tai khoan cua toi|thong tin cua toi|profile cua toi|who am i|my account|my profile)\b")
+
+_SMALLTALK = re.compile(
+    r"^\s*(xin chao|chao|hello|hi|hey|cam on|thanks?|thank you|ok|oke|tam biet|bye|good (morning|night))\b"
+)
+_WRITING = re.compile(r"\b(viet|soan|dich|tom tat doan|write|draft|translate|compose)\b")
+_KNOWLEDGE = re.compile(r"\b(la gi|nghia la|giai thich|khac nhau|lam sao|nhu the nao|what is|what are|explain|difference between|how does|how to)\b")
+
+
+def classify_by_rules(query: str) -> Optional[IntentResult]:
+    """Keyword/regex stage. Returns None when the message has no usable signal."""
+    text = normalize_text(query)
+
+    if _ACCOUNT.search(text) or _IDENTIFIER.search(text):
+        return IntentResult(TOOL_CALL, 0.95, "rules")
+
+    domain = bool(_DOMAIN.search(text))
+    personal = bool(_PERSONAL.search(text))
+    action = bool(_ACTION.search(text))
+    smalltalk = bool(_SMALLTALK.search(text))
+    writing = bool(_WRITING.search(text))
+    knowledge = bool(_KNOWLEDGE.search(text))
+
+    # "Cảm ơn", "Xin chào bạn" ...: short pleasantries with nothing else in them
+    if smalltalk and len(text.split()) <= 6 and not domain:
+        return IntentResult(DIRECT, 0.95, "rules")
+
+    if domain and (personal or action) and not (writing or knowledge):
+        return IntentResult(TOOL_CALL, 0.9 if personal else 0.85, "rules")
+
+    if (writing or knowledge) and not personal:
+        return IntentResult(DIRECT, 0.9 if not domain else 0.8, "rules")
+
+    if smalltalk and not domain:
+        return IntentResult(DIRECT, 0.85, "rules")
+
+    # Mixed signals (e.g. "viết email báo cáo task của tôi") or none at all
+    if domain or personal or writing or knowledge:
+        return IntentResult(TOOL_CALL if domain else DIRECT, 0.5, "rules")
+    return None
+
+
+# --- EMBEDDINGS ---
+_EXAMPLES: List[Tuple[str, str]] = [
+    ("Tasks của tôi", TOOL_CALL),
+    ("Tôi có những việc gì cần làm hôm nay?", TOOL_CALL),
+    ("Danh sách dự án tôi đang tham gia", TOOL_CALL),
+    ("Tạo task Review code cho dự án A", TOOL_CALL),
+    ("Chuyển task sang Done", TOOL_CALL),
+    ("Dự án X có cuộc họp nào tuần này?", TOOL_CALL),
+    ("Ai là thành viên của dự án này?", TOOL_CALL),
+    ("Thông tin tài khoản của tôi", TOOL_CALL),
+    ("Show my tasks", TOOL_CALL),
+    ("What meetings does project Alpha have?", TOOL_CALL),
+    ("Mark the login bug task as in progress", TOOL_CALL),
+    ("Xin chào", DIRECT),
+    ("Cảm ơn bạn nhiều", DIRECT),
+    ("Viết email xin hoãn deadline", DIRECT),
+    ("Dịch đoạn này sang tiếng Anh", DIRECT),
+    ("Scrum là gì?", DIRECT),
+    ("Giải thích sự khác nhau giữa Agile và Waterfall", DIRECT),
+    ("Làm sao để viết user story tốt?", DIRECT),
+    ("Hello, how are you?", DIRECT),
+    ("What is a REST API?", DIRECT),
+    ("Draft a status update email for my team", DIRECT),
+]
+
+
+class EmbeddingBackend:
+    """Embeds texts with the configured provider; local models are loaded once and reused."""
+
+    def __init__(self, provider: str):
+        self.provider = provider
+        self._model = None
+        self._load_lock = threading.Lock()
+
+    def _load(self):
+        if self._model is None:
+            with self._load_lock:
+                if self._model is None:
+                    if self.provider == "local":
+                        from sentence_transformers import SentenceTransformer
+                        self._model = SentenceTransformer(INTENT_LOCAL_EMBEDDING_MODEL)
+                    else:
+                        from ...models.models import get_embedding_model
+                        self._model = get_embedding_model(self.provider)
+        return self._model
+
+    async def embed(self, texts: List[str]) -> np.ndarray:
+        if self.provider == "local":
+            model = await asyncio.to_thread(self._load)
+            vectors = await asyncio.to_thread(model.encode, texts)
+        else:
+            vectors = await self._load().aembed_documents(texts)
+        vectors = np.asarray(vectors, dtype=np.float32)
+        return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+
+_backends: Dict[str, EmbeddingBackend] = {}
+
+
+def get_embedding_backend(provider: str) -> EmbeddingBackend:
+    """One backend per provider for the whole process (the intent classifier and the semantic cache share it)."""
+    if provider not in _backends:
+        _backends[provider] = EmbeddingBackend(provider)
+    return _backends[provider]
+
+
+class IntentClassifier:
+    def __init__(self, embedding_provider: str = INTENT_EMBEDDING_PROVIDER,
+                 threshold: float = INTENT_CONFIDENCE_THRESHOLD):
+        self.threshold = threshold
+        self._backend = get_embedding_backend(embedding_provider) if embedding_provider else None
+        self._example_vectors: Optional[np.ndarray] = None
+        self._example_labels = np.array([label for _, label in _EXAMPLES])
+        self._examples_lock = asyncio.Lock()
+
+    async def _get_example_vectors(self) -> np.ndarray:
+        if self._example_vectors is None:
+            async with self._examples_lock:
+                if self._example_vectors is None:
+                    self._example_vectors = await self._backend.embed([text for text, _ in _EXAMPLES])
+        return self._example_vectors
+
+    async def classify_by_embedding(self, query: str) -> Optional[IntentResult]:
+        examples = await self._get_example_vectors()
+        query_vector = (await self._backend.embed([query]))[0]
+        similarities = examples @ query_vector
+
+        best = int(np.argmax(similarities))
+        decision = self._example_labels[best]
+        other = similarities[self._example_labels != decision].max()
+        best_similarity = float(similarities[best])
+        if best_similarity < INTENT_EMBEDDING_MIN_SIMILARITY or best_similarity - float(other) < INTENT_EMBEDDING_MARGIN:
+            return IntentResult(str(decision), 0.5, "embedding")
+        return IntentResult(str(decision), 0.9, "embedding")
+
+    async def classify(self, query: str) -> Optional[IntentResult]:
+        """Confident local decision, or None to let the LLM router decide."""
+        if not INTENT_CLASSIFIER_ENABLED:
+            return None
+
+        result = classify_by_rules(query)
+        if result is not None and result.confidence >= self.threshold:
+            return result
+
+        if self._backend is not None:
+            try:
+                result = await self.classify_by_embedding(query)
+            except Exception as e:
+                logger.warning(f"Intent embedding stage failed, falling back to LLM router: {e}")
+                return None
+            if result.confidence >= self.threshold:
+                return result
+        return None
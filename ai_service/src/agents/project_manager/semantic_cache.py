@@ -0,0 +1,132 @@
+"""
+Semantic response cache in front of direct_generator.
+
+Queries are embedded (same backends as the intent classifier); a new query whose cosine similarity
+to a cached query is >= SEMANTIC_CACHE_THRESHOLD gets the stored answer without an LLM call.
+
+- Scope: "user" (keyed by the user id the backend server verified and sent with the chat request, so
+  one user's answers never reach another and survive re-login / token refresh; requests without it
+  are not cached) or "global" (general questions shared by everyone).
+- Entries expire after SEMANTIC_CACHE_TTL seconds; at most SEMANTIC_CACHE_MAX_ENTRIES are kept in
+  total, least recently used first out.
+- Queries that refer to earlier context ("dịch đoạn này", "explain that") are never cached, since
+  their answer depends on the conversation rather than the query text.
+
+Disabled unless SEMANTIC_CACHE_PROVIDER is set ("local", "gemini" or "openai").
+"""
+
+import logging
+import os
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from src.core.context import get_request_user
+from .intent import get_embedding_backend, normalize_text
+
+logger = logging.getLogger(__name__)
+
+SEMANTIC_CACHE_PROVIDER = os.getenv("SEMANTIC_CACHE_PROVIDER", "")  # "" = disabled
+SEMANTIC_CACHE_SCOPE = os.getenv("SEMANTIC_CACHE_SCOPE", "user")  # "user" | "global"
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.92"))
+SEMANTIC_CACHE_TTL = float(os.getenv("SEMANTIC_CACHE_TTL", str(24 * 3600)))
+SEMANTIC_CACHE_MAX_ENTRIES = int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "5000"))
+SEMANTIC_CACHE_MAX_QUERY_CHARS = int(os.getenv("SEMANTIC_CACHE_MAX_QUERY_CHARS", "500"))
+
+# References to earlier messages (patterns without diacritics, see normalize_text)
+_CONTEXTUAL = re.compile(
+    r"\b(nay|do|tren|vua roi|luc nay|tiep|nua|no|this|that|these|those|it|above|previous|again|continue)\b"
+)
+
+
+@dataclass
+class _Entry:
+    scope: str
+    query: str
+    vector: np.ndarray
+    answer: str
+    expires_at: float
+
+
+class SemanticCache:
+    def __init__(self, provider: str = SEMANTIC_CACHE_PROVIDER, scope: str = SEMANTIC_CACHE_SCOPE,
+                 threshold: float = SEMANTIC_CACHE_THRESHOLD, ttl: float = SEMANTIC_CACHE_TTL,
+                 max_entries: int = SEMANTIC_CACHE_MAX_ENTRIES):
+        self._backend = get_embedding_backend(provider) if provider else None
+        self.scope = scope
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        # LRU order over all scopes; entries are looked up per scope
+        self._entries: "OrderedDict[int, _Entry]" = OrderedDict()
+        self._next_id = 0
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self._backend is not None
+
+    def _current_scope(self) -> Optional[str]:
+        if self.scope == "global":
+            return "global"
+        user_id = get_request_user()
+        return f"user:{user_id}" if user_id else None
+
+    @staticmethod
+    def is_cacheable(query: str) -> bool:
+        if not query.strip() or len(query) > SEMANTIC_CACHE_MAX_QUERY_CHARS:
+            return False
+        return not _CONTEXTUAL.search(normalize_text(query))
+
+    def _evict_expired(self, now: float):
+        expired = [entry_id for entry_id, entry in self._entries.items() if entry.expires_at < now]
+        for entry_id in expired:
+            del self._entries[entry_id]
+
+    async def lookup(self, query: str) -> Tuple[Optional[str], Optional[np.ndarray]]:
+        """
+        Cached answer for a near-duplicate query (or None), plus the query vector so store()
+        does not embed the same text twice. (None, None) when the query is not cacheable.
+        """
+        scope = self._current_scope()
+        if not self.enabled or scope is None or not self.is_cacheable(query):
+            return None, None
+
+        try:
+            vector = (await self._backend.embed([query]))[0]
+        except Exception as e:
+            logger.warning(f"Semantic cache embedding failed, skipping cache: {e}")
+            return None, None
+
+        now = time.monotonic()
+        self._evict_expired(now)
+        candidates = [(entry_id, entry) for entry_id, entry in self._entries.items() if entry.scope == scope]
+        if candidates:
+            similarities = np.stack([entry.vector for _, entry in candidates]) @ vector
+            best = int(np.argmax(similarities))
+            if similarities[best] >= self.threshold:
+                entry_id, entry = candidates[best]
+                self._entries.move_to_end(entry_id)
+                self.hits += 1
+                logger.info(f"Semantic cache hit ({float(similarities[best]):.3f}): '{query}' ~ '{entry.query}'")
+                return entry.answer, vector
+
+        self.misses += 1
+        return None, vector
+
+    def store(self, query: str, vector: Optional[np.ndarray], answer: str):
+        scope = self._current_scope()
+        if vector is None or scope is None or not answer:
+            return
+        self._entries[self._next_id] = _Entry(scope, query, vector, answer, time.monotonic() + self.ttl)
+        self._next_id += 1
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, int]:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
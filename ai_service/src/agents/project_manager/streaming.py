@@ -0,0 +1,78 @@
+"""
+Streaming the Project Manager agent as Server-Sent Events (LangGraph astream_events).
+
+Events (one JSON object per `data:` line):
+    {"type": "tool_start", "tool": "get_user_projects"}
+    {"type": "tool_end", "tool": "get_user_projects"}
+    {"type": "token", "content": "..."}           # answer tokens (tool_generator / direct_generator)
+    {"type": "done", "response": "...", "thread_id": "..."}
+    {"type": "error", "detail": "..."}
+"""
+
+import json
+import logging
+from typing import Any, AsyncIterator, Dict, Optional
+
+from langchain_core.messages import HumanMessage
+
+from src.core.context import set_request_token, set_request_user
+from .tool_cache import begin_tool_cache_turn
+
+logger = logging.getLogger(__name__)
+
+# Graph nodes whose LLM tokens are forwarded to the user (the router only emits a classification)
+STREAMED_NODES = {"tool_generator", "direct_generator"}
+
+
+def format_sse(event: Dict[str, Any]) -> str:
+    """Encode one event as an SSE frame."""
+    return f"data: {json.dumps(event, ensure_ascii=False, default=str)}\n\n"
+
+
+def _chunk_text(chunk) -> str:
+    """Text part of an AIMessageChunk (content may be a string or a list of content blocks)."""
+    content = getattr(chunk, "content", "")
+    if isinstance(content, str):
+        return content
+    return "".join(block.get("text", "") for block in content if isinstance(block, dict))
+
+
+async def stream_chat_events(agent_system, query: str, thread_id: str, token: Optional[str] = None,
+                             user_id: Optional[str] = None) -> AsyncIterator[str]:
+    """
+    Run the agent graph and yield SSE frames as tokens / tool calls happen.
+    Chat model calls inside the nodes stream automatically while astream_events is consuming them.
+    """
+    # Set inside the generator: it runs in the response task, not in the endpoint's context
+    if token:
+        set_request_token(token)
+    set_request_user(user_id)
+    begin_tool_cache_turn()
+    initial_state = {"messages": [HumanMessage(content=query)], "query": query}
+    config = {"configurable": {"thread_id": thread_id}}
+    final_output: Optional[Dict[str, Any]] = None
+
+    try:
+        async for event in agent_system.graph.astream_events(initial_state, config=config, version="v2"):
+            kind = event["event"]
+            if kind == "on_chat_model_stream":
+                if event.get("metadata", {}).get("langgraph_node") in STREAMED_NODES:
+                    text = _chunk_text(event["data"].get("chunk"))
+                    if text:
+                        yield format_sse({"type": "token", "content": text})
+            elif kind == "on_tool_start":
+                yield format_sse({"type": "tool_start", "tool": event["name"]})
+            elif kind == "on_tool_end":
+                yield format_sse({"type": "tool_end", "tool": event["name"]})
+            elif kind == "on_chain_end" and not event.get("parent_ids"):
+                # Root run: its output is this turn's final state. Reading the checkpoint afterwards
+                # (aget_state) could return a concurrent turn's message on the same thread.
+                final_output = event["data"].get("output")
+
+        messages = final_output.get("messages") if isinstance(final_output, dict) else None
+        if not messages:
+            raise RuntimeError("Agent finished without a final message")
+        yield format_sse({"type": "done", "response": messages[-1].content, "thread_id": thread_id})
+    except Exception as e:
+        logger.exception("Streaming chat failed")
+        yield format_sse({"type": "error", "detail": str(e)})
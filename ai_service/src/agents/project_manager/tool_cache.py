@@ -0,0 +1,204 @@
+"""
+Read-through cache for the Project Manager's read-only API tools.
+
+Two layers, both keyed by (tool name, arguments, user token):
+- Turn cache: lives for one chat turn (a ContextVar set by the endpoint), so repeated identical
+  calls across tool_generator -> take_action iterations hit the backend once. Concurrent identical
+  async calls share one in-flight request.
+- Shared cache (optional, API_TOOLS_CACHE_TTL > 0): short-TTL, bounded, survives across turns.
+
+Write tools (create_task, update_task_status) clear both layers on success.
+Failed results ({"success": False}) are never cached.
+"""
+
+import asyncio
+import functools
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from src.core.context import get_request_token
+
+API_TOOLS_CACHE_TTL = float(os.environ.get('API_TOOLS_CACHE_TTL', '0'))  # seconds, 0 = disabled
+API_TOOLS_CACHE_MAX_ENTRIES = int(os.environ.get('API_TOOLS_CACHE_MAX_ENTRIES', '1024'))
+
+CacheKey = Tuple[str, str, Optional[str]]
+
+
+class _TurnCache:
+    """Results and in-flight futures of one chat turn."""
+
+    def __init__(self):
+        self.results: Dict[CacheKey, Dict[str, Any]] = {}
+        self.inflight: Dict[CacheKey, asyncio.Future] = {}
+        self.generation = 0
+
+
+_turn_cache: ContextVar[Optional[_TurnCache]] = ContextVar("tool_turn_cache", default=None)
+
+
+def begin_tool_cache_turn():
+    """Start a fresh turn cache for the current context (call once per chat request)."""
+    _turn_cache.set(_TurnCache())
+
+
+class _SharedCache:
+    """Thread-safe LRU + TTL cache shared across turns."""
+
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._data: "OrderedDict[CacheKey, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.generation = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    def get(self, key: CacheKey) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: CacheKey, value: Dict[str, Any], generation: int):
+        with self._lock:
+            # A write finished while this read was in flight: the result may be stale
+            if generation != self.generation:
+                return
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.generation += 1
+
+
+_shared_cache = _SharedCache(API_TOOLS_CACHE_TTL, API_TOOLS_CACHE_MAX_ENTRIES)
+
+
+def invalidate_tool_cache():
+    """Drop every cached read (after a successful write)."""
+    turn = _turn_cache.get()
+    if turn is not None:
+        turn.results.clear()
+        turn.generation += 1
+    _shared_cache.clear()
+
+
+def _make_key(tool_name: str, args: tuple, kwargs: dict) -> CacheKey:
+    arguments = json.dumps([args, kwargs], sort_keys=True, default=str)
+    return (tool_name, arguments, get_request_token())
+
+
+def _lookup(key: CacheKey, turn: Optional[_TurnCache]) -> Optional[Dict[str, Any]]:
+    if turn is not None and key in turn.results:
+        return turn.results[key]
+    if _shared_cache.enabled:
+        value = _shared_cache.get(key)
+        if value is not None and turn is not None:
+            turn.results[key] = value
+        return value
+    return None
+
+
+def _store(key: CacheKey, value: Dict[str, Any], turn: Optional[_TurnCache],
+           turn_generation: int, shared_generation: int):
+    if not value.get("success"):
+        return
+    if turn is not None and turn.generation == turn_generation:
+        turn.results[key] = value
+    if _shared_cache.enabled:
+        _shared_cache.set(key, value, shared_generation)
+
+
+def cached_read(tool_name: str, func: Callable[..., Dict[str, Any]]) -> Callable[..., Dict[str, Any]]:
+    """Wrap a sync read-only tool body with the read-through cache."""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        key = _make_key(tool_name, args, kwargs)
+        turn = _turn_cache.get()
+        value = _lookup(key, turn)
+        if value is not None:
+            return value
+        turn_generation = turn.generation if turn is not None else 0
+        shared_generation = _shared_cache.generation
+        value = func(*args, **kwargs)
+        _store(key, value, turn, turn_generation, shared_generation)
+        return value
+    return wrapper
+
+
+def acached_read(tool_name: str, coroutine: Callable[..., Awaitable[Dict[str, Any]]]) -> Callable[..., Awaitable[Dict[str, Any]]]:
+    """Async version of cached_read; identical calls running concurrently share one request."""
+    @functools.wraps(coroutine)
+    async def wrapper(*args, **kwargs):
+        key = _make_key(tool_name, args, kwargs)
+        turn = _turn_cache.get()
+        value = _lookup(key, turn)
+        if value is not None:
+            return value
+        if turn is None:
+            return await coroutine(*args, **kwargs)
+
+        pending = turn.inflight.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        turn.inflight[key] = future
+        turn_generation = turn.generation
+        shared_generation = _shared_cache.generation
+        try:
+            value = await coroutine(*args, **kwargs)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Nobody else may be waiting: avoid "exception was never retrieved" warnings
+            future.exception()
+            raise
+        else:
+            future.set_result(value)
+            _store(key, value, turn, turn_generation, shared_generation)
+            return value
+        finally:
+            turn.inflight.pop(key, None)
+    return wrapper
+
+
+def invalidating_write(func: Callable[..., Dict[str, Any]]) -> Callable[..., Dict[str, Any]]:
+    """Wrap a sync write tool body: a successful write clears the cache."""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        value = func(*args, **kwargs)
+        if value.get("success"):
+            invalidate_tool_cache()
+        return value
+    return wrapper
+
+
+def ainvalidating_write(coroutine: Callable[..., Awaitable[Dict[str, Any]]]) -> Callable[..., Awaitable[Dict[str, Any]]]:
+    """Async version of invalidating_write."""
+    @functools.wraps(coroutine)
+    async def wrapper(*args, **kwargs):
+        value = await coroutine(*args, **kwargs)
+        if value.get("success"):
+            invalidate_tool_cache()
+        return value
+    return wrapper
@@ -1,10 +1,16 @@
-from fastapi import APIRouter, HTTPException, BackgroundTasks, Header
+import asyncio
+from dataclasses import asdict
+from fastapi import APIRouter, HTTPException, BackgroundTasks, Header, Request
 from typing import Optional
-from src.schemas.meeting import MeetingAnalyzeRequest, MeetingAnalyzeResponse, MeetingConfirmRequest
-from src.agents.meeting_to_task.agent import MeetingToTaskAgent
-from src.agents.meeting_to_task.tools import create_tasks
+from src.schemas.meeting import MeetingAnalyzeRequest, MeetingAnalyzeResponse, MeetingConfirmRequest, LiveSTTResponse
 from src.core.context import set_request_token
 
+
+def get_meeting_agent():
+    """Shared MeetingToTaskAgent; the agent module (LangGraph, LLM clients) is imported on first use."""
+    from src.agents.meeting_to_task.agent import get_meeting_agent as _get_meeting_agent
+    return _get_meeting_agent()
+
 router = APIRouter()
 
 def run_meeting_agent(meeting_id: str, audio_path: str, transcript: str, metadata: dict, auth_token: Optional[str]):
@@ -13,7 +19,7 @@ def run_meeting_agent(meeting_id: str, audio_path: str, transcript: str, metadat
     if auth_token:
         set_request_token(auth_token)
         
-    agent = MeetingToTaskAgent()
+    agent = get_meeting_agent()
     agent.run(
         audio_file_path=audio_path, 
         transcript=transcript, 
@@ -84,9 +90,12 @@ async def analyze_meeting(
             if token:
                 set_request_token(token)
                 
-            agent = MeetingToTaskAgent()
+            # The agent (transcription, LLM calls, checkpointer) is blocking: run it in a worker thread
+            # so the event loop keeps serving other requests. to_thread copies the context (request token).
+            agent = await asyncio.to_thread(get_meeting_agent)
             # Run agent and wait for result
-            final_state, thread_config = agent.run(
+            final_state, thread_config = await asyncio.to_thread(
+                agent.run,
                 audio_file_path=request.audio_file_path, 
                 transcript=request.transcript, 
                 meeting_metadata=meeting_metadata, 
@@ -104,7 +113,7 @@ async def analyze_meeting(
                     transcript=final_state.get("transcript")
                 )
             
-            final_actions = agent.continue_after_review(thread_config)
+            final_actions = await asyncio.to_thread(agent.continue_after_review, thread_config)
             
             # Update final_state with the results from the second phase
             if final_actions:
@@ -146,11 +155,12 @@ async def confirm_meeting(
         updated_action_items = [item.model_dump() for item in request.updated_action_items] if request.updated_action_items else []
         
         # Resume the agent
-        agent = MeetingToTaskAgent()
+        agent = await asyncio.to_thread(get_meeting_agent)
         thread_config = {'configurable': {'thread_id': request.meeting_id}}
         
-        # This will run the remaining nodes (create_tasks -> END)
-        final_state_updates = agent.continue_after_review(
+        # This will run the remaining nodes (create_tasks -> END), off the event loop
+        final_state_updates = await asyncio.to_thread(
+            agent.continue_after_review,
             thread=thread_config,
             updated_summary=request.updated_summary,
             updated_action_items=updated_action_items
@@ -169,3 +179,39 @@ async def confirm_meeting(
         import traceback
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/stt/stats")
+def local_stt_stats():
+    """Local faster-whisper engine: model config and job queue counters."""
+    from src.agents.meeting_to_task.stt_engine import get_stt_engine
+    return get_stt_engine().stats()
+
+
+# Longest rolling window accepted from the live transcription stream (seconds of audio)
+LIVE_STT_MAX_WINDOW_SECONDS = 120
+
+
+@router.post("/stt/live", response_model=LiveSTTResponse)
+async def live_stt_window(request: Request, sample_rate: int = 16000, language: Optional[str] = None):
+    """
+    Transcribe one rolling window of a live meeting with the local faster-whisper engine.
+    Body: raw 16-bit little-endian mono PCM at 16 kHz. Segment times are relative to the window start.
+    The job goes through the engine queue, so concurrent meetings share the configured workers.
+    """
+    from src.agents.meeting_to_task.stt_engine import SAMPLE_RATE, WHISPER_LANGUAGE, get_stt_engine, pcm16_to_float32
+
+    if sample_rate != SAMPLE_RATE:
+        raise HTTPException(status_code=400, detail=f"Only {SAMPLE_RATE} Hz audio is supported")
+    body = await request.body()
+    if len(body) > LIVE_STT_MAX_WINDOW_SECONDS * SAMPLE_RATE * 2:
+        raise HTTPException(status_code=413, detail=f"Window longer than {LIVE_STT_MAX_WINDOW_SECONDS}s")
+
+    samples = pcm16_to_float32(body)
+    duration = len(samples) / SAMPLE_RATE
+    if not len(samples):
+        return LiveSTTResponse(duration=0.0)
+
+    future = get_stt_engine().submit(samples, language=language or WHISPER_LANGUAGE)
+    segments = await asyncio.wrap_future(future)
+    return LiveSTTResponse(duration=duration, segments=[asdict(s) for s in segments])
@@ -1,30 +1,62 @@
 from fastapi import APIRouter, HTTPException, Header
-from typing import Optional
+from fastapi.responses import StreamingResponse
+import asyncio
+from typing import TYPE_CHECKING, Optional
 from src.schemas.chat import ChatRequest, ChatResponse
-# Import the agent class
-from src.agents.project_manager.agent import AgenticProjectManager
-from src.core.context import set_request_token
-from langchain_core.messages import HumanMessage
+from src.agents.project_manager.tool_cache import begin_tool_cache_turn
+from src.core.context import set_request_token, set_request_user
+
+# The agent modules (LangGraph, LangChain, psycopg) are imported on first use, not at app import
+if TYPE_CHECKING:
+    from src.agents.project_manager.agent import AgenticProjectManager
 
 router = APIRouter()
 
-# Global instance (In production, use dependency injection or cache)
-agent_system = AgenticProjectManager()
-# Note: Re-building graph might be needed if tools depend on init, but they are dynamic.
+# Global instance, created on first use (opening the async checkpointer pool needs a running event loop)
+_agent_system: Optional["AgenticProjectManager"] = None
+_agent_lock = asyncio.Lock()
+
+
+async def get_agent_system() -> "AgenticProjectManager":
+    global _agent_system
+    if _agent_system is None:
+        async with _agent_lock:
+            if _agent_system is None:
+                from src.agents.project_manager.agent import AgenticProjectManager
+                _agent_system = await AgenticProjectManager.create()
+    return _agent_system
+
+
+def is_agent_system_ready() -> bool:
+    return _agent_system is not None
+
+
+async def close_agent_system():
+    """Close the agent's checkpointer pool (application shutdown)."""
+    global _agent_system
+    if _agent_system is not None:
+        await _agent_system.aclose()
+        _agent_system = None
+
 
 @router.post("/chat", response_model=ChatResponse)
-def chat_project_manager(
+async def chat_project_manager(
     request: ChatRequest,
     authorization: Optional[str] = Header(None)
 ):
     """
     Send a message to the Project Manager AI Agent.
     """
+    from langchain_core.messages import HumanMessage
+
     try:
         # Set Auth Context
         if authorization:
             token = authorization.replace("Bearer ", "") if authorization.startswith("Bearer ") else authorization
             set_request_token(token)
+        set_request_user(request.user_id)
+        # Dedupe identical read-only tool calls within this turn
+        begin_tool_cache_turn()
 
         # Prepare input for LangGraph
         initial_state = {
@@ -35,7 +67,8 @@ def chat_project_manager(
         # Invoke the graph
         # Pass thread_id to enable memory checkpointing
         config = {"configurable": {"thread_id": request.thread_id}}
-        result = agent_system.graph.invoke(initial_state, config=config)
+        agent_system = await get_agent_system()
+        result = await agent_system.graph.ainvoke(initial_state, config=config)
         
         # Extract the last message content
         last_message = result['messages'][-1]
@@ -49,3 +82,26 @@ def chat_project_manager(
         import traceback
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/chat/stream")
+async def chat_project_manager_stream(
+    request: ChatRequest,
+    authorization: Optional[str] = Header(None)
+):
+    """
+    Streaming version of /chat (Server-Sent Events).
+    Emits answer tokens and "calling tool X" events as they happen instead of waiting for the full answer.
+    """
+    from src.agents.project_manager.streaming import stream_chat_events
+
+    token = None
+    if authorization:
+        token = authorization.replace("Bearer ", "") if authorization.startswith("Bearer ") else authorization
+
+    agent_system = await get_agent_system()
+    return StreamingResponse(
+        stream_chat_events(agent_system, request.query, request.thread_id, token, request.user_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
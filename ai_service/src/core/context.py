@@ -12,3 +12,15 @@ def set_request_token(token: str):
 def get_request_token() -> Optional[str]:
     """Get the token from the current context."""
     return _request_token.get()
+
+# Id of the user the request is made for, verified by the backend server (it authenticates the JWT
+# before calling this service). Used to partition per-user caches.
+_request_user: ContextVar[Optional[str]] = ContextVar("request_user", default=None)
+
+def set_request_user(user_id: Optional[str]):
+    """Set the verified user id for the current context."""
+    _request_user.set(user_id)
+
+def get_request_user() -> Optional[str]:
+    """Get the verified user id from the current context."""
+    return _request_user.get()
@@ -1,19 +1,84 @@
+import asyncio
+import logging
+import os
+import sys
 import warnings
+from contextlib import asynccontextmanager
+from typing import Optional
 
 # Suppress warnings from langchain_google_genai using deprecated google.generativeai
 warnings.filterwarnings("ignore", message=".*google.generativeai.*", category=FutureWarning)
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from src.core.config import settings
 from src.core.logging import setup_logging
 from src.api.v1.api import api_router
+from src.api.v1.endpoints.project import close_agent_system, get_agent_system, is_agent_system_ready
+
+# psycopg's async driver (AsyncPostgresSaver) does not support the Proactor event loop on Windows
+if sys.platform == "win32":
+    asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
 
 # Setup Logging
 setup_logging()
+logger = logging.getLogger(__name__)
+
+# Build agents in the background right after startup (set to false for tests / one-off scripts:
+# agents are then built on first use)
+AI_WARMUP_ON_STARTUP = os.getenv("AI_WARMUP_ON_STARTUP", "true").lower() == "true"
+
+_warmup_task: Optional[asyncio.Task] = None
+_warmup_errors: dict = {}
+
+
+async def warm_up():
+    """Import the heavy modules, create the LLM clients and compile the agent graphs."""
+    try:
+        from src.agents.meeting_to_task.agent import get_meeting_agent
+        await asyncio.to_thread(get_meeting_agent)
+        _warmup_errors.pop("meeting_agent", None)
+    except Exception as e:
+        _warmup_errors["meeting_agent"] = str(e)
+        logger.warning(f"Meeting agent warm-up failed: {e}")
+    try:
+        from src.agents.meeting_to_task.stt_engine import WHISPER_PRELOAD, get_stt_engine
+        if WHISPER_PRELOAD:
+            await asyncio.to_thread(get_stt_engine().warm_up)
+    except Exception as e:
+        # Not fatal: Gemini transcription does not need it
+        logger.warning(f"Local STT warm-up failed: {e}")
+    try:
+        await get_agent_system()
+        _warmup_errors.pop("project_agent", None)
+    except Exception as e:
+        # Not fatal: the chat endpoints (and /ready) retry the creation
+        _warmup_errors["project_agent"] = str(e)
+        logger.warning(f"Project manager agent warm-up failed: {e}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # The server accepts connections immediately; /ready reports when the warm-up is done
+    global _warmup_task
+    if AI_WARMUP_ON_STARTUP:
+        _warmup_task = asyncio.create_task(warm_up())
+    yield
+    if _warmup_task is not None and not _warmup_task.done():
+        _warmup_task.cancel()
+    await close_agent_system()
+    if "src.agents.meeting_to_task.stt_engine" in sys.modules:
+        from src.agents.meeting_to_task.stt_engine import get_stt_engine
+        get_stt_engine().shutdown()
+    if "src.agents.project_manager.api_tools" in sys.modules:
+        from src.agents.project_manager.api_tools import aclose_api_clients
+        await aclose_api_clients()
+
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
+    lifespan=lifespan,
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
     docs_url=f"{settings.API_V1_STR}/docs",
     redoc_url=f"{settings.API_V1_STR}/redoc",
@@ -33,8 +98,26 @@ app.include_router(api_router, prefix=settings.API_V1_STR)
 
 @app.get("/health")
 def health_check():
+    """Liveness: the process is up (does not wait for the agents)."""
     return {"status": "ok", "app": settings.PROJECT_NAME}
 
+@app.get("/ready")
+async def readiness_check():
+    """Readiness: warm-up finished and the project manager agent (checkpointer pool) is available."""
+    if _warmup_task is not None and not _warmup_task.done():
+        return JSONResponse(status_code=503, content={"status": "warming_up"})
+
+    if _warmup_task is not None and not is_agent_system_ready():
+        try:
+            await get_agent_system()
+            _warmup_errors.pop("project_agent", None)
+        except Exception as e:
+            _warmup_errors["project_agent"] = str(e)
+
+    if _warmup_errors:
+        return JSONResponse(status_code=503, content={"status": "not_ready", "errors": _warmup_errors})
+    return {"status": "ready", "warmup": AI_WARMUP_ON_STARTUP}
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("src.main:app", host="0.0.0.0", port=8001, reload=True)
@@ -1,3 +1,3 @@
-from .models import call_llm, embedding_model
+from .models import call_llm, embedding_model, get_llm, get_embedding_model
 
-__all__ = ['call_llm', 'embedding_model']
\ No newline at end of file
+__all__ = ['call_llm', 'embedding_model', 'get_llm', 'get_embedding_model']
\ No newline at end of file
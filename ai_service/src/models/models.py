@@ -1,6 +1,15 @@
 # Lazy imports for heavy ML models - only import when needed
+import threading
+from typing import Dict, Tuple
+
 from src.core.config import settings
 
+# Process-wide client registries: building a chat/embedding client (HTTP session, auth, schema setup)
+# is done once per configuration instead of once per request. LangChain models are safe to share.
+_llm_registry: Dict[Tuple, object] = {}
+_embedding_registry: Dict[str, object] = {}
+_registry_lock = threading.Lock()
+
 def embedding_model(model_provider: str = "gemini"):
     """
     Get embedding model based on provider
@@ -60,3 +69,36 @@ def call_llm(model_provider: str = "gemini",
         raise ValueError(f"Unsupported model: {model_provider}")
     
     return llm
+
+
+def get_llm(model_provider: str = "gemini",
+            model_name: str = "",
+            temperature: float = 1.0,
+            top_p: float = 0.95,
+            max_tokens = None
+    ):
+    """
+    Shared LLM client for (provider, model, params); created with call_llm on first use
+    """
+    key = (model_provider, model_name, temperature, top_p, max_tokens)
+    llm = _llm_registry.get(key)
+    if llm is None:
+        with _registry_lock:
+            llm = _llm_registry.get(key)
+            if llm is None:
+                llm = call_llm(model_provider, model_name, temperature, top_p, max_tokens)
+                _llm_registry[key] = llm
+    return llm
+
+def get_embedding_model(model_provider: str = "gemini"):
+    """
+    Shared embedding client per provider; created with embedding_model on first use
+    """
+    model = _embedding_registry.get(model_provider)
+    if model is None:
+        with _registry_lock:
+            model = _embedding_registry.get(model_provider)
+            if model is None:
+                model = embedding_model(model_provider)
+                _embedding_registry[model_provider] = model
+    return model
@@ -4,6 +4,8 @@ from typing import List, Optional, Any
 class ChatRequest(BaseModel):
     query: str
     thread_id: str = "default_thread"
+    # Set by the backend server from the authenticated user (keys the per-user semantic cache)
+    user_id: Optional[str] = None
 
 class ChatResponse(BaseModel):
     response: str
@@ -47,3 +47,12 @@ class MeetingConfirmRequest(BaseModel):
     project_id: Optional[str] = None
     author_id: Optional[str] = None
     participants: List[MeetingParticipant] = []
+
+class LiveSTTSegment(BaseModel):
+    start: float # seconds from the start of the window
+    end: float
+    text: str
+
+class LiveSTTResponse(BaseModel):
+    duration: float # window length in seconds
+    segments: List[LiveSTTSegment] = []
@@ -37,6 +37,21 @@ api.interceptors.request.use((config) => {
     return config;
 });
 
+// --- HELPER: PHÂN TRANG THEO CON TRỎ (CURSOR PAGINATION) ---
+// Backend trả con trỏ trang kế tiếp trong header X-Next-Cursor (không có header = trang cuối).
+// Chỉ tải trang đầu để hiển thị ngay; các trang sau tải khi cuộn tới cuối / bấm "Load more".
+export const PAGE_SIZE = 50;
+
+export interface Page<T> {
+    items: T[];
+    nextCursor?: string; // undefined = đã hết dữ liệu
+}
+
+async function getPage(url: string, params: Record<string, any> = {}, cursor?: string): Promise<Page<any>> {
+    const res = await api.get(url, { params: { ...params, limit: PAGE_SIZE, cursor } });
+    return { items: res.data, nextCursor: res.headers['x-next-cursor'] || undefined };
+}
+
 // --- HELPER: PHIÊN DỊCH VIÊN (MAPPERS) ---
 // Frontend (camelCase) <-> Backend (snake_case)
 
@@ -139,10 +154,16 @@ export async function uploadAvatar(file: File): Promise<string> {
 
 /**
  * Láy dữ liệu khởi đầu: Toàn bộ Projects và Users liên quan.
+ * Danh sách dự án (thanh bên) cần đủ ngay nên đi hết các trang; mỗi trang vẫn bị giới hạn kích thước.
  */
 export async function getInitialData(): Promise<{ projects: Project[], users: User[] }> {
-    const res = await api.get('/projects/');
-    const rawData = res.data;
+    const rawData: any[] = [];
+    let cursor: string | undefined;
+    do {
+        const page = await getPage('/projects/', {}, cursor);
+        rawData.push(...page.items);
+        cursor = page.nextCursor;
+    } while (cursor);
     const projects = rawData.map(mapProject);
     const uniqueUsersMap = new Map<string, User>();
 
@@ -187,12 +208,11 @@ export async function deleteProject(projectId: string): Promise<void> {
 
 // --- 3. TASKS (CÔNG VIỆC) ---
 
-/** Lấy danh sách nhiệm vụ của Project */
-export async function getTasksByProject(projectId: string, statusFilter?: string): Promise<Task[]> {
-    let url = `/tasks/${projectId}`;
-    if (statusFilter) url += `?status_filter=${statusFilter}`;
-    const res = await api.get(url);
-    return res.data.map(mapTask);
+/** Lấy một trang nhiệm vụ của Project (cursor: con trỏ từ trang trước, bỏ trống = trang đầu) */
+export async function getTasksByProject(projectId: string, statusFilter?: string, cursor?: string): Promise<Page<Task>> {
+    const params = statusFilter ? { status_filter: statusFilter } : {};
+    const page = await getPage(`/tasks/${projectId}`, params, cursor);
+    return { items: page.items.map(mapTask), nextCursor: page.nextCursor };
 }
 
 /** Tạo nhiệm vụ mới */
@@ -241,10 +261,10 @@ export async function deleteTask(taskId: string): Promise<void> {
 
 // --- 4. MEETINGS (LỊCH HỌP) ---
 
-/** Lấy danh sách cuộc họp của Project */
-export async function getMeetingsByProject(projectId: string): Promise<Meeting[]> {
-    const res = await api.get(`/meetings/${projectId}`);
-    return res.data.map(mapMeeting);
+/** Lấy một trang cuộc họp của Project (cursor: con trỏ từ trang trước, bỏ trống = trang đầu) */
+export async function getMeetingsByProject(projectId: string, cursor?: string): Promise<Page<Meeting>> {
+    const page = await getPage(`/meetings/${projectId}`, {}, cursor);
+    return { items: page.items.map(mapMeeting), nextCursor: page.nextCursor };
 }
 
 /** Tạo cuộc họp mới */
@@ -319,3 +339,60 @@ export async function chatWithProjectManager(message: string, projectId?: string
     });
     return res.data.response;
 }
+
+/** Sự kiện streaming từ Trợ lý Quản lý dự án (Server-Sent Events) */
+export type ChatStreamEvent =
+    | { type: 'token'; content: string }
+    | { type: 'tool_start'; tool: string }
+    | { type: 'tool_end'; tool: string; error?: string }
+    | { type: 'done'; response: string; thread_id: string }
+    | { type: 'error'; detail: string };
+
+/**
+ * Chat dạng streaming với Trợ lý Quản lý dự án.
+ * Nhận từng token câu trả lời và sự kiện "đang gọi tool" ngay khi Agent sinh ra (SSE qua fetch,
+ * vì EventSource không gửi được POST và header Authorization).
+ */
+export async function streamChatWithProjectManager(
+    message: string,
+    userId: string | undefined,
+    onEvent: (event: ChatStreamEvent) => void,
+    signal?: AbortSignal
+): Promise<void> {
+    const token = localStorage.getItem('access_token');
+    const res = await fetch(`${api.defaults.baseURL}/ai/chat/stream`, {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+            ...(token ? { Authorization: `Bearer ${token}` } : {})
+        },
+        body: JSON.stringify({ message, thread_id: `user_${userId || 'guest'}` }),
+        signal
+    });
+    if (!res.ok || !res.body) {
+        throw new Error(`Chat stream failed: ${res.status}`);
+    }
+
+    const reader = res.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+
+        // Mỗi sự kiện SSE kết thúc bằng một dòng trống
+        let boundary = buffer.indexOf('\n\n');
+        while (boundary !== -1) {
+            const frame = buffer.slice(0, boundary);
+            buffer = buffer.slice(boundary + 2);
+            const data = frame
+                .split('\n')
+                .filter(line => line.startsWith('data:'))
+                .map(line => line.slice(5).trimStart())
+                .join('\n');
+            if (data) onEvent(JSON.parse(data));
+            boundary = buffer.indexOf('\n\n');
+        }
+    }
+}
@@ -41,6 +41,10 @@ export default function App() {
   const [projects, setProjects] = useState<Project[]>([]);              // Danh sách dự án
   const [meetings, setMeetings] = useState<Meeting[]>([]);              // Danh sách cuộc họp
   const [users, setUsers] = useState<User[]>([]);                       // Danh sách người dùng hệ thống
+  // Con trỏ trang kế tiếp theo từng dự án (không có = đã tải hết)
+  const [taskCursors, setTaskCursors] = useState<Record<string, string | undefined>>({});
+  const [meetingCursors, setMeetingCursors] = useState<Record<string, string | undefined>>({});
+  const [isLoadingMore, setIsLoadingMore] = useState(false);
 
   // --- QUẢN LÝ HIỂN THỊ (VIEW STATE) ---
   const [activeProject, setActiveProject] = useState<Project | null>(null); // Dự án đang được chọn
@@ -109,7 +113,7 @@ export default function App() {
 
   /**
    * Làm mới toàn bộ dữ liệu từ Server.
-   * Lấy: Projects, Users liên quan, Tasks và Meetings.
+   * Lấy: Projects, Users liên quan, trang đầu Tasks và Meetings của mỗi dự án (trang sau: loadMore).
    */
   const refreshData = async () => {
     if (!currentUser) return;
@@ -122,13 +126,13 @@ export default function App() {
       fetchedUsers.forEach(u => allUsersMap.set(u.id, u));
       setUsers(Array.from(allUsersMap.values()));
 
-      const taskPromises = fetchedProjects.map(p => api.getTasksByProject(p.id));
-      const allTasks = (await Promise.all(taskPromises)).flat();
-      setTasks(allTasks);
+      const taskPages = await Promise.all(fetchedProjects.map(p => api.getTasksByProject(p.id)));
+      setTasks(taskPages.flatMap(page => page.items));
+      setTaskCursors(Object.fromEntries(fetchedProjects.map((p, i) => [p.id, taskPages[i].nextCursor])));
 
-      const meetingPromises = fetchedProjects.map(p => api.getMeetingsByProject(p.id));
-      const allMeetings = (await Promise.all(meetingPromises)).flat();
-      setMeetings(allMeetings);
+      const meetingPages = await Promise.all(fetchedProjects.map(p => api.getMeetingsByProject(p.id)));
+      setMeetings(meetingPages.flatMap(page => page.items));
+      setMeetingCursors(Object.fromEntries(fetchedProjects.map((p, i) => [p.id, meetingPages[i].nextCursor])));
 
     } catch (error) {
       console.error("Error fetching data", error);
@@ -265,6 +269,49 @@ export default function App() {
   const currentProjectTasks = activeProject ? tasks.filter(t => t.projectId === activeProject.id) : [];
   const currentProjectMeetings = activeProject ? meetings.filter(m => m.projectId === activeProject.id) : [];
 
+  // --- TẢI THÊM (PHÂN TRANG) ---
+  // Chế độ xem Meetings tải thêm cuộc họp; Timeline tải cả hai; các chế độ còn lại tải thêm công việc
+  const wantsMeetings = viewMode === 'MEETING' || viewMode === 'TIMELINE';
+  const wantsTasks = viewMode !== 'MEETING';
+  const hasMore = !!activeProject && (
+    (wantsTasks && !!taskCursors[activeProject.id]) || (wantsMeetings && !!meetingCursors[activeProject.id])
+  );
+
+  const appendUnique = <T extends { id: string }>(prev: T[], items: T[]) => {
+    const seen = new Set(prev.map(item => item.id));
+    return [...prev, ...items.filter(item => !seen.has(item.id))];
+  };
+
+  const loadMore = async () => {
+    if (!activeProject || !hasMore || isLoadingMore) return;
+    const projectId = activeProject.id;
+    setIsLoadingMore(true);
+    try {
+      const taskCursor = wantsTasks ? taskCursors[projectId] : undefined;
+      if (taskCursor) {
+        const page = await api.getTasksByProject(projectId, undefined, taskCursor);
+        setTasks(prev => appendUnique(prev, page.items));
+        setTaskCursors(prev => ({ ...prev, [projectId]: page.nextCursor }));
+      }
+      const meetingCursor = wantsMeetings ? meetingCursors[projectId] : undefined;
+      if (meetingCursor) {
+        const page = await api.getMeetingsByProject(projectId, meetingCursor);
+        setMeetings(prev => appendUnique(prev, page.items));
+        setMeetingCursors(prev => ({ ...prev, [projectId]: page.nextCursor }));
+      }
+    } catch (err) {
+      console.error("Failed to load more", err);
+    } finally {
+      setIsLoadingMore(false);
+    }
+  };
+
+  /** Cuộn gần tới cuối vùng nội dung: tự động tải trang kế tiếp */
+  const handleContentScroll = (e: React.UIEvent<HTMLDivElement>) => {
+    const el = e.currentTarget;
+    if (el.scrollHeight - el.scrollTop - el.clientHeight < 200) loadMore();
+  };
+
   return (
     <div className="flex h-screen bg-slate-50 text-slate-900 relative">
       {/* Lớp phủ cho Mobile Sidebar */}
@@ -366,7 +413,7 @@ export default function App() {
               </div>
             </header>
 
-            <div className="flex-1 overflow-y-auto bg-slate-50 relative">
+            <div className="flex-1 overflow-y-auto bg-slate-50 relative" onScroll={handleContentScroll}>
               {viewMode === 'BOARD' && (
                 <BoardView tasks={currentProjectTasks} columns={boardColumns} users={users} onMove={handleTaskMove} onNew={() => setTaskModalOpen(true)} onEdit={(t) => { setTaskToEdit(t); setEditTaskModalOpen(true); }} onAddColumn={() => setAddColumnModalOpen(true)} onEditColumn={(c) => { setCurrentEditingColumn(c); setEditColumnModalOpen(true); }} onDelete={handleDeleteTask} />
               )}
@@ -374,6 +421,17 @@ export default function App() {
               {viewMode === 'TABLE' && <TableView tasks={currentProjectTasks} users={users} onDelete={handleDeleteTask} />}
               {viewMode === 'TIMELINE' && <TimelineView tasks={currentProjectTasks} meetings={currentProjectMeetings} />}
               {viewMode === 'MEETING' && <MeetingView meetings={currentProjectMeetings} currentUser={currentUser} users={users} onOpenDetail={() => { }} onDelete={handleDeleteMeeting} />}
+              {hasMore && (
+                <div className="flex justify-center py-4">
+                  <button
+                    onClick={loadMore}
+                    disabled={isLoadingMore}
+                    className="px-4 py-2 rounded-lg text-sm font-medium bg-white border border-slate-200 text-slate-600 hover:bg-slate-100 shadow-sm transition disabled:opacity-50"
+                  >
+                    {isLoadingMore ? 'Loading...' : 'Load more'}
+                  </button>
+                </div>
+              )}
             </div>
           </>
         )}
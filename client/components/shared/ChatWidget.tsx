@@ -15,6 +15,7 @@ interface Message {
   sender: 'user' | 'bot';
   text: string;
   timestamp: Date;
+  status?: string; // Trạng thái trung gian khi đang streaming (VD: "Đang gọi get_user_projects...")
 }
 
 export default function ChatWidget({ projectId, onRefresh }: { projectId?: string; onRefresh?: () => void }) {
@@ -26,6 +27,7 @@ export default function ChatWidget({ projectId, onRefresh }: { projectId?: strin
   ]);
   const [inputValue, setInputValue] = useState(''); // Giá trị nhập vào
   const [isLoading, setIsLoading] = useState(false); // Trạng thái đang đợi AI phản hồi
+  const [isStreaming, setIsStreaming] = useState(false); // Đã nhận token đầu tiên, câu trả lời đang hiện dần
   const messagesEndRef = useRef<HTMLDivElement>(null); // Để tự động cuộn xuống cuối tin nhắn
 
   // Cuộn xuống khi có tin nhắn mới hoặc mở chat
@@ -48,31 +50,57 @@ export default function ChatWidget({ projectId, onRefresh }: { projectId?: strin
     setInputValue('');
     setIsLoading(true);
 
-    try {
-      // Gọi API AI Agent (ProjectManagerAgent)
-      const responseText = await api.chatWithProjectManager(inputValue, projectId, user?.id);
+    // Tin nhắn của bot được tạo ngay và cập nhật dần theo từng token
+    const botId = (Date.now() + 1).toString();
+    let started = false;
+    const updateBot = (patch: Partial<Message>) => {
+      if (!started) {
+        started = true;
+        setIsStreaming(true);
+        setMessages(prev => [...prev, { id: botId, sender: 'bot', text: '', timestamp: new Date(), ...patch }]);
+        return;
+      }
+      setMessages(prev => prev.map(m => (m.id === botId ? { ...m, ...patch } : m)));
+    };
 
-      const botMsg: Message = {
-        id: (Date.now() + 1).toString(),
-        sender: 'bot',
-        text: responseText,
-        timestamp: new Date()
-      };
-      setMessages(prev => [...prev, botMsg]);
+    let answer = '';
+    let usedTools = false;
+    try {
+      // Gọi API AI Agent (ProjectManagerAgent) dạng streaming
+      await api.streamChatWithProjectManager(inputValue, user?.id, (event) => {
+        if (event.type === 'token') {
+          answer += event.content;
+          updateBot({ text: answer, status: undefined });
+        } else if (event.type === 'tool_start') {
+          usedTools = true;
+          updateBot({ text: answer, status: `Đang gọi ${event.tool}...` });
+        } else if (event.type === 'done') {
+          answer = event.response;
+          updateBot({ text: answer, status: undefined });
+        } else if (event.type === 'error') {
+          updateBot({ text: event.detail, status: undefined });
+        }
+      });
 
       // Nếu AI có thay đổi task/project, refresh lại UI cha
-      if (onRefresh) onRefresh();
+      if (usedTools && onRefresh) onRefresh();
 
     } catch (error) {
       console.error("Chat error:", error);
-      setMessages(prev => [...prev, {
-        id: Date.now().toString(),
-        sender: 'bot',
-        text: "Sorry, the system is busy. Please try again later.",
-        timestamp: new Date()
-      }]);
+      const errorText = "Sorry, the system is busy. Please try again later.";
+      if (started) {
+        updateBot({ text: errorText, status: undefined });
+      } else {
+        setMessages(prev => [...prev, {
+          id: Date.now().toString(),
+          sender: 'bot',
+          text: errorText,
+          timestamp: new Date()
+        }]);
+      }
     } finally {
       setIsLoading(false);
+      setIsStreaming(false);
     }
   };
 
@@ -150,6 +178,11 @@ export default function ChatWidget({ projectId, onRefresh }: { projectId?: strin
                   }`}>
                   {msg.sender === 'bot' ? (
                     <div className="prose prose-sm max-w-none">
+                      {msg.status && (
+                        <p className="flex items-center gap-1.5 text-xs text-indigo-500 not-prose">
+                          <Loader2 size={12} className="animate-spin" /> {msg.status}
+                        </p>
+                      )}
                       <ReactMarkdown>{msg.text}</ReactMarkdown>
                     </div>
                   ) : (
@@ -160,7 +193,7 @@ export default function ChatWidget({ projectId, onRefresh }: { projectId?: strin
             ))}
 
             {/* Trạng thái AI đang gõ */}
-            {isLoading && (
+            {isLoading && !isStreaming && (
               <div className="flex flex-col items-start animate-pulse">
                 <div className="bg-white border border-slate-200 rounded-2xl rounded-tl-none px-4 py-3">
                   <div className="flex gap-1">
@@ -40,7 +40,9 @@ const MeetingView: React.FC<MeetingViewProps> = ({ meetings, currentUser, users,
     /** Mở ứng dụng Video Call (Hệ thống chạy trên Flask riêng) */
     const handleJoinMeeting = (meetingId: string) => {
         const meetingServerUrl = "http://localhost:5000";
-        const targetUrl = `${meetingServerUrl}/?room=${meetingId}&name=${encodeURIComponent(currentUser.name)}`;
+        // Token đặt trong fragment (#): không gửi lên Flask server, không ghi vào log; dùng cho API / ghi chép trực tiếp
+        const token = localStorage.getItem('access_token') || '';
+        const targetUrl = `${meetingServerUrl}/?room=${meetingId}&name=${encodeURIComponent(currentUser.name)}#token=${encodeURIComponent(token)}`;
         window.open(targetUrl, '_blank');
     };
 
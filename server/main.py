@@ -1,13 +1,42 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles # Import cái này
 # --- API Router ---
 from src.api import router as api_router
+from src.realtime.main_socket import socket_app
 
 # --- Database ---
-from src.core.database import create_db_tables
+from src.core.database import create_db_tables, dispose_async_engine
+from src.core.http_client import get_ai_http_client, close_ai_http_client
+from src.services.meeting_service import backfill_transcript_indexes
 
-app = FastAPI(title="JiraMeet API")
+
+# --- Lifespan (Startup / Shutdown) ---
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Startup: tạo bảng DB và HTTP Client dùng chung tới AI Service
+    print("Attempting to create database tables...")
+    try:
+        create_db_tables()
+        print("Database tables created successfully or already exist.")
+    except Exception as e:
+        print(f"❌ Error creating database tables: {e}")
+    # Chỉ mục transcript thiếu / cũ được xây lại chạy ngầm, không để Request tìm kiếm đầu tiên phải chờ
+    try:
+        backfill_transcript_indexes()
+    except Exception as e:
+        print(f"❌ Error scheduling transcript index backfill: {e}")
+    get_ai_http_client()
+
+    yield
+
+    # Shutdown: đóng Connection Pool tới AI Service và Async DB Pool
+    await close_ai_http_client()
+    await dispose_async_engine()
+
+
+app = FastAPI(title="JiraMeet API", lifespan=lifespan)
 
 # --- CORS ---
 origins = [
@@ -27,6 +56,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],  # Con trỏ phân trang (keyset pagination)
 )
 
 
@@ -34,6 +64,9 @@ app.add_middleware(
 app.include_router(api_router, prefix="/api")
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
+# --- Socket.IO (signaling, chia sẻ file, ghi chép trực tiếp cuộc họp) ---
+app.mount("/socket.io", socket_app)
+
 
 # --- Health Check ---
 @app.get("/", tags=["Health Check"])
@@ -41,17 +74,6 @@ def root():
     return {"message": "JiraMeet AI Backend is operational! Visit /docs for API documentation."}
 
 
-# --- Startup Event (Create DB Tables) ---
-@app.on_event("startup")
-def on_startup():
-    print("Attempting to create database tables...")
-    try:
-        create_db_tables()
-        print("Database tables created successfully or already exist.")
-    except Exception as e:
-        print(f"❌ Error creating database tables: {e}")
-
-
 # --- Run server locally ---
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,60 @@
+"""
+server/migrate.py
+Chạy migration cơ sở dữ liệu (an toàn khi chạy lại nhiều lần).
+
+Cách dùng:
+    python migrate.py                 # Áp dụng các migration còn thiếu
+    python migrate.py --status        # Xem migration đã/chưa áp dụng
+    python migrate.py --force         # Chạy lại tất cả (idempotent)
+    python migrate.py --index-usage   # Thống kê mức độ sử dụng index
+"""
+
+import argparse
+
+from src.core.database import engine
+from src.core.migrations import MIGRATIONS, get_applied_versions, get_index_usage, run_migrations
+
+
+def migrate(target: str = None, force: bool = False):
+    try:
+        executed = run_migrations(engine, target=target, force=force)
+        if executed:
+            print(f"Migration successful: {', '.join(executed)}")
+        else:
+            print("Database is up to date.")
+    except Exception as e:
+        print(f"Migration failed: {e}")
+        raise
+
+
+def status():
+    applied = set(get_applied_versions(engine))
+    for migration in MIGRATIONS:
+        mark = "x" if migration.version in applied else " "
+        print(f"[{mark}] {migration.version} - {migration.description}")
+
+
+def index_usage():
+    with engine.connect() as connection:
+        for row in get_index_usage(connection):
+            print(
+                f"{row['table_name']:<20} {row['index_name']:<36} "
+                f"scans={row['idx_scan']:<10} size={row['size_bytes']:<10} "
+                f"valid={row['is_valid']} table_seq_scans={row['table_seq_scan']}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Database migrations")
+    parser.add_argument("--status", action="store_true", help="Hiển thị trạng thái migration")
+    parser.add_argument("--force", action="store_true", help="Chạy lại tất cả migration")
+    parser.add_argument("--target", help="Chỉ chạy đến version này")
+    parser.add_argument("--index-usage", action="store_true", help="Thống kê sử dụng index")
+    args = parser.parse_args()
+
+    if args.status:
+        status()
+    elif args.index_usage:
+        index_usage()
+    else:
+        migrate(target=args.target, force=args.force)
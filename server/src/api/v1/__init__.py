@@ -13,6 +13,7 @@ from .meeting_router import router as meeting_router
 from .project_router import router as project_router
 from .task_router import router as task_router
 from .search_router import router as search_router
+from .metrics_router import router as metrics_router
 
 # 2. ĐĂNG KÝ VỚI PREFIX VÀ TAGS (Giúp tạo tài liệu Swagger dễ nhìn hơn)
 api_router.include_router(user_router, prefix="/users", tags=["Người dùng (Users)"])
@@ -21,3 +22,4 @@ api_router.include_router(meeting_router, prefix="/meetings", tags=["Cuộc họ
 api_router.include_router(project_router, prefix="/projects", tags=["Dự án (Projects)"])
 api_router.include_router(task_router, prefix="/tasks", tags=["Nhiệm vụ (Tasks)"])
 api_router.include_router(search_router, prefix="/search", tags=["Tìm kiếm (Search)"])
+api_router.include_router(metrics_router, prefix="/metrics", tags=["Giám sát (Metrics)"])
@@ -1,6 +1,7 @@
 # Router chuyên biệt cho các tính năng AI (Chat, Xử lý ngôn ngữ, Giao tiếp Agent)
 
 from fastapi import APIRouter, Depends, HTTPException, status, Header
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from pydantic import BaseModel
@@ -25,7 +26,7 @@ class ChatResponse(BaseModel):
 # --- 1. CHAT VỚI TRỢ LÝ AI (PROJECT MANAGER ASSISTANT) ---
 
 @router.post("/chat", response_model=ChatResponse)
-def chat_with_ai_agent(
+async def chat_with_ai_agent(
     request: ChatRequest,
     current_user: user_schemas.UserOut = Depends(get_current_user),
     db: Session = Depends(get_db),
@@ -33,7 +34,7 @@ def chat_with_ai_agent(
 ):
     """
     Endpoint Chat thông minh.
-    Gọi sang AI Service (Project Manager Agent).
+    Gọi sang AI Service (Project Manager Agent) qua HTTP Client dùng chung (keep-alive, không chặn luồng).
     """
     try:
         service = AIService()
@@ -43,10 +44,11 @@ def chat_with_ai_agent(
         if authorization and authorization.startswith("Bearer "):
             token = authorization.replace("Bearer ", "")
             
-        resp_text = service.process_chat(
+        resp_text = await service.process_chat(
             message=request.message,
             thread_id=request.thread_id,
-            token=token
+            token=token,
+            user_id=current_user.id
         )
         return {"response": resp_text}
         
@@ -55,3 +57,26 @@ def chat_with_ai_agent(
         return {"response": "Xin lỗi, đã xảy ra lỗi hệ thống."}
 
 
+
+
+@router.post("/chat/stream")
+async def stream_chat_with_ai_agent(
+    request: ChatRequest,
+    current_user: user_schemas.UserOut = Depends(get_current_user),
+    authorization: Optional[str] = Header(None)
+):
+    """
+    Endpoint Chat dạng streaming (Server-Sent Events).
+    Chuyển tiếp từng token câu trả lời và các sự kiện "đang gọi tool" từ AI Service ngay khi có,
+    thay vì chờ Agent chạy xong mới trả về cả câu trả lời.
+    """
+    token = None
+    if authorization and authorization.startswith("Bearer "):
+        token = authorization.replace("Bearer ", "")
+
+    return StreamingResponse(
+        AIService().stream_chat(message=request.message, thread_id=request.thread_id, token=token,
+                                 user_id=current_user.id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
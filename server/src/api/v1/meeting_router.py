@@ -1,123 +1,36 @@
 # d/jirameet - Copy/server/src/api/v1/meeting_router.py
 # Router quản lý Cuộc họp (Meetings) và tích hợp AI Agent xử lý Audio
 
-import shutil
 import os
-from urllib.parse import urlparse 
-from fastapi import APIRouter, Depends, HTTPException, status, File, UploadFile, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, status, File, UploadFile, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
-from sqlalchemy.orm import joinedload 
-from src.core.database import get_db
+from src.core.database import get_db, get_async_db, DB_ASYNC_MODE
 from src.core.security import get_current_user
+from src.core.pagination import MAX_PAGE_SIZE, NEXT_CURSOR_HEADER
 from src.schemas import meeting as meeting_schemas
 from src.schemas import user as user_schemas
-from src.services.meeting_service import MeetingService 
+from src.services.meeting_service import MeetingService, AsyncMeetingService
 from src.models.meeting import Meeting
 from src.models.user import User
 from src.repositories.task_repository import TaskRepository
+from src.repositories.project_repository import ProjectRepository
 from src.models.task import Task
 from uuid import uuid4
 from datetime import datetime
 
 
-from src.services.ai_service import AIService
+from src.services.analysis_job_service import AnalysisJobService
+from src.services.meeting_analysis_service import MeetingAnalysisService
+from src.services.upload_service import RECORDING_MAX_BYTES, UPLOAD_CHUNK_SIZE, UploadService
 
 router = APIRouter()
 
-# --- 1. AI BACKGROUND TASKS (XỬ LÝ DỮ LIỆU NGẦM) ---
-
 from src.core.logger import logger
 from fastapi import Header
 
-def _run_ai_analysis_task(meeting_id: str, db: Session, token: str = None):
-    """
-    Hàm xử lý phân tích AI chạy ngầm.
-    Quy trình: 
-    1. Lấy file ghi âm (recording_url).
-    2. Chuẩn bị metadata (người tham gia, dự án).
-    3. Gọi AIService (Client) để gửi yêu cầu sang AI Service.
-    4. Cập nhật kết quả ngược lại Database.
-    """
-    logger.info(f"🚀 [AI TASK] Starting analysis for Meeting ID: {meeting_id}")
-    task_repo = TaskRepository(db)
-    ai_service = AIService()
-
-    try:
-        meeting = db.query(Meeting).options(joinedload(Meeting.attendees)).filter(Meeting.id == meeting_id).first()
-        if not meeting or not meeting.recording_url:
-            logger.error("❌ Error: No recording URL or meeting not found.")
-            return
-
-        parsed_url = urlparse(meeting.recording_url)
-        # Assuming the url is http://localhost:8000/static/recordings/{meeting_id}.webm
-        # The path part is /static/recordings/{meeting_id}.webm
-        
-        # Determine strict path relative to server root
-        path = parsed_url.path.lstrip('/')
-        
-        # Check if file exists at the expected location
-        if os.path.exists(path):
-            # FIX: Convert to Absolute Path so AI Service (separate process) can find it
-            final_audio_path = os.path.abspath(path)
-            logger.info(f"✅ Resolved Absolute Path: {final_audio_path}")
-        else:
-            logger.error(f"❌ Error: Audio file not found at {path}")
-            return
-
-        # Prepare Metadata
-        participants_info = []        
-
-        # Query all users whose IDs are in the list
-        attendees = db.query(User).filter(User.id.in_(meeting.attendee_ids)).all()
-        
-        for user in attendees:
-            p_info = {
-                "id": str(user.id), "name": user.name, "email": user.email
-            }
-            participants_info.append(p_info)
-
-        metadata = {
-            "title": meeting.title,
-            "description": meeting.description,
-            "id": meeting.id,
-            "projectId": meeting.project_id,
-            "project_id": meeting.project_id, # Redundant for safety
-            "author_id": str(meeting.attendee_ids[0]) if meeting.attendee_ids else None, # Assuming first attendee is author if not stored
-            "date": str(meeting.start_date),
-            "participants": participants_info
-        }
-
-        # GỌI AI SERVICE (Synchronous call to external service)
-        logger.info(f"⏳ Calling AI Service with {len(participants_info)} participants: {[p['name'] for p in participants_info]}")
-        
-        # Background task always skips review
-        ai_result = ai_service.process_meeting(
-            meeting_id=meeting_id,
-            audio_file_path=final_audio_path,
-            meeting_metadata=metadata,
-            token=token,
-            background=False, 
-            skip_review=True
-        )
-        
-        if ai_result:
-            # 1. Update Meeting Content
-            meeting.transcript = ai_result.get("transcript", "")
-            meeting.summary = ai_result.get("summary", "")
-
-            db.commit()
-            logger.info(f"✅ [AI TASK] Analysis complete. Updated Meeting content.")
-
-    except Exception as e:
-        import traceback
-        traceback.print_exc() # Keep fallback trace
-        logger.error(f"❌ [AI TASK] Error: {e}")
-    finally:
-        db.close()
-
-
-
 # --- Endpoints ---
 
 # --- 2. MEETING ENDPOINTS (API GIAO TIẾP VỚI FRONTEND) ---
@@ -128,92 +41,117 @@ def create_meeting(meeting_data: meeting_schemas.MeetingCreate, current_user: us
     service = MeetingService(db)
     return service.create_meeting(meeting_data, current_user.id)
 
-@router.get("/{project_id}", response_model=List[meeting_schemas.MeetingOut])
-def read_meetings_by_project(project_id: str, current_user: user_schemas.UserOut = Depends(get_current_user), db: Session = Depends(get_db)):
-    """Lấy danh sách các cuộc họp thuộc Project."""
+def read_meetings_by_project(
+    project_id: str,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    current_user: user_schemas.UserOut = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Lấy danh sách các cuộc họp thuộc Project.
+    - Phân trang theo (start_date, id), mặc định DEFAULT_PAGE_SIZE phần tử; con trỏ trang sau nằm trong header X-Next-Cursor.
+    """
     service = MeetingService(db)
-    meetings = service.get_meetings_by_project(project_id, current_user.id)
+
+    meetings, next_cursor = service.get_meetings_by_project_page(project_id, current_user.id, limit, cursor)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     return meetings
 
+async def read_meetings_by_project_async(
+    project_id: str,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    current_user: user_schemas.UserOut = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Phiên bản async của read_meetings_by_project (DB_ASYNC_MODE=true)."""
+    service = AsyncMeetingService(db)
+
+    meetings, next_cursor = await service.get_meetings_by_project_page(project_id, current_user.id, limit, cursor)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return meetings
+
+router.get("/{project_id}", response_model=List[meeting_schemas.MeetingOut])(
+    read_meetings_by_project_async if DB_ASYNC_MODE else read_meetings_by_project
+)
+
+@router.get("/project/{project_id}/search", response_model=List[meeting_schemas.TranscriptHit])
+def search_project_transcripts(
+    project_id: str,
+    q: str = Query(..., min_length=1),
+    limit: int = Query(20, ge=1, le=100),
+    current_user: user_schemas.UserOut = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Tìm kiếm trong transcript của mọi cuộc họp thuộc dự án (kèm mốc thời gian của đoạn hội thoại)."""
+    service = MeetingService(db)
+    return service.search_project_transcripts(project_id, current_user.id, q, limit)
+
+@router.get("/{meeting_id}/search", response_model=List[meeting_schemas.TranscriptHit])
+def search_meeting_transcript(
+    meeting_id: str,
+    q: str = Query(..., min_length=1),
+    limit: int = Query(20, ge=1, le=100),
+    current_user: user_schemas.UserOut = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Tìm kiếm trong transcript của một cuộc họp; từ cuối cùng được khớp theo tiền tố."""
+    service = MeetingService(db)
+    return service.search_transcript(meeting_id, current_user.id, q, limit)
+
 @router.post("/{meeting_id}/analyze")
-def analyze_meeting(
+async def analyze_meeting(
     meeting_id: str, 
-    background_tasks: BackgroundTasks,
     background: bool = True,
     skip_review: bool = True,
+    current_user: user_schemas.UserOut = Depends(get_current_user),
     db: Session = Depends(get_db),
     authorization: str = Header(None) # Extract Auth Token
 ):
     """
-    API kích hoạt Trí tuệ nhân tạo phân tích cuộc họp.
-    NOTE: Changed to 'def' (sync) to avoid blocking async loop when using sync 'requests'.
+    API kích hoạt Trí tuệ nhân tạo phân tích cuộc họp (chỉ thành viên dự án của cuộc họp).
+    - background=True: xếp job vào hàng đợi bền vững (bảng analysis_jobs) để Worker (server/worker.py) xử lý,
+      trả về ngay; theo dõi trạng thái qua GET /meetings/{meeting_id}/analysis.
+    - background=False: chạy đồng bộ và chờ kết quả (Interactive Mode).
+    NOTE: 'async' + HTTP Client bất đồng bộ: chờ AI Service không chiếm luồng của threadpool,
+    nên lời gọi ngược từ Agent về /tasks vẫn được phục vụ. Thao tác DB chạy trong threadpool.
     """
-    meeting = db.query(Meeting).filter(Meeting.id == meeting_id).first()
-    if not meeting:
-        raise HTTPException(status_code=404, detail="Meeting not found")
-    
     # Extract token string
     token = authorization.replace("Bearer ", "") if authorization else None
-    
+    # Kiểm tra quyền không qua cache: phân tích sẽ tạo task trong dự án
+    await run_in_threadpool(_get_accessible_meeting, db, meeting_id, current_user.id)
+
     if background:
-        # Khởi chạy phân tích ngầm (Background)
-        background_tasks.add_task(_run_ai_analysis_task, meeting_id, next(get_db()), token)
-        return {"message": "AI analysis started in background", "status": "processing"}
-    else:
-        # Run Synchronously (Interactive Mode)
-        # Prepare Logic similar to background task but wait for result
-        if not meeting.recording_url:
-             raise HTTPException(status_code=400, detail="No recording URL.")
-             
-        parsed_url = urlparse(meeting.recording_url)
-        path = parsed_url.path.lstrip('/')
-        if not os.path.exists(path):
-            raise HTTPException(status_code=404, detail="Audio file not found")
-            
-        final_audio_path = os.path.abspath(path)
-        
-        # Metadata
-        attendees = db.query(User).filter(User.id.in_(meeting.attendee_ids)).all()
-        participants_info = [{"id": str(u.id), "name": u.name, "email": u.email} for u in attendees]
-        
-        metadata = {
-            "title": meeting.title,
-            "description": meeting.description,
-            "id": meeting.id,
-            "projectId": meeting.project_id,
-            "project_id": meeting.project_id,
-            "author_id": str(meeting.attendee_ids[0]) if meeting.attendee_ids else None,
-            "participants": participants_info
-        }
-        
-        ai_service = AIService()
-        try:
-            result = ai_service.process_meeting(
-                meeting_id=meeting_id,
-                audio_file_path=final_audio_path,
-                meeting_metadata=metadata,
-                token=token,
-                background=False,
-                skip_review=skip_review 
-            )
-            
-            # FIX: Persist Transcript & Provisional Summary immediately
-            # This ensures that even if we are in "Review" mode, the data is saved.
-            if result.get("status") in ["completed", "waiting_review"]:
-                 if result.get("transcript"):
-                     meeting.transcript = result.get("transcript")
-                 if result.get("summary"):
-                     meeting.summary = result.get("summary")
-                 db.commit()
-                 db.refresh(meeting)
-                 logger.info(f"✅ [Sync] Saved Provisional Transcript for Meeting {meeting_id}")
-            
-            return result
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=str(e))
+        # Chỉ lưu ID người kích hoạt, không lưu JWT; Worker tự cấp token ngắn hạn khi chạy job
+        job = await run_in_threadpool(
+            AnalysisJobService(db).enqueue, meeting_id, requested_by=current_user.id, skip_review=True
+        )
+        logger.info(f"📥 [Queue] Meeting {meeting_id} queued for analysis (job {job.id})")
+        return {"message": "AI analysis queued", "status": job.status, "job_id": job.id}
+
+    try:
+        return await MeetingAnalysisService(db).analyze(meeting_id, token=token, skip_review=skip_review)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/{meeting_id}/analysis", response_model=meeting_schemas.AnalysisJobOut)
+def get_meeting_analysis_status(
+    meeting_id: str,
+    current_user: user_schemas.UserOut = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Trạng thái job phân tích AI mới nhất của cuộc họp (queued / running / completed / failed)."""
+    return AnalysisJobService(db).get_latest_job(meeting_id, current_user.id)
 
 @router.post("/{meeting_id}/confirm")
-def confirm_meeting_analysis(
+async def confirm_meeting_analysis(
     meeting_id: str,
     confirmation: meeting_schemas.MeetingConfirmRequest,
     db: Session = Depends(get_db),
@@ -221,64 +159,160 @@ def confirm_meeting_analysis(
 ):
     """
     Confirm analysis results.
-    NOTE: Changed to 'def' (sync) to run in threadpool, avoiding deadlock when Agent calls back to /tasks.
+    NOTE: 'async' + HTTP Client bất đồng bộ: không giữ luồng threadpool trong lúc Agent gọi ngược lại /tasks.
     """
     token = authorization.replace("Bearer ", "") if authorization else None
-    
-    meeting = db.query(Meeting).filter(Meeting.id == meeting_id).first()
-    if not meeting:
-         raise HTTPException(status_code=404, detail="Meeting not found")
-         
-    # Update local summary immediately
-    if confirmation.updated_summary:
-        meeting.summary = confirmation.updated_summary
-        db.commit()
-         
-    # Build metadata for Agent
-    attendees = db.query(User).filter(User.id.in_(meeting.attendee_ids)).all()
-    participants_info = [{"id": str(u.id), "name": u.name, "email": u.email} for u in attendees]
-    
-    # Construct Payload for AI Service
-    ai_payload = {
-        "meeting_id": meeting_id,
-        "updated_summary": confirmation.updated_summary,
-        "updated_action_items": [t.model_dump() for t in confirmation.updated_action_items] if confirmation.updated_action_items else [],
-        
-        "project_id": meeting.project_id,
-        "author_id": str(meeting.attendee_ids[0]) if meeting.attendee_ids else None,
-        "participants": participants_info
-    }
-    
-    ai_service = AIService()
+    updated_action_items = [t.model_dump() for t in confirmation.updated_action_items] if confirmation.updated_action_items else []
+
     try:
         # Call Agent to finish the job (create tasks via callback)
-        result = ai_service.confirm_meeting(ai_payload, token)
-        return result
+        return await MeetingAnalysisService(db).confirm(meeting_id, confirmation.updated_summary, updated_action_items, token)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.post("/{meeting_id}/recording")
-def upload_meeting_recording(meeting_id: str, file: UploadFile = File(...), db: Session = Depends(get_db)):
-    """Tải lên file ghi âm cuộc họp (.webm hoặc .mp3)"""
-    meeting = db.query(Meeting).filter(Meeting.id == meeting_id).first()  
+RECORDINGS_DIR = "static/recordings"
+
+
+def _get_accessible_meeting(db: Session, meeting_id: str, user_id: str) -> Meeting:
+    """Lấy cuộc họp (404) và kiểm tra User thuộc dự án của cuộc họp (403, không qua cache). Sync: gọi qua run_in_threadpool."""
+    meeting = db.query(Meeting).filter(Meeting.id == meeting_id).first()
     if not meeting:
         raise HTTPException(status_code=404, detail="Meeting not found")
+    if not ProjectRepository(db).has_access(meeting.project_id, user_id, fresh=True):
+        raise HTTPException(status_code=403, detail="Not authorized to access this meeting")
+    return meeting
 
-    os.makedirs("static/recordings", exist_ok=True)
-    file_location = f"static/recordings/{meeting_id}.webm"
-    
-    try:
-        with open(file_location, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail="Could not save file")
 
-    full_url = f"http://localhost:8000/{file_location}"
+def _save_recording_url(db: Session, meeting: Meeting) -> str:
+    full_url = f"http://localhost:8000/{RECORDINGS_DIR}/{meeting.id}.webm"
     meeting.recording_url = full_url
     db.commit()
     db.refresh(meeting)
+    return full_url
+
+
+@router.post("/{meeting_id}/recording")
+async def upload_meeting_recording(
+    meeting_id: str,
+    file: UploadFile = File(...),
+    current_user: user_schemas.UserOut = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Tải lên file ghi âm cuộc họp (.webm hoặc .mp3) trong một request.
+    Ghi theo luồng (không chặn event loop), giới hạn RECORDING_MAX_BYTES, đổi tên nguyên tử khi xong.
+    File lớn / mạng chập chờn: dùng upload nhiều phần (/recording/uploads).
+    Thao tác DB (Session sync) chạy trong threadpool.
+    """
+    meeting = await run_in_threadpool(_get_accessible_meeting, db, meeting_id, current_user.id)
+    file_location = f"{RECORDINGS_DIR}/{meeting_id}.webm"
+
+    try:
+        await UploadService().save_upload_file(file, file_location, RECORDING_MAX_BYTES)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Could not save recording for meeting {meeting_id}: {e}")
+        raise HTTPException(status_code=500, detail="Could not save file")
+
+    full_url = await run_in_threadpool(_save_recording_url, db, meeting)
     return {"message": "Upload successful", "url": full_url}
 
+
+# --- UPLOAD FILE GHI ÂM NHIỀU PHẦN (RESUMABLE) ---
+# 1. POST   /{id}/recording/uploads                      -> upload_id, chunk_size
+# 2. PUT    /{id}/recording/uploads/{upload_id}?offset=N -> body = bytes của phần, trả về offset mới
+#    (mất kết nối: GET trạng thái để lấy offset rồi gửi tiếp; 409 kèm offset đúng nếu lệch)
+# 3. POST   /{id}/recording/uploads/{upload_id}/complete -> kiểm tra kích thước + sha256, gắn vào Meeting
+# Chỉ thành viên dự án của cuộc họp được mở phiên; mỗi phiên chỉ người tạo được gửi tiếp / hoàn tất / hủy.
+
+def _upload_target(meeting_id: str) -> str:
+    return f"recording:{meeting_id}"
+
+
+def _upload_status(session, offset: int, **extra) -> meeting_schemas.RecordingUploadStatus:
+    return meeting_schemas.RecordingUploadStatus(
+        upload_id=session.upload_id, size=session.size, offset=offset, chunk_size=UPLOAD_CHUNK_SIZE, **extra
+    )
+
+
+@router.post("/{meeting_id}/recording/uploads", response_model=meeting_schemas.RecordingUploadStatus,
+             status_code=status.HTTP_201_CREATED)
+async def init_recording_upload(
+    meeting_id: str,
+    payload: meeting_schemas.RecordingUploadInit,
+    current_user: user_schemas.UserOut = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Khởi tạo phiên upload file ghi âm nhiều phần (429 nếu đã mở quá nhiều phiên)."""
+    await run_in_threadpool(_get_accessible_meeting, db, meeting_id, current_user.id)
+    session = await UploadService().create_session(
+        _upload_target(meeting_id), payload.size, RECORDING_MAX_BYTES, payload.sha256, payload.filename,
+        owner_id=current_user.id
+    )
+    return _upload_status(session, 0)
+
+
+@router.get("/{meeting_id}/recording/uploads/{upload_id}", response_model=meeting_schemas.RecordingUploadStatus)
+async def get_recording_upload(
+    meeting_id: str,
+    upload_id: str,
+    current_user: user_schemas.UserOut = Depends(get_current_user)
+):
+    """Trạng thái phiên upload (offset đã nhận) để client gửi tiếp."""
+    service = UploadService()
+    session = await service.get_session(upload_id, _upload_target(meeting_id), current_user.id)
+    return _upload_status(session, await service.get_offset(session))
+
+
+@router.put("/{meeting_id}/recording/uploads/{upload_id}", response_model=meeting_schemas.RecordingUploadStatus)
+async def upload_recording_chunk(
+    meeting_id: str,
+    upload_id: str,
+    request: Request,
+    offset: int = Query(..., ge=0),
+    x_chunk_sha256: Optional[str] = Header(None),
+    current_user: user_schemas.UserOut = Depends(get_current_user)
+):
+    """Nhận một phần (body thô, application/octet-stream) bắt đầu tại offset."""
+    service = UploadService()
+    session = await service.get_session(upload_id, _upload_target(meeting_id), current_user.id)
+    new_offset = await service.write_chunk(session, offset, request.stream(), x_chunk_sha256)
+    return _upload_status(session, new_offset)
+
+
+@router.post("/{meeting_id}/recording/uploads/{upload_id}/complete",
+             response_model=meeting_schemas.RecordingUploadStatus)
+async def complete_recording_upload(
+    meeting_id: str,
+    upload_id: str,
+    current_user: user_schemas.UserOut = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Hoàn tất upload: kiểm tra checksum, chuyển file vào static/recordings và cập nhật Meeting."""
+    service = UploadService()
+    session = await service.get_session(upload_id, _upload_target(meeting_id), current_user.id)
+    # Kiểm tra lại quyền: User có thể đã bị xóa khỏi dự án trong lúc upload
+    meeting = await run_in_threadpool(_get_accessible_meeting, db, meeting_id, current_user.id)
+    checksum = await service.complete(session, f"{RECORDINGS_DIR}/{meeting_id}.webm")
+    full_url = await run_in_threadpool(_save_recording_url, db, meeting)
+    return _upload_status(session, session.size, completed=True, url=full_url, sha256=checksum)
+
+
+@router.delete("/{meeting_id}/recording/uploads/{upload_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def abort_recording_upload(
+    meeting_id: str,
+    upload_id: str,
+    current_user: user_schemas.UserOut = Depends(get_current_user)
+):
+    """Hủy phiên upload và xóa dữ liệu dở dang."""
+    service = UploadService()
+    session = await service.get_session(upload_id, _upload_target(meeting_id), current_user.id)
+    await service.abort(session)
+    return None
+
 @router.delete("/{meeting_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_meeting(
     meeting_id: str,
@@ -0,0 +1,92 @@
+# server/src/api/v1/metrics_router.py
+# Router cung cấp số liệu vận hành (Connection Pool, ...) phục vụ giám sát hiệu năng
+# Yêu cầu đăng nhập; nếu đặt METRICS_ADMIN_EMAILS (danh sách email, phân cách bởi dấu phẩy) thì chỉ các tài khoản đó được xem.
+
+import os
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+from typing import Any, Dict
+
+from src.core.database import async_engine, get_db
+from src.core.http_client import HTTP2_AVAILABLE, get_ai_http_client
+from src.core.migrations import get_index_usage, read_applied_versions
+from src.core.pool_metrics import sync_pool_metrics, async_pool_metrics
+from src.core.security import get_current_user, user_cache
+from src.repositories.project_repository import member_projects_cache
+from src.schemas import user as user_schemas
+from src.services.live_transcription_service import live_transcriptions
+
+METRICS_ADMIN_EMAILS = frozenset(
+    email.strip().lower() for email in os.getenv("METRICS_ADMIN_EMAILS", "").split(",") if email.strip()
+)
+
+
+def require_metrics_access(current_user: user_schemas.UserOut = Depends(get_current_user)) -> user_schemas.UserOut:
+    """Chỉ người dùng đã đăng nhập (và thuộc METRICS_ADMIN_EMAILS nếu có cấu hình) được xem số liệu vận hành."""
+    if METRICS_ADMIN_EMAILS and (current_user.email or "").lower() not in METRICS_ADMIN_EMAILS:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not allowed to read metrics")
+    return current_user
+
+
+router = APIRouter(dependencies=[Depends(require_metrics_access)])
+
+
+@router.get("/pool", response_model=Dict[str, Any])
+def read_pool_metrics():
+    """
+    Số liệu Connection Pool của Database.
+    - checked_out / overflow: số kết nối đang được dùng và số kết nối vượt pool_size.
+    - wait_*: thời gian chờ lấy kết nối (tăng cao = thiếu kết nối trong pool).
+    - timeouts: số lần chờ quá DB_POOL_TIMEOUT.
+    """
+    return {
+        "sync": sync_pool_metrics.snapshot(),
+        "async": async_pool_metrics.snapshot() if async_engine is not None else None,
+    }
+
+
+@router.get("/cache", response_model=Dict[str, Any])
+def read_cache_metrics():
+    """
+    Số liệu các bộ nhớ đệm trong tiến trình (hits, misses, evictions, hit_ratio).
+    """
+    return {
+        "current_user": user_cache.stats(),
+        "member_projects": member_projects_cache.stats(),
+    }
+
+
+@router.get("/ai-client", response_model=Dict[str, Any])
+def read_ai_client_metrics():
+    """
+    Trạng thái HTTP Client tới AI Service.
+    - circuits: Circuit Breaker theo từng endpoint.
+    - circuits[path].state: closed (bình thường) / open (đang ngắt mạch) / half_open (đang thử lại).
+    - circuits[path].rejected: số Request bị từ chối ngay do ngắt mạch.
+    """
+    return {
+        "http2": HTTP2_AVAILABLE,
+        "circuits": get_ai_http_client().breakers_snapshot(),
+    }
+
+
+@router.get("/indexes", response_model=Dict[str, Any])
+def read_index_usage(db: Session = Depends(get_db)):
+    """
+    Mức độ sử dụng index của các bảng ứng dụng (từ pg_stat_user_indexes)
+    và danh sách migration đã áp dụng (chỉ đọc, không tạo bảng schema_migrations).
+    - idx_scan = 0: index không được dùng.
+    - table_seq_scan cao: bảng đang bị quét toàn bộ, có thể thiếu index.
+    """
+    return {
+        "migrations": read_applied_versions(db.connection()),
+        "indexes": get_index_usage(db.connection()),
+    }
+
+
+@router.get("/live-transcription", response_model=Dict[str, Any])
+def read_live_transcription_metrics():
+    """
+    Ghi chép trực tiếp qua Socket.IO: số luồng âm thanh và số cuộc họp đang được ghi chép trong tiến trình này.
+    """
+    return live_transcriptions.stats()
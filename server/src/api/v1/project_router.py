@@ -1,15 +1,17 @@
 # d/jirameet - Copy/server/src/api/v1/project_router.py
 # Router quản lý Dự án (Projects) và Thành viên (Members)
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.orm import Session
-from typing import List
-from src.core.database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from src.core.database import get_db, get_async_db, DB_ASYNC_MODE
+from src.core.pagination import MAX_PAGE_SIZE, NEXT_CURSOR_HEADER
 from src.core.security import get_current_user
 from src.schemas import project as project_schemas
 from src.schemas import user as user_schemas
 from pydantic import BaseModel 
-from src.services.project_service import ProjectService 
+from src.services.project_service import ProjectService, AsyncProjectService
 
 router = APIRouter()
 
@@ -29,20 +31,44 @@ def create_project(
     project = service.create_project(project_data, owner_id=current_user.id)
     return project
 
-@router.get("/", response_model=List[project_schemas.ProjectOut])
 def read_user_projects(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
     current_user: user_schemas.UserOut = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
     Lấy danh sách các dự án.
     - Chỉ lấy những dự án mà người dùng hiện tại đang tham gia.
+    - Phân trang theo (updated_at, id), mặc định DEFAULT_PAGE_SIZE phần tử; con trỏ trang sau nằm trong header X-Next-Cursor.
     """
     service = ProjectService(db)
-    projects = service.get_projects_by_user(user_id=current_user.id)
+
+    projects, next_cursor = service.get_projects_by_user_page(current_user.id, limit, cursor)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return projects
+
+async def read_user_projects_async(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    current_user: user_schemas.UserOut = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Phiên bản async của read_user_projects (DB_ASYNC_MODE=true)."""
+    service = AsyncProjectService(db)
+
+    projects, next_cursor = await service.get_projects_by_user_page(current_user.id, limit, cursor)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     return projects
 
-@router.get("/{project_id}", response_model=project_schemas.ProjectOut)
+router.get("/", response_model=List[project_schemas.ProjectOut])(
+    read_user_projects_async if DB_ASYNC_MODE else read_user_projects
+)
+
 def read_project(
     project_id: str,
     current_user: user_schemas.UserOut = Depends(get_current_user),
@@ -53,11 +79,31 @@ def read_project(
     - Phải là thành viên mới được quyền xem.
     """
     service = ProjectService(db)
+    if not service.has_access(project_id, current_user.id):
+         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found or access denied.")
     project = service.get_project_by_id(project_id)
-    if not project or current_user.id not in [m.id for m in project.members]:
+    if not project:
          raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found or access denied.")
     return project
 
+async def read_project_async(
+    project_id: str,
+    current_user: user_schemas.UserOut = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Phiên bản async của read_project (DB_ASYNC_MODE=true)."""
+    service = AsyncProjectService(db)
+    if not await service.has_access(project_id, current_user.id):
+         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found or access denied.")
+    project = await service.get_project_by_id(project_id)
+    if not project:
+         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found or access denied.")
+    return project
+
+router.get("/{project_id}", response_model=project_schemas.ProjectOut)(
+    read_project_async if DB_ASYNC_MODE else read_project
+)
+
 @router.delete("/{project_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_project(
     project_id: str,
@@ -1,14 +1,16 @@
 # d/jirameet - Copy/server/src/api/v1/task_router.py
 # Router quản lý Nhiệm vụ (Tasks) trong từng Dự án
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.orm import Session
-from typing import List
-from src.core.database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from src.core.database import get_db, get_async_db, DB_ASYNC_MODE
+from src.core.pagination import MAX_PAGE_SIZE, NEXT_CURSOR_HEADER
 from src.core.security import get_current_user
 from src.schemas import task as task_schemas
 from src.schemas import user as user_schemas
-from src.services.task_service import TaskService 
+from src.services.task_service import TaskService, AsyncTaskService
 
 router = APIRouter()
 
@@ -29,35 +31,92 @@ def create_task(
     task = service.create_task(task_data, author_id=current_user.id)
     return task
 
-@router.get("/user/{user_id}", response_model=List[task_schemas.TaskOut])
 def read_tasks_by_user(
     user_id: str,
+    response: Response,
     status_filter: str = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
     current_user: user_schemas.UserOut = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
     Lấy danh sách Task được giao cho một User cụ thể.
     - Thường dùng cho trang 'My Tasks'.
+    - Phân trang theo con trỏ (mặc định DEFAULT_PAGE_SIZE phần tử, tối đa MAX_PAGE_SIZE);
+      con trỏ trang sau nằm trong header X-Next-Cursor.
     """
     service = TaskService(db)
-    return service.get_tasks_by_user(user_id, status_filter)
 
-@router.get("/{project_id}", response_model=List[task_schemas.TaskOut])
+    tasks, next_cursor = service.get_tasks_by_user_page(user_id, status_filter, limit, cursor)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return tasks
+
+async def read_tasks_by_user_async(
+    user_id: str,
+    response: Response,
+    status_filter: str = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    current_user: user_schemas.UserOut = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Phiên bản async của read_tasks_by_user (DB_ASYNC_MODE=true): truy vấn qua AsyncSession, không chiếm threadpool."""
+    service = AsyncTaskService(db)
+
+    tasks, next_cursor = await service.get_tasks_by_user_page(user_id, status_filter, limit, cursor)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return tasks
+
+router.get("/user/{user_id}", response_model=List[task_schemas.TaskOut])(
+    read_tasks_by_user_async if DB_ASYNC_MODE else read_tasks_by_user
+)
+
 def read_tasks_by_project(
     project_id: str,
+    response: Response,
     status_filter: str = None, 
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
     current_user: user_schemas.UserOut = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
     Lấy toàn bộ Task thuộc về một Dự án.
     - Hỗ trợ lọc theo trạng thái (status_filter).
+    - Phân trang keyset theo (updated_at, id), mặc định DEFAULT_PAGE_SIZE phần tử kể cả khi không truyền limit/cursor;
+      con trỏ trang sau nằm trong header X-Next-Cursor (không có header = trang cuối).
     """
     service = TaskService(db)
-    tasks = service.get_tasks_by_project(project_id, current_user.id, status_filter)
+
+    tasks, next_cursor = service.get_tasks_by_project_page(project_id, current_user.id, status_filter, limit, cursor)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     return tasks
 
+async def read_tasks_by_project_async(
+    project_id: str,
+    response: Response,
+    status_filter: str = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    current_user: user_schemas.UserOut = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Phiên bản async của read_tasks_by_project (DB_ASYNC_MODE=true)."""
+    service = AsyncTaskService(db)
+
+    tasks, next_cursor = await service.get_tasks_by_project_page(project_id, current_user.id, status_filter, limit, cursor)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return tasks
+
+router.get("/{project_id}", response_model=List[task_schemas.TaskOut])(
+    read_tasks_by_project_async if DB_ASYNC_MODE else read_tasks_by_project
+)
+
 @router.patch("/{task_id}", response_model=task_schemas.TaskOut)
 def update_task_details(
     task_id: str,
@@ -1,19 +1,21 @@
 # d/jirameet - Copy/server/src/api/v1/user_router.py
 # Router quản lý toàn bộ các thao tác liên quan đến người dùng (Đăng ký, Đăng nhập, Profile)
 
-import shutil
 import os
 from fastapi import APIRouter, Depends, HTTPException, status, File, UploadFile
 from sqlalchemy.orm import Session
 from typing import List
 
 from src.core.database import get_db
-from src.core.security import get_current_user
+from src.core.security import get_current_user, invalidate_user_cache
 from src.schemas import user as user_schemas
 from src.services.user_service import UserService 
+from src.services.upload_service import AVATAR_MAX_BYTES, UploadService
 
 router = APIRouter()
 
+AVATAR_EXTENSIONS = {".png", ".jpg", ".jpeg", ".gif", ".webp"}
+
 # --- 1. XÁC THỰC (AUTHENTICATION) ---
 
 @router.post("/register", response_model=user_schemas.UserOut, status_code=status.HTTP_201_CREATED)
@@ -77,16 +79,18 @@ async def upload_avatar(
 ):
     """
     Upload ảnh đại diện.
-    - Lưu file vào thư mục static/avatars.
+    - Lưu file vào thư mục static/avatars (ghi theo luồng, tối đa AVATAR_MAX_BYTES, đổi tên nguyên tử).
     - Cập nhật URL ảnh vào trường avatar trong bảng Users.
     """
-    os.makedirs("static/avatars", exist_ok=True)
-    file_extension = os.path.splitext(file.filename)[1]
+    file_extension = os.path.splitext(file.filename or "")[1].lower()
+    if file_extension not in AVATAR_EXTENSIONS:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Unsupported image type")
     file_location = f"static/avatars/{current_user.id}{file_extension}"
     
     try:
-        with open(file_location, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        await UploadService().save_upload_file(file, file_location, AVATAR_MAX_BYTES)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail="Could not save file")
 
@@ -97,5 +101,6 @@ async def upload_avatar(
     if user:
         user.avatar = full_url
         db.commit()
+        invalidate_user_cache(current_user.id)
     
     return {"message": "Upload successful", "url": full_url}
@@ -0,0 +1,79 @@
+"""
+server/src/core/cache.py
+Bộ nhớ đệm (Cache) trong tiến trình: kết hợp LRU (giới hạn số phần tử) và TTL (thời gian sống).
+Dùng cho các dữ liệu đọc nhiều, ghi ít (VD: thông tin User đã xác thực).
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+
+class TTLCache:
+    """
+    Cache LRU + TTL an toàn đa luồng.
+    - maxsize: số phần tử tối đa, vượt quá sẽ loại phần tử ít được dùng gần đây nhất.
+    - ttl: số giây một phần tử còn hiệu lực kể từ lúc được ghi.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0, name: str = "cache"):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.name = name
+        self._data: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Lấy giá trị theo key; trả về None nếu không có hoặc đã hết hạn."""
+        now = time.monotonic()
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            expires_at, value = item
+            if expires_at <= now:
+                del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any):
+        """Ghi giá trị vào cache, loại bỏ phần tử LRU nếu vượt quá maxsize."""
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key: Hashable):
+        """Xóa một key khỏi cache (gọi khi dữ liệu gốc thay đổi)."""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        """Xóa toàn bộ cache."""
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Số liệu hit/miss phục vụ endpoint /metrics."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "cache": self.name,
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+            }
@@ -2,16 +2,28 @@
 server/src/core/database.py
 Cấu hình kết nối Cơ sở dữ liệu sử dụng SQLAlchemy.
 Bao gồm thiết lập Engine, tạo Session phiên làm việc và hàm Dependency get_db cho FastAPI.
+Hỗ trợ thêm chế độ bất đồng bộ (AsyncEngine/AsyncSession) bật bằng biến DB_ASYNC_MODE - dùng cho get_current_user và các route đọc danh sách / chi tiết
+(tasks, meetings, projects) qua các Async*Repository.
 """
 
 import os
 from dotenv import load_dotenv
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, text
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.engine import Engine
-from typing import Generator
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+from typing import Any, AsyncGenerator, Dict, Generator, Optional
 from src.models.base import Base
+from src.core.logger import logger
+from src.core.pool_metrics import (
+    instrumented_pool_class,
+    register_pool_events,
+    sync_pool_metrics,
+    async_pool_metrics,
+)
 
 # 1. Tải các biến môi trường từ tệp .env (VD: DATABASE_URL)
 load_dotenv()
@@ -23,12 +35,50 @@ SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL")
 if not SQLALCHEMY_DATABASE_URL:
     raise ValueError("LỖI: Biến môi trường DATABASE_URL chưa được thiết lập.")
 
+# Chế độ Async: DB_ASYNC_MODE=true sẽ khởi tạo thêm AsyncEngine (driver asyncpg)
+# để các Dependency và Route async (VD: get_current_user, GET /projects/) không chiếm luồng của threadpool.
+DB_ASYNC_MODE = os.getenv("DB_ASYNC_MODE", "false").lower() in ("1", "true", "yes")
+
+def _to_async_url(url: str) -> str:
+    """Chuyển URL sync (postgresql://, postgresql+psycopg2://) sang driver asyncpg."""
+    parsed = make_url(url)
+    if parsed.drivername in ("postgresql", "postgres", "postgresql+psycopg2", "postgresql+psycopg"):
+        parsed = parsed.set(drivername="postgresql+asyncpg")
+    return parsed.render_as_string(hide_password=False)
+
+# Có thể chỉ định riêng URL async, nếu không sẽ suy ra từ DATABASE_URL.
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or _to_async_url(SQLALCHEMY_DATABASE_URL)
+
+# Cấu hình Connection Pool (áp dụng cho cả engine sync và async)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))       # Giây chờ tối đa để lấy kết nối
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))       # Giây; -1 để tắt
+# Kiểm tra kết nối còn sống: "pre_ping" (mọi checkout), "idle_ping" (chỉ kết nối nằm im lâu), "none"
+DB_POOL_LIVENESS = os.getenv("DB_POOL_LIVENESS", "pre_ping").lower()
+DB_POOL_IDLE_PING_SECONDS = float(os.getenv("DB_POOL_IDLE_PING_SECONDS", "30"))
+
+if DB_POOL_LIVENESS not in ("pre_ping", "idle_ping", "none"):
+    raise ValueError(f"LỖI: DB_POOL_LIVENESS không hợp lệ: {DB_POOL_LIVENESS}")
+
+def _pool_kwargs() -> Dict[str, Any]:
+    """Tham số pool dùng chung cho create_engine / create_async_engine."""
+    return {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_LIVENESS == "pre_ping",
+    }
+
 # 2. Khởi tạo Engine (Bộ máy kết nối)
-# pool_pre_ping=True: Tự động kiểm tra xem kết nối cũ còn sống không trước khi sử dụng lại.
+# Pool được bọc bởi lớp đo thời gian chờ, các số liệu còn lại lấy từ pool events.
 engine: Engine = create_engine(
     SQLALCHEMY_DATABASE_URL,
-    pool_pre_ping=True
+    poolclass=instrumented_pool_class(QueuePool, sync_pool_metrics),
+    **_pool_kwargs()
 )
+register_pool_events(engine, sync_pool_metrics, DB_POOL_LIVENESS, DB_POOL_IDLE_PING_SECONDS)
 
 # 3. SessionLocal: Lớp dùng để tạo các phiên làm việc với DB.
 # Mỗi khi gọi SessionLocal(), một phiên mới sẽ được mở ra để thực hiện các câu lệnh SQL.
@@ -38,6 +88,24 @@ SessionLocal = sessionmaker(
     bind=engine
 )
 
+# 3b. AsyncEngine và AsyncSessionLocal (chỉ khởi tạo khi bật DB_ASYNC_MODE).
+# expire_on_commit=False: tránh lazy-load ngầm sau commit (không được phép với AsyncSession).
+async_engine: Optional[AsyncEngine] = None
+AsyncSessionLocal: Optional[async_sessionmaker] = None
+
+if DB_ASYNC_MODE:
+    async_engine = create_async_engine(
+        ASYNC_DATABASE_URL,
+        poolclass=instrumented_pool_class(AsyncAdaptedQueuePool, async_pool_metrics),
+        **_pool_kwargs()
+    )
+    register_pool_events(async_engine.sync_engine, async_pool_metrics, DB_POOL_LIVENESS, DB_POOL_IDLE_PING_SECONDS)
+    AsyncSessionLocal = async_sessionmaker(
+        bind=async_engine,
+        autoflush=False,
+        expire_on_commit=False
+    )
+
 # 4. Hàm get_db - Dependency Injection (Sử dụng trong FastAPI)
 def get_db() -> Generator:
     """
@@ -50,6 +118,21 @@ def get_db() -> Generator:
     finally:
         db.close()
 
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Phiên bản async của get_db: cung cấp một AsyncSession cho mỗi Request API.
+    Chỉ dùng được khi DB_ASYNC_MODE được bật.
+    """
+    if AsyncSessionLocal is None:
+        raise RuntimeError("Chế độ Async chưa được bật (DB_ASYNC_MODE=false).")
+    async with AsyncSessionLocal() as db:
+        yield db
+
+async def dispose_async_engine():
+    """Đóng toàn bộ kết nối của AsyncEngine (gọi khi tắt ứng dụng)."""
+    if async_engine is not None:
+        await async_engine.dispose()
+
 # 5. Hàm khởi tạo các bảng (Tables)
 def create_db_tables():
     """
@@ -57,5 +140,15 @@ def create_db_tables():
     và tự động tạo bảng tương ứng trong Postgres nếu bảng đó chưa tồn tại.
     """
     # Import các models ở đây để đảm bảo chúng được đăng ký với SQLAlchemy Base
-    from src.models import user, project, task, meeting
-    Base.metadata.create_all(bind=engine)
\ No newline at end of file
+    from src.models import user, project, task, meeting, analysis_job, transcript_segment
+    # Index trigram của bảng users cần extension pg_trgm. Không tạo được (thiếu quyền / chưa cài contrib):
+    # ghi log và bỏ qua các index trigram để các bảng vẫn được tạo; tìm User theo trigram sẽ không dùng được.
+    try:
+        with engine.begin() as connection:
+            connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    except SQLAlchemyError as e:
+        logger.warning(f"⚠️ Could not create extension pg_trgm, skipping trigram indexes: {e}")
+        users_table = user.User.__table__
+        for index in [index for index in users_table.indexes if index.name.endswith("_trgm")]:
+            users_table.indexes.discard(index)
+    Base.metadata.create_all(bind=engine)
@@ -0,0 +1,239 @@
+"""
+server/src/core/http_client.py
+HTTP Client bất đồng bộ dùng chung cho các lời gọi từ Server sang AI Service.
+- Một httpx.AsyncClient duy nhất cho cả tiến trình: giữ kết nối keep-alive (không bắt tay TCP/TLS mỗi tin nhắn),
+  dùng HTTP/2 nếu đã cài gói 'h2'.
+- Timeout riêng cho từng endpoint, thử lại khi không kết nối được, và Circuit Breaker để ngắt nhanh
+  khi AI Service đang sập thay vì để mọi Request treo tới hết timeout.
+- Mỗi endpoint có Circuit Breaker riêng: analyze chậm hay hàng đợi STT quá tải không làm ngắt mạch chat.
+"""
+
+import asyncio
+import importlib.util
+import os
+import threading
+import time
+from typing import Any, AsyncIterator, Dict, Optional
+
+import httpx
+
+from src.core.logger import logger
+
+AI_SERVICE_URL = os.getenv("AI_SERVICE_URL", "http://localhost:8001/api/v1")
+
+# Connection Pool
+AI_HTTP_MAX_CONNECTIONS = int(os.getenv("AI_HTTP_MAX_CONNECTIONS", "50"))
+AI_HTTP_MAX_KEEPALIVE = int(os.getenv("AI_HTTP_MAX_KEEPALIVE", "20"))
+AI_HTTP_KEEPALIVE_EXPIRY = float(os.getenv("AI_HTTP_KEEPALIVE_EXPIRY", "60"))
+AI_HTTP_CONNECT_TIMEOUT = float(os.getenv("AI_HTTP_CONNECT_TIMEOUT", "5"))
+# Thử lại (chỉ khi chắc chắn Request chưa được AI Service xử lý: lỗi kết nối hoặc 503)
+AI_HTTP_RETRIES = int(os.getenv("AI_HTTP_RETRIES", "2"))
+AI_HTTP_RETRY_BACKOFF = float(os.getenv("AI_HTTP_RETRY_BACKOFF", "0.5"))
+# Circuit Breaker
+AI_CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("AI_CIRCUIT_FAILURE_THRESHOLD", "5"))
+AI_CIRCUIT_RESET_SECONDS = float(os.getenv("AI_CIRCUIT_RESET_SECONDS", "30"))
+
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+_RETRYABLE_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+
+class CircuitOpenError(Exception):
+    """AI Service đang bị ngắt mạch (lỗi liên tiếp), Request bị từ chối ngay."""
+
+
+class CircuitBreaker:
+    """
+    Circuit Breaker 3 trạng thái:
+    - closed: cho qua bình thường, đếm lỗi liên tiếp.
+    - open: sau failure_threshold lỗi liên tiếp, từ chối ngay trong reset_timeout giây.
+    - half_open: hết reset_timeout, cho MỘT Request thử; thành công thì đóng lại, lỗi thì mở tiếp.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0, name: str = "circuit"):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.name = name
+        self._state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == "open" and time.monotonic() - self._opened_at >= self.reset_timeout:
+                return "half_open"
+            return self._state
+
+    def before_call(self) -> bool:
+        """
+        Gọi trước mỗi Request; ném CircuitOpenError nếu đang ngắt mạch.
+        Trả về True nếu Request này là lượt thử (half_open) - nơi gọi phải release_trial() khi xong.
+        """
+        with self._lock:
+            if self._state == "closed":
+                return False
+            if time.monotonic() - self._opened_at < self.reset_timeout or self._trial_in_flight:
+                self.rejected += 1
+                raise CircuitOpenError(f"{self.name} circuit is open")
+            self._trial_in_flight = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._state = "closed"
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._trial_in_flight or self._failures >= self.failure_threshold:
+                if self._state != "open":
+                    logger.warning(f"⚠️ [{self.name}] Circuit opened after {self._failures} consecutive failures")
+                self._state = "open"
+                self._opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+    def release_trial(self):
+        """
+        Request thử bị hủy / lỗi không xác định (không rõ AI Service sống hay chết): trả lại lượt thử,
+        giữ nguyên trạng thái, để Request sau được thử tiếp thay vì bị từ chối mãi.
+        """
+        with self._lock:
+            self._trial_in_flight = False
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"state": self.state, "consecutive_failures": self._failures, "rejected": self.rejected}
+
+
+class ResilientHttpClient:
+    """Bọc httpx.AsyncClient với Connection Pool, thử lại và Circuit Breaker."""
+
+    def __init__(self, base_url: str, name: str = "ai_service"):
+        self.name = name
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._breakers_lock = threading.Lock()
+        self._client = httpx.AsyncClient(
+            base_url=base_url,
+            http2=HTTP2_AVAILABLE,
+            limits=httpx.Limits(
+                max_connections=AI_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=AI_HTTP_MAX_KEEPALIVE,
+                keepalive_expiry=AI_HTTP_KEEPALIVE_EXPIRY,
+            ),
+            timeout=httpx.Timeout(60.0, connect=AI_HTTP_CONNECT_TIMEOUT),
+        )
+
+    def breaker(self, path: str) -> CircuitBreaker:
+        """Circuit Breaker của một endpoint (tạo khi dùng lần đầu)."""
+        with self._breakers_lock:
+            if path not in self._breakers:
+                self._breakers[path] = CircuitBreaker(
+                    AI_CIRCUIT_FAILURE_THRESHOLD, AI_CIRCUIT_RESET_SECONDS, name=f"{self.name} {path}"
+                )
+            return self._breakers[path]
+
+    def breakers_snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._breakers_lock:
+            breakers = dict(self._breakers)
+        return {path: breaker.snapshot() for path, breaker in breakers.items()}
+
+    async def post(self, path: str, json: Optional[Dict[str, Any]], timeout: float,
+                   headers: Optional[Dict[str, str]] = None,
+                   params: Optional[Dict[str, Any]] = None,
+                   content: Optional[bytes] = None) -> httpx.Response:
+        """
+        Gửi POST với timeout riêng (giây) cho endpoint (body JSON, hoặc bytes thô qua content).
+        Lỗi kết nối và 503 được thử lại với backoff; lỗi 5xx / mất kết nối được tính vào Circuit Breaker.
+        Response 4xx được trả về cho nơi gọi tự xử lý.
+        """
+        request_timeout = httpx.Timeout(timeout, connect=AI_HTTP_CONNECT_TIMEOUT)
+        breaker = self.breaker(path)
+        attempt = 0
+        while True:
+            is_trial = breaker.before_call()
+            try:
+                response = await self._client.post(path, json=json, content=content, headers=headers, params=params,
+                                                   timeout=request_timeout)
+            except _RETRYABLE_ERRORS as e:
+                breaker.record_failure()
+                if attempt >= AI_HTTP_RETRIES:
+                    raise
+                logger.warning(f"⚠️ [{self.name}] {path} connection failed ({e!r}), retrying...")
+            except httpx.HTTPError:
+                breaker.record_failure()
+                raise
+            else:
+                if response.status_code < 500:
+                    breaker.record_success()
+                    return response
+                breaker.record_failure()
+                if response.status_code != 503 or attempt >= AI_HTTP_RETRIES:
+                    return response
+                logger.warning(f"⚠️ [{self.name}] {path} returned 503, retrying...")
+            finally:
+                # Bị hủy (CancelledError) hoặc lỗi khác: không để lượt thử half-open bị giữ mãi
+                if is_trial:
+                    breaker.release_trial()
+
+            await asyncio.sleep(AI_HTTP_RETRY_BACKOFF * (2 ** attempt))
+            attempt += 1
+
+    async def stream_post(self, path: str, json: Dict[str, Any], timeout: float,
+                          headers: Optional[Dict[str, str]] = None) -> AsyncIterator[bytes]:
+        """
+        Gửi POST và trả về nội dung Response theo từng phần (dùng cho Server-Sent Events).
+        timeout ở đây là thời gian chờ tối đa giữa hai phần dữ liệu, không phải tổng thời gian.
+        Không thử lại: dữ liệu có thể đã được gửi một phần cho người dùng.
+        Response khác 200 ném httpx.HTTPStatusError.
+        """
+        request_timeout = httpx.Timeout(timeout, connect=AI_HTTP_CONNECT_TIMEOUT)
+        breaker = self.breaker(path)
+        is_trial = breaker.before_call()
+        try:
+            async with self._client.stream("POST", path, json=json, headers=headers, timeout=request_timeout) as response:
+                if response.status_code >= 500:
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
+                if response.status_code != 200:
+                    await response.aread()
+                    response.raise_for_status()
+                async for chunk in response.aiter_bytes():
+                    yield chunk
+        except httpx.HTTPStatusError:
+            raise
+        except httpx.HTTPError:
+            breaker.record_failure()
+            raise
+        finally:
+            # Client SSE ngắt kết nối (GeneratorExit / CancelledError) trước khi có Response
+            if is_trial:
+                breaker.release_trial()
+
+    async def aclose(self):
+        await self._client.aclose()
+
+
+# Client dùng chung (khởi tạo trong lifespan của FastAPI, hoặc lần đầu sử dụng trong Worker)
+_ai_http_client: Optional[ResilientHttpClient] = None
+
+
+def get_ai_http_client() -> ResilientHttpClient:
+    """Lấy Client dùng chung tới AI Service (tạo mới nếu chưa có)."""
+    global _ai_http_client
+    if _ai_http_client is None:
+        _ai_http_client = ResilientHttpClient(AI_SERVICE_URL)
+    return _ai_http_client
+
+
+async def close_ai_http_client():
+    """Đóng Client dùng chung (gọi khi tắt ứng dụng)."""
+    global _ai_http_client
+    if _ai_http_client is not None:
+        await _ai_http_client.aclose()
+        _ai_http_client = None
@@ -0,0 +1,240 @@
+"""
+server/src/core/migrations.py
+Công cụ migration đơn giản, chạy lại nhiều lần vẫn an toàn (idempotent).
+- Mỗi migration có một version duy nhất, được ghi vào bảng schema_migrations sau khi chạy xong.
+- Các câu lệnh đều dùng IF NOT EXISTS để chạy lại không gây lỗi.
+- Index được tạo bằng CREATE INDEX CONCURRENTLY (không khóa ghi bảng), ngoài transaction.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+
+@dataclass
+class Migration:
+    """Một bước migration: danh sách câu lệnh SQL chạy theo thứ tự."""
+    version: str
+    description: str
+    statements: List[str] = field(default_factory=list)
+    # True: chạy ở chế độ AUTOCOMMIT (bắt buộc với CREATE INDEX CONCURRENTLY)
+    concurrent: bool = False
+
+
+def _create_index(name: str, table: str, columns: str, using: Optional[str] = None,
+                  unique: bool = False, where: Optional[str] = None) -> str:
+    method = f" USING {using}" if using else ""
+    kind = "UNIQUE INDEX" if unique else "INDEX"
+    predicate = f" WHERE {where}" if where else ""
+    return f"CREATE {kind} CONCURRENTLY IF NOT EXISTS {name} ON {table}{method} ({columns}){predicate}"
+
+
+# Danh sách migration theo thứ tự. KHÔNG sửa migration đã phát hành, chỉ thêm mới.
+MIGRATIONS: List[Migration] = [
+    Migration(
+        version="0001_projects_owner_id",
+        description="Thêm cột owner_id vào bảng projects",
+        statements=["ALTER TABLE projects ADD COLUMN IF NOT EXISTS owner_id VARCHAR"],
+    ),
+    Migration(
+        version="0002_hot_query_indexes",
+        description="Index cho các truy vấn danh sách và phân quyền (tasks, meetings, project_members)",
+        statements=[
+            _create_index("ix_tasks_project_status", "tasks", "project_id, status"),
+            _create_index("ix_tasks_assignee_status", "tasks", "assignee_id, status"),
+            _create_index("ix_tasks_project_updated", "tasks", "project_id, updated_at, id"),
+            _create_index("ix_meetings_project_start", "meetings", "project_id, start_date, id"),
+            _create_index("ix_project_members_project_user", "project_members", "project_id, user_id"),
+        ],
+        concurrent=True,
+    ),
+]
+
+# Biểu thức tsvector phải khớp với Computed(...) trong src/models/
+_TASK_VECTOR = (
+    "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(description, '')), 'B')"
+)
+_PROJECT_VECTOR = (
+    "setweight(to_tsvector('simple', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(description, '')), 'B')"
+)
+_MEETING_VECTOR = (
+    "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(summary, '') || ' ' || coalesce(description, '')), 'B') || "
+    "setweight(to_tsvector('simple', left(coalesce(transcript, ''), 500000)), 'C')"
+)
+
+MIGRATIONS += [
+    Migration(
+        version="0003_search_vectors",
+        description="Cột tsvector (GENERATED) cho tasks, projects, meetings và extension pg_trgm",
+        statements=[
+            "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+            f"ALTER TABLE tasks ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS ({_TASK_VECTOR}) STORED",
+            f"ALTER TABLE projects ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS ({_PROJECT_VECTOR}) STORED",
+            f"ALTER TABLE meetings ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS ({_MEETING_VECTOR}) STORED",
+        ],
+    ),
+    Migration(
+        version="0004_search_indexes",
+        description="Index GIN cho tìm kiếm toàn văn và trigram cho người dùng",
+        statements=[
+            _create_index("ix_tasks_search", "tasks", "search_vector", using="gin"),
+            _create_index("ix_projects_search", "projects", "search_vector", using="gin"),
+            _create_index("ix_meetings_search", "meetings", "search_vector", using="gin"),
+            _create_index("ix_users_name_trgm", "users", "name gin_trgm_ops", using="gin"),
+            _create_index("ix_users_username_trgm", "users", "username gin_trgm_ops", using="gin"),
+            _create_index("ix_users_email_trgm", "users", "email gin_trgm_ops", using="gin"),
+        ],
+        concurrent=True,
+    ),
+]
+
+MIGRATIONS += [
+    Migration(
+        version="0005_analysis_jobs_requested_by",
+        description="analysis_jobs: lưu người kích hoạt thay cho JWT, xóa cột token",
+        statements=[
+            "ALTER TABLE IF EXISTS analysis_jobs ADD COLUMN IF NOT EXISTS requested_by VARCHAR "
+            "REFERENCES users(id) ON DELETE SET NULL",
+            "ALTER TABLE IF EXISTS analysis_jobs DROP COLUMN IF EXISTS token",
+        ],
+    ),
+    Migration(
+        version="0006_analysis_jobs_dedupe_active",
+        description="analysis_jobs: chỉ giữ job đang chờ/đang chạy cũ nhất của mỗi cuộc họp (chuẩn bị cho index UNIQUE)",
+        statements=[
+            "UPDATE analysis_jobs SET status = 'failed', finished_at = now(), locked_by = NULL, locked_at = NULL, "
+            "last_error = 'Duplicate of an earlier active job' "
+            "WHERE status IN ('queued', 'running') AND id NOT IN ("
+            " SELECT DISTINCT ON (meeting_id) id FROM analysis_jobs"
+            " WHERE status IN ('queued', 'running') ORDER BY meeting_id, created_at, id)",
+        ],
+    ),
+    Migration(
+        version="0007_analysis_jobs_active_unique",
+        description="Index UNIQUE một phần: mỗi cuộc họp có tối đa một job đang chờ/đang chạy",
+        statements=[
+            _create_index("ux_analysis_jobs_meeting_active", "analysis_jobs", "meeting_id",
+                          unique=True, where="status IN ('queued', 'running')"),
+        ],
+        concurrent=True,
+    ),
+    Migration(
+        version="0008_tasks_updated_at_not_null",
+        description="tasks.updated_at NOT NULL (khóa phân trang keyset), điền giá trị cho dòng cũ",
+        statements=[
+            "UPDATE tasks SET updated_at = COALESCE(created_at, now()) WHERE updated_at IS NULL",
+            "ALTER TABLE tasks ALTER COLUMN updated_at SET DEFAULT now()",
+            "ALTER TABLE tasks ALTER COLUMN updated_at SET NOT NULL",
+        ],
+    ),
+]
+
+# Các bảng mà ứng dụng quan tâm khi báo cáo mức độ sử dụng index
+APP_TABLES = ("users", "projects", "project_members", "tasks", "meetings", "meeting_attendees", "analysis_jobs")
+
+
+def _ensure_migrations_table(engine: Engine):
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE IF NOT EXISTS schema_migrations ("
+            " version VARCHAR PRIMARY KEY,"
+            " applied_at TIMESTAMP NOT NULL DEFAULT now())"
+        ))
+
+
+def get_applied_versions(engine: Engine) -> List[str]:
+    """Danh sách version đã chạy (theo thứ tự áp dụng)."""
+    _ensure_migrations_table(engine)
+    with engine.connect() as conn:
+        rows = conn.execute(text("SELECT version FROM schema_migrations ORDER BY applied_at, version"))
+        return [row[0] for row in rows]
+
+
+def read_applied_versions(conn: Connection) -> List[str]:
+    """
+    Phiên bản chỉ đọc của get_applied_versions (dùng cho API giám sát): không chạy DDL,
+    trả về danh sách rỗng nếu bảng schema_migrations chưa tồn tại.
+    """
+    if conn.execute(text("SELECT to_regclass('schema_migrations')")).scalar() is None:
+        return []
+    rows = conn.execute(text("SELECT version FROM schema_migrations ORDER BY applied_at, version"))
+    return [row[0] for row in rows]
+
+
+def _drop_invalid_index(conn: Connection, statement: str):
+    """
+    Một lần CREATE INDEX CONCURRENTLY bị gián đoạn sẽ để lại index INVALID,
+    và IF NOT EXISTS sẽ bỏ qua nó mãi mãi. Xóa index đó trước khi tạo lại.
+    """
+    if "INDEX CONCURRENTLY IF NOT EXISTS" not in statement:
+        return
+    name = statement.split("IF NOT EXISTS", 1)[1].split()[0]
+    invalid = conn.execute(text(
+        "SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+        "WHERE c.relname = :name AND NOT i.indisvalid"
+    ), {"name": name}).first()
+    if invalid:
+        print(f"  ⚠️ Dropping invalid index {name} before rebuilding it...")
+        conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+
+
+def _apply(engine: Engine, migration: Migration):
+    if migration.concurrent:
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            for statement in migration.statements:
+                _drop_invalid_index(conn, statement)
+                conn.execute(text(statement))
+    else:
+        with engine.begin() as conn:
+            for statement in migration.statements:
+                conn.execute(text(statement))
+
+    with engine.begin() as conn:
+        conn.execute(
+            text("INSERT INTO schema_migrations (version) VALUES (:version) ON CONFLICT DO NOTHING"),
+            {"version": migration.version},
+        )
+
+
+def run_migrations(engine: Engine, target: Optional[str] = None, force: bool = False) -> List[str]:
+    """
+    Chạy các migration chưa được áp dụng (hoặc tất cả nếu force=True).
+
+    :param target: Chỉ chạy đến (và bao gồm) version này.
+    :param force: Chạy lại cả những migration đã ghi nhận (an toàn vì câu lệnh idempotent).
+    :return: Danh sách version vừa được chạy.
+    """
+    applied = set(get_applied_versions(engine))
+    executed = []
+    for migration in MIGRATIONS:
+        if force or migration.version not in applied:
+            print(f"Migrating: {migration.version} - {migration.description}...")
+            _apply(engine, migration)
+            executed.append(migration.version)
+        if target and migration.version == target:
+            break
+    return executed
+
+
+def get_index_usage(conn: Connection) -> List[Dict[str, Any]]:
+    """
+    Thống kê sử dụng index từ pg_stat_user_indexes.
+    idx_scan = 0 trong thời gian dài nghĩa là index không được dùng (ứng viên để xóa),
+    còn seq_scan cao trên bảng lớn nghĩa là đang thiếu index.
+    """
+    rows = conn.execute(text(
+        "SELECT s.relname AS table_name, s.indexrelname AS index_name, s.idx_scan, "
+        "       s.idx_tup_read, s.idx_tup_fetch, i.indisvalid AS is_valid, "
+        "       pg_relation_size(s.indexrelid) AS size_bytes, t.seq_scan AS table_seq_scan "
+        "FROM pg_stat_user_indexes s "
+        "JOIN pg_index i ON i.indexrelid = s.indexrelid "
+        "JOIN pg_stat_user_tables t ON t.relid = s.relid "
+        "WHERE s.relname = ANY(:tables) "
+        "ORDER BY s.relname, s.indexrelname"
+    ), {"tables": list(APP_TABLES)})
+    return [dict(row._mapping) for row in rows]
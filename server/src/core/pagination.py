@@ -0,0 +1,112 @@
+"""
+server/src/core/pagination.py
+Phân trang theo con trỏ (Keyset / Cursor Pagination).
+Thay vì OFFSET (chậm dần theo số trang), mỗi trang được lọc bằng điều kiện
+(sort_column, id) < (giá trị cuối trang trước), tận dụng được index và luôn có chi phí ổn định.
+"""
+
+import base64
+import json
+import os
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import Select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Query
+
+# Kích thước trang mặc định và tối đa (chặn client yêu cầu trang quá lớn)
+DEFAULT_PAGE_SIZE = int(os.getenv("DEFAULT_PAGE_SIZE", "50"))
+MAX_PAGE_SIZE = int(os.getenv("MAX_PAGE_SIZE", "200"))
+
+# Header trả về con trỏ của trang kế tiếp (giữ nguyên body dạng List để tương thích client cũ)
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def clamp_page_size(limit: Optional[int]) -> int:
+    """Chuẩn hóa kích thước trang về khoảng [1, MAX_PAGE_SIZE]."""
+    if not limit:
+        return DEFAULT_PAGE_SIZE
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+
+def encode_cursor(sort_key: str, sort_value: Any, item_id: str) -> str:
+    """Mã hóa vị trí cuối trang thành chuỗi con trỏ mờ (opaque), an toàn cho URL."""
+    if isinstance(sort_value, datetime):
+        sort_value = sort_value.isoformat()
+    raw = json.dumps({"k": sort_key, "v": sort_value, "id": item_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_key: str) -> Tuple[datetime, str]:
+    """Giải mã con trỏ; ném lỗi 400 nếu con trỏ sai định dạng hoặc thuộc endpoint khác."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if data["k"] != sort_key:
+            raise ValueError("cursor sort key mismatch")
+        return datetime.fromisoformat(data["v"]), str(data["id"])
+    except (ValueError, KeyError, TypeError, json.JSONDecodeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Con trỏ phân trang (cursor) không hợp lệ.")
+
+
+def _keyset_window(query, sort_column, id_column, page_size: int, cursor: Optional[str], descending: bool):
+    """Thêm điều kiện con trỏ, ORDER BY và LIMIT (dư 1 phần tử) - dùng chung cho Query sync và select() async."""
+    if cursor:
+        last_value, last_id = decode_cursor(cursor, sort_column.key)
+        position = tuple_(sort_column, id_column)
+        boundary = tuple_(last_value, last_id)
+        query = query.filter(position < boundary if descending else position > boundary)
+
+    if descending:
+        query = query.order_by(sort_column.desc(), id_column.desc())
+    else:
+        query = query.order_by(sort_column.asc(), id_column.asc())
+
+    # Lấy dư 1 phần tử để biết còn trang sau hay không
+    return query.limit(page_size + 1)
+
+
+def _split_page(rows: List[Any], page_size: int, sort_key: str) -> Tuple[List[Any], Optional[str]]:
+    """Cắt trang và tạo con trỏ từ phần tử cuối (None nếu đã tới trang cuối)."""
+    items = rows[:page_size]
+    next_cursor = None
+    if len(rows) > page_size:
+        last = items[-1]
+        next_cursor = encode_cursor(sort_key, getattr(last, sort_key), last.id)
+    return items, next_cursor
+
+
+def keyset_paginate(
+    query: Query,
+    sort_column,
+    id_column,
+    limit: Optional[int],
+    cursor: Optional[str],
+    descending: bool = True,
+) -> Tuple[List[Any], Optional[str]]:
+    """
+    Áp dụng phân trang keyset cho một Query SQLAlchemy.
+
+    Returns:
+        (items, next_cursor): next_cursor là None nếu đã tới trang cuối.
+    """
+    page_size = clamp_page_size(limit)
+    rows = _keyset_window(query, sort_column, id_column, page_size, cursor, descending).all()
+    return _split_page(rows, page_size, sort_column.key)
+
+
+async def async_keyset_paginate(
+    db: AsyncSession,
+    stmt: Select,
+    sort_column,
+    id_column,
+    limit: Optional[int],
+    cursor: Optional[str],
+    descending: bool = True,
+) -> Tuple[List[Any], Optional[str]]:
+    """Phiên bản async của keyset_paginate: thực thi câu lệnh select() qua AsyncSession (DB_ASYNC_MODE)."""
+    page_size = clamp_page_size(limit)
+    result = await db.execute(_keyset_window(stmt, sort_column, id_column, page_size, cursor, descending))
+    return _split_page(list(result.scalars().all()), page_size, sort_column.key)
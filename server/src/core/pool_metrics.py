@@ -0,0 +1,145 @@
+"""
+server/src/core/pool_metrics.py
+Thu thập số liệu (metrics) của Connection Pool từ các sự kiện (events) của SQLAlchemy.
+Giúp xác định độ trễ đến từ việc thiếu kết nối (pool starvation) hay từ chính Postgres.
+"""
+
+import threading
+import time
+from typing import Any, Dict, Optional, Type
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import Pool
+
+
+class PoolMetrics:
+    """Bộ đếm an toàn đa luồng cho một Connection Pool."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.invalidations = 0
+        self.liveness_failures = 0
+        self.waits = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+        self.timeouts = 0
+        self.overflow_peak = 0
+        self.pool: Optional[Pool] = None
+
+    def incr(self, field: str, amount: int = 1):
+        with self._lock:
+            setattr(self, field, getattr(self, field) + amount)
+
+    def observe_overflow(self, overflow: int):
+        """Cập nhật đỉnh overflow (số kết nối vượt pool_size) từng quan sát được."""
+        with self._lock:
+            if overflow > self.overflow_peak:
+                self.overflow_peak = overflow
+
+    def record_wait(self, seconds: float):
+        """Ghi nhận thời gian chờ lấy kết nối từ pool (kể cả khi tạo kết nối mới)."""
+        with self._lock:
+            self.waits += 1
+            self.wait_time_total += seconds
+            self.wait_time_max = max(self.wait_time_max, seconds)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Trả về trạng thái hiện tại của pool dưới dạng dict (cho endpoint /metrics)."""
+        pool = self.pool
+        checked_out = pool.checkedout() if pool is not None and hasattr(pool, "checkedout") else None
+        overflow = pool.overflow() if pool is not None and hasattr(pool, "overflow") else None
+        if overflow is not None:
+            self.observe_overflow(overflow)
+        with self._lock:
+            return {
+                "pool": self.name,
+                "size": pool.size() if pool is not None and hasattr(pool, "size") else None,
+                "checked_out": checked_out,
+                "overflow": overflow,
+                "overflow_peak": self.overflow_peak,
+                "connects": self.connects,
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "invalidations": self.invalidations,
+                "liveness_failures": self.liveness_failures,
+                "timeouts": self.timeouts,
+                "wait_count": self.waits,
+                "wait_time_total_ms": round(self.wait_time_total * 1000, 3),
+                "wait_time_avg_ms": round(self.wait_time_total * 1000 / self.waits, 3) if self.waits else 0.0,
+                "wait_time_max_ms": round(self.wait_time_max * 1000, 3),
+            }
+
+
+def instrumented_pool_class(base: Type[Pool], metrics: PoolMetrics) -> Type[Pool]:
+    """
+    Tạo lớp Pool con đo thời gian chờ lấy kết nối.
+    SQLAlchemy không có event "trước khi checkout", nên ta bọc _do_get của pool gốc.
+    Metrics được gắn ở cấp class để vẫn còn hiệu lực sau pool.recreate().
+    """
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return base._do_get(self)
+        except exc.TimeoutError:
+            metrics.incr("timeouts")
+            raise
+        finally:
+            metrics.record_wait(time.perf_counter() - start)
+
+    return type(f"Instrumented{base.__name__}", (base,), {"_do_get": _do_get})
+
+
+def register_pool_events(engine: Engine, metrics: PoolMetrics,
+                         liveness: str = "pre_ping", idle_ping_seconds: float = 30.0):
+    """
+    Đăng ký các listeners cho pool của engine (với AsyncEngine truyền vào .sync_engine).
+
+    liveness="idle_ping": chỉ ping (SELECT 1) những kết nối đã nằm im lâu hơn idle_ping_seconds,
+    rẻ hơn pool_pre_ping vốn thêm một round trip cho MỌI lần checkout.
+    """
+    metrics.pool = engine.pool
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        metrics.incr("connects")
+
+    @event.listens_for(engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        metrics.incr("checkouts")
+        if hasattr(engine.pool, "overflow"):
+            metrics.observe_overflow(engine.pool.overflow())
+
+        if liveness != "idle_ping":
+            return
+        last_checkin = connection_record.info.get("last_checkin")
+        if last_checkin is None or time.monotonic() - last_checkin < idle_ping_seconds:
+            return
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute("SELECT 1")
+        except Exception:
+            metrics.incr("liveness_failures")
+            # Pool sẽ loại bỏ kết nối này và thử lại với kết nối mới.
+            raise exc.DisconnectionError()
+        finally:
+            cursor.close()
+
+    @event.listens_for(engine, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        metrics.incr("checkins")
+        connection_record.info["last_checkin"] = time.monotonic()
+
+    @event.listens_for(engine, "invalidate")
+    def _on_invalidate(dbapi_connection, connection_record, exception):
+        metrics.incr("invalidations")
+
+
+# Metrics toàn cục cho 2 engine của ứng dụng
+sync_pool_metrics = PoolMetrics("sync")
+async_pool_metrics = PoolMetrics("async")
@@ -12,9 +12,11 @@ from jose import JWTError, jwt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
-from src.core.database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.core.database import get_db, get_async_db, DB_ASYNC_MODE
+from src.core.cache import TTLCache
 from src.schemas.user import UserOut
-from src.repositories.user_repository import UserRepository
+from src.repositories.user_repository import UserRepository, AsyncUserRepository
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -26,6 +28,12 @@ ALGORITHM = "HS256"
 # Token có hiệu lực trong bao lâu (Mặc định: 7 ngày)
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24 * 7 
 
+# Cache thông tin User đã xác thực (UserOut) theo user_id, tránh truy vấn DB ở mỗi Request.
+# TTL ngắn để các thay đổi từ tiến trình khác (worker khác) cũng sớm có hiệu lực.
+USER_CACHE_MAXSIZE = int(os.getenv("USER_CACHE_MAXSIZE", "1024"))
+USER_CACHE_TTL_SECONDS = float(os.getenv("USER_CACHE_TTL_SECONDS", "60"))
+user_cache = TTLCache(maxsize=USER_CACHE_MAXSIZE, ttl=USER_CACHE_TTL_SECONDS, name="current_user")
+
 # oauth2_scheme: FastAPI sẽ tìm kiếm token trong Header 'Authorization: Bearer <token>'
 oauth2_scheme = OAuth2PasswordBearer(
     tokenUrl="/v1/users/login",
@@ -81,26 +89,66 @@ def decode_access_token(token: str) -> str:
 
 # --- 4. Dependency: get_current_user ---
 
-def get_current_user(
+def invalidate_user_cache(user_id: str):
+    """Xóa User khỏi cache. Bắt buộc gọi sau mỗi lần cập nhật thông tin User."""
+    user_cache.invalidate(str(user_id))
+
+def _user_not_found() -> HTTPException:
+    """Lỗi 401 chung khi Token hợp lệ nhưng User không còn tồn tại."""
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Người dùng không tồn tại hoặc phiên đăng nhập đã hết hạn.",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+def _get_current_user_sync(
     db: Session = Depends(get_db), 
     token: str = Depends(oauth2_scheme)
 ) -> UserOut:
     """
     Hàm Dependency này sẽ được chèn vào các Endpoint cần bảo mật.
-    Tự động trích xuất Token -> Giải mã lấy User ID -> Truy vấn User từ DB.
+    Tự động trích xuất Token -> Giải mã lấy User ID -> Lấy User từ cache hoặc truy vấn DB.
     
     Returns:
         UserOut: Thông tin người dùng hiện tại nếu hợp lệ.
     """
     user_id = decode_access_token(token)
+    cached = user_cache.get(user_id)
+    if cached is not None:
+        return cached
+
     repo = UserRepository(db)
     user = repo.get_by_id(user_id)
     
     if user is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Người dùng không tồn tại hoặc phiên đăng nhập đã hết hạn.",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+        raise _user_not_found()
     
-    return UserOut.model_validate(user)
\ No newline at end of file
+    user_out = UserOut.model_validate(user)
+    user_cache.set(user_id, user_out)
+    return user_out
+
+async def _get_current_user_async(
+    db: AsyncSession = Depends(get_async_db),
+    token: str = Depends(oauth2_scheme)
+) -> UserOut:
+    """
+    Phiên bản async của get_current_user (DB_ASYNC_MODE=true).
+    Truy vấn User qua AsyncSession, không chiếm luồng của threadpool.
+    """
+    user_id = decode_access_token(token)
+    cached = user_cache.get(user_id)
+    if cached is not None:
+        return cached
+
+    repo = AsyncUserRepository(db)
+    user = await repo.get_by_id(user_id)
+
+    if user is None:
+        raise _user_not_found()
+
+    user_out = UserOut.model_validate(user)
+    user_cache.set(user_id, user_out)
+    return user_out
+
+# Chọn Dependency theo cấu hình: các Router chỉ cần import get_current_user.
+get_current_user = _get_current_user_async if DB_ASYNC_MODE else _get_current_user_sync
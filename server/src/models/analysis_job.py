@@ -0,0 +1,68 @@
+"""
+server/src/models/analysis_job.py
+Định nghĩa bảng 'analysis_jobs' - hàng đợi bền vững (Postgres) cho việc phân tích cuộc họp bằng AI.
+Worker (server/worker.py) nhận job bằng SELECT ... FOR UPDATE SKIP LOCKED nên nhiều worker có thể chạy song song.
+"""
+
+from sqlalchemy import Column, String, Text, DateTime, ForeignKey, Integer, Boolean, Index, text
+from .base import Base
+from datetime import datetime
+
+# Trạng thái của một job
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+
+ACTIVE_JOB_STATUSES = (JOB_QUEUED, JOB_RUNNING)
+
+
+class AnalysisJob(Base):
+    __tablename__ = 'analysis_jobs'
+
+    # Index cho truy vấn lấy job tiếp theo và tra cứu trạng thái theo cuộc họp
+    __table_args__ = (
+        Index('ix_analysis_jobs_status_run_after', 'status', 'run_after'),
+        Index('ix_analysis_jobs_meeting_created', 'meeting_id', 'created_at'),
+        # Mỗi cuộc họp có tối đa một job đang chờ/đang chạy (chặn hai Request đồng thời cùng xếp job)
+        Index('ux_analysis_jobs_meeting_active', 'meeting_id', unique=True,
+              postgresql_where=text("status IN ('queued', 'running')")),
+    )
+
+    # ID duy nhất của job (UUID)
+    id = Column(String, primary_key=True)
+
+    # Cuộc họp cần phân tích (xóa cuộc họp thì xóa luôn job)
+    meeting_id = Column(String, ForeignKey('meetings.id', ondelete='CASCADE'), nullable=False)
+
+    # Trạng thái: queued -> running -> completed / failed (hoặc quay lại queued để thử lại)
+    status = Column(String(20), nullable=False, default=JOB_QUEUED)
+
+    # Bỏ qua bước duyệt (Human-in-the-loop) khi gọi AI Service
+    skip_review = Column(Boolean, nullable=False, default=True)
+
+    # Người kích hoạt. Không lưu JWT của người dùng: mỗi lần chạy Worker cấp một token ngắn hạn cho User này
+    # để AI Service gọi ngược lại API (tạo task)
+    requested_by = Column(String, ForeignKey('users.id', ondelete='SET NULL'), nullable=True)
+
+    # Số lần đã chạy và số lần tối đa được phép
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=3)
+
+    # Job chỉ được nhận sau thời điểm này (dùng cho backoff khi thử lại)
+    run_after = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    # Worker đang giữ job và thời điểm nhận (để thu hồi job của worker bị chết)
+    locked_by = Column(String(255), nullable=True)
+    locked_at = Column(DateTime, nullable=True)
+
+    # Lỗi gần nhất (nếu có)
+    last_error = Column(Text, nullable=True)
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    finished_at = Column(DateTime, nullable=True)
+
+    def __repr__(self):
+        """Định dạng chuỗi đại diện cho job."""
+        return f"<AnalysisJob(id='{self.id}', meeting_id='{self.meeting_id}', status='{self.status}')>"
@@ -4,8 +4,9 @@ server/src/models/meeting.py
 Lưu trữ thông tin về cuộc họp, thành phần tham dự và các kết quả phân tích từ AI.
 """
 
-from sqlalchemy import Column, String, Text, DateTime, ForeignKey, ARRAY, Table
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, String, Text, DateTime, ForeignKey, ARRAY, Table, Index, Computed
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import relationship, deferred
 from .base import Base
 from datetime import datetime
 
@@ -20,6 +21,12 @@ meeting_attendees = Table(
 class Meeting(Base):
     __tablename__ = 'meetings'
 
+    # Index cho danh sách/timeline cuộc họp theo dự án (khớp migration trong src/core/migrations.py)
+    __table_args__ = (
+        Index('ix_meetings_project_start', 'project_id', 'start_date', 'id'),
+        Index('ix_meetings_search', 'search_vector', postgresql_using='gin'),
+    )
+
     # ID duy nhất của cuộc họp
     id = Column(String, primary_key=True)
     
@@ -47,6 +54,18 @@ class Meeting(Base):
     # Bản tóm tắt các nội dung quan trọng do AI tạo ra (Summary)
     summary = Column(Text, nullable=True)
     
+    # Vector tìm kiếm toàn văn: tiêu đề > tóm tắt/mô tả > transcript.
+    # Transcript được cắt bớt để không vượt giới hạn 1MB của tsvector.
+    search_vector = deferred(Column(
+        TSVECTOR,
+        Computed(
+            "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('simple', coalesce(summary, '') || ' ' || coalesce(description, '')), 'B') || "
+            "setweight(to_tsvector('simple', left(coalesce(transcript, ''), 500000)), 'C')",
+            persisted=True,
+        ),
+    ))
+    
     # Danh sách các ID người tham dự (Cách lưu đơn giản bằng mảng)
     attendee_ids = Column(ARRAY(String), default=[]) 
     
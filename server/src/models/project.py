@@ -4,8 +4,9 @@ server/src/models/project.py
 Quản lý thông tin dự án và danh sách thành viên tham gia dự án.
 """
 
-from sqlalchemy import Column, String, Text, ForeignKey, Table
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, String, Text, ForeignKey, Table, Index, Computed
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import relationship, deferred
 from .base import Base 
 
 # Bảng trung gian (Association Table) liên kết Nhiều-Nhiều giữa Dự án và Người dùng.
@@ -14,12 +15,19 @@ project_members = Table(
     'project_members', 
     Base.metadata,
     Column('user_id', String, ForeignKey('users.id'), primary_key=True),
-    Column('project_id', String, ForeignKey('projects.id'), primary_key=True)
+    Column('project_id', String, ForeignKey('projects.id'), primary_key=True),
+    # Khóa chính (user_id, project_id) đã phục vụ tra cứu theo user_id;
+    # index ngược (project_id, user_id) phục vụ tra cứu thành viên theo dự án.
+    Index('ix_project_members_project_user', 'project_id', 'user_id'),
 )
 
 class Project(Base):
     __tablename__ = 'projects'
 
+    __table_args__ = (
+        Index('ix_projects_search', 'search_vector', postgresql_using='gin'),
+    )
+
     # ID duy nhất của dự án
     id = Column(String, primary_key=True)
     
@@ -32,6 +40,16 @@ class Project(Base):
     # ID của người tạo dự án (Manager)
     owner_id = Column(String, ForeignKey('users.id'), nullable=True)
 
+    # Vector tìm kiếm toàn văn (tên + mô tả), do Postgres tự cập nhật khi ghi.
+    search_vector = deferred(Column(
+        TSVECTOR,
+        Computed(
+            "setweight(to_tsvector('simple', coalesce(name, '')), 'A') || "
+            "setweight(to_tsvector('simple', coalesce(description, '')), 'B')",
+            persisted=True,
+        ),
+    ))
+
     # --- Các mối quan hệ (Relationships) ---
     
     # 1. Danh sách các công việc (Task) thuộc về dự án này.
@@ -4,14 +4,24 @@ server/src/models/task.py
 Lưu trữ thông tin chi tiết về từng công việc, bao gồm tiêu đề, trạng thái, người thực hiện và ngày hạn.
 """
 
-from sqlalchemy import Column, String, Text, DateTime, ForeignKey, ARRAY, Integer
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, String, Text, DateTime, ForeignKey, ARRAY, Integer, Index, Computed
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import relationship, deferred
 from .base import Base 
 from datetime import datetime
 
 class Task(Base):
     __tablename__ = 'tasks'
 
+    # Index phục vụ các truy vấn nóng (Kanban theo dự án, 'My Tasks', phân trang keyset).
+    # Tên index phải khớp với migration trong src/core/migrations.py.
+    __table_args__ = (
+        Index('ix_tasks_project_status', 'project_id', 'status'),
+        Index('ix_tasks_assignee_status', 'assignee_id', 'status'),
+        Index('ix_tasks_project_updated', 'project_id', 'updated_at', 'id'),
+        Index('ix_tasks_search', 'search_vector', postgresql_using='gin'),
+    )
+
     # ID duy nhất của công việc (UUID)
     id = Column(String, primary_key=True)
     
@@ -46,13 +56,25 @@ class Task(Base):
     # Ngày hết hạn công việc
     due_date = Column(DateTime, nullable=True)
     
+    # Vector tìm kiếm toàn văn (Full-text search): do Postgres tự tính lại mỗi khi ghi (GENERATED column).
+    # deferred: không tải cột này trong các truy vấn thông thường.
+    search_vector = deferred(Column(
+        TSVECTOR,
+        Computed(
+            "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('simple', coalesce(description, '')), 'B')",
+            persisted=True,
+        ),
+    ))
+    
     # --- Thông tin thời gian (Audit fields) ---
     
     # Tự động lưu thời điểm tạo bản ghi
     created_at = Column(DateTime, default=datetime.utcnow)
     
-    # Tự động cập nhật thời điểm sửa đổi dữ liệu
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Tự động cập nhật thời điểm sửa đổi dữ liệu.
+    # NOT NULL: là khóa sắp xếp của phân trang keyset (NULL không so sánh được trong con trỏ)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
     
     # --- Các mối quan hệ (Relationships) ---
     
@@ -0,0 +1,38 @@
+"""
+server/src/models/transcript_segment.py
+Định nghĩa bảng 'meeting_transcript_segments' - các đoạn transcript được ghi chép trực tiếp trong lúc họp
+(Socket.IO namespace /transcription, xem src/realtime/live_transcription.py).
+Khi cuộc họp kết thúc, các đoạn được ghép thành Meeting.transcript để phân tích ngay, không cần chờ STT cả file ghi âm.
+"""
+
+from sqlalchemy import Column, String, Text, Float, ForeignKey, Index
+from .base import Base
+
+
+class MeetingTranscriptSegment(Base):
+    __tablename__ = 'meeting_transcript_segments'
+
+    # Index cho việc ghép transcript theo thứ tự thời gian của từng cuộc họp
+    __table_args__ = (
+        Index('ix_transcript_segments_meeting_start', 'meeting_id', 'start_seconds'),
+    )
+
+    # ID duy nhất của đoạn (UUID)
+    id = Column(String, primary_key=True)
+
+    # Cuộc họp chứa đoạn này (xóa cuộc họp thì xóa luôn các đoạn)
+    meeting_id = Column(String, ForeignKey('meetings.id', ondelete='CASCADE'), nullable=False)
+
+    # Người nói (None: luồng âm thanh đã trộn, không biết ai nói)
+    speaker = Column(String(255), nullable=True)
+
+    # Thời điểm bắt đầu / kết thúc (giây, tính từ lúc bắt đầu ghi chép cuộc họp)
+    start_seconds = Column(Float, nullable=False)
+    end_seconds = Column(Float, nullable=False)
+
+    # Nội dung đoạn hội thoại
+    text = Column(Text, nullable=False)
+
+    def __repr__(self):
+        """Định dạng chuỗi đại diện cho đoạn transcript."""
+        return f"<MeetingTranscriptSegment(meeting_id='{self.meeting_id}', start={self.start_seconds})>"
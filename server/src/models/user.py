@@ -4,13 +4,20 @@ server/src/models/user.py
 Lưu trữ thông tin chi tiết về người dùng, bao gồm thông tin xác thực và các mối quan hệ với Task, Project.
 """
 
-from sqlalchemy import Column, String, Boolean, Text
+from sqlalchemy import Column, String, Boolean, Text, Index
 from sqlalchemy.orm import relationship
 from .base import Base 
 
 class User(Base):
     __tablename__ = 'users'
 
+    # Index trigram (pg_trgm) cho tìm kiếm người dùng theo chuỗi con / gõ tới đâu gợi ý tới đó.
+    __table_args__ = (
+        Index('ix_users_name_trgm', 'name', postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'}),
+        Index('ix_users_username_trgm', 'username', postgresql_using='gin', postgresql_ops={'username': 'gin_trgm_ops'}),
+        Index('ix_users_email_trgm', 'email', postgresql_using='gin', postgresql_ops={'email': 'gin_trgm_ops'}),
+    )
+
     # Trường khóa chính: Sử dụng chuỗi UUID để đảm bảo tính duy nhất và bảo mật
     id = Column(String, primary_key=True)
     
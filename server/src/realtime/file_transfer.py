@@ -35,7 +35,7 @@ def register_file_transfer_handlers(sio: AsyncServer):
 
         online_users[sid] = username
         available_files[username] = []
-        sio.enter_room(sid, 'sharing_space')
+        await sio.enter_room(sid, 'sharing_space')
         
         # Phát sóng cập nhật
         await sio.emit('users_updated', {'onlineUsers': list(online_users.values())}, room='sharing_space')
@@ -0,0 +1,115 @@
+# src/realtime/live_transcription.py
+
+from socketio import AsyncServer
+from socketio.exceptions import ConnectionRefusedError
+from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+from typing import Dict, Any, List, Optional
+
+from src.core.database import SessionLocal
+from src.core.security import decode_access_token
+from src.core.logger import logger
+from src.services.live_transcription_service import SAMPLE_RATE, LiveTranscriptService, live_transcriptions
+
+# Namespace riêng: có sự kiện connect/disconnect riêng, không đụng tới handlers của signaling / file transfer
+NAMESPACE = '/transcription'
+
+
+def _room(meeting_id: str) -> str:
+    return f"transcript:{meeting_id}"
+
+
+def _with_service(fn, *args):
+    """Chạy một thao tác LiveTranscriptService với Session DB riêng (gọi trong threadpool)."""
+    db = SessionLocal()
+    try:
+        return fn(LiveTranscriptService(db), *args)
+    finally:
+        db.close()
+
+
+def _extract_token(environ: Dict[str, Any], auth: Optional[Dict[str, Any]]) -> Optional[str]:
+    """Token từ auth của Socket.IO ({token}) hoặc header Authorization: Bearer ..."""
+    token = (auth or {}).get('token') if isinstance(auth, dict) else None
+    if not token:
+        header = environ.get('HTTP_AUTHORIZATION', '')
+        token = header[7:] if header.startswith('Bearer ') else None
+    return token
+
+
+def register_live_transcription_handlers(sio: AsyncServer):
+    """
+    Đăng ký handlers nhận âm thanh trực tiếp của cuộc họp (namespace /transcription).
+    Client:
+      - connect với auth={token: <JWT>}                       (thiếu / sai token: từ chối kết nối)
+      - emit('start_transcription', {meeting_id, speaker?})  -> ack {ok, sample_rate}; chỉ thành viên dự án của cuộc họp
+      - emit('audio_chunk', <bytes>)                          PCM 16-bit little-endian, mono, 16 kHz
+      - emit('stop_transcription')                           -> ack {ok, transcript_ready}
+      - on('transcript_segments', {meeting_id, segments})    các đoạn vừa được chốt
+      - on('transcript_ready', {meeting_id})                 transcript đã ghép xong, có thể phân tích ngay
+    """
+
+    async def on_segments(meeting_id: str, segments: List[Dict[str, Any]]):
+        await run_in_threadpool(_with_service, LiveTranscriptService.save_segments, meeting_id, segments)
+        await sio.emit('transcript_segments', {'meeting_id': meeting_id, 'segments': segments},
+                       room=_room(meeting_id), namespace=NAMESPACE)
+
+    async def stop_stream(sid) -> bool:
+        meeting_id = await live_transcriptions.stop(sid)
+        if meeting_id is None:
+            return False
+        transcript = await run_in_threadpool(_with_service, LiveTranscriptService.finalize, meeting_id)
+        if transcript:
+            await sio.emit('transcript_ready', {'meeting_id': meeting_id}, room=_room(meeting_id), namespace=NAMESPACE)
+        return bool(transcript)
+
+    @sio.on('connect', namespace=NAMESPACE)
+    async def on_connect(sid, environ, auth=None):
+        token = _extract_token(environ, auth)
+        if not token:
+            raise ConnectionRefusedError('authentication required')
+        try:
+            user_id = decode_access_token(token)
+        except HTTPException:
+            raise ConnectionRefusedError('invalid token')
+        await sio.save_session(sid, {'user_id': user_id}, namespace=NAMESPACE)
+
+    @sio.on('start_transcription', namespace=NAMESPACE)
+    async def on_start_transcription(sid, data: Dict[str, Any]):
+        meeting_id = (data or {}).get('meeting_id')
+        if not meeting_id:
+            return {'ok': False, 'error': 'meeting_id is required'}
+        socket_session = await sio.get_session(sid, namespace=NAMESPACE)
+        user_id = socket_session.get('user_id')
+        # Kiểm tra trước khi vào room / nhận âm thanh: chỉ thành viên dự án mới nghe được và ghi vào transcript
+        access = await run_in_threadpool(_with_service, LiveTranscriptService.check_access, meeting_id, user_id)
+        if access is None:
+            return {'ok': False, 'error': 'Meeting not found'}
+        if not access:
+            return {'ok': False, 'error': 'Not a member of this project'}
+
+        # Client bắt đầu lại trên cùng kết nối: chốt luồng cũ và rời room cũ trước
+        await stop_stream(sid)
+        if socket_session.get('meeting_id'):
+            await sio.leave_room(sid, _room(socket_session['meeting_id']), namespace=NAMESPACE)
+        socket_session['meeting_id'] = meeting_id
+        await sio.save_session(sid, socket_session, namespace=NAMESPACE)
+        resume_offset = await run_in_threadpool(_with_service, LiveTranscriptService.resume_offset, meeting_id)
+        live_transcriptions.start(sid, meeting_id, data.get('speaker'), resume_offset, on_segments)
+        await sio.enter_room(sid, _room(meeting_id), namespace=NAMESPACE)
+        logger.info(f"🎙️ [LiveSTT] {sid} started streaming meeting {meeting_id}")
+        return {'ok': True, 'sample_rate': SAMPLE_RATE}
+
+    @sio.on('audio_chunk', namespace=NAMESPACE)
+    async def on_audio_chunk(sid, data):
+        if isinstance(data, (bytes, bytearray)):
+            live_transcriptions.feed(sid, bytes(data))
+
+    @sio.on('stop_transcription', namespace=NAMESPACE)
+    async def on_stop_transcription(sid, data=None):
+        return {'ok': True, 'transcript_ready': await stop_stream(sid)}
+
+    @sio.on('disconnect', namespace=NAMESPACE)
+    async def on_disconnect(sid, *args):
+        # Mất kết nối giữa chừng: phần âm thanh đã nhận vẫn được chốt
+        await stop_stream(sid)
@@ -3,6 +3,7 @@
 import socketio
 from src.realtime.signaling import register_signaling_handlers
 from src.realtime.file_transfer import register_file_transfer_handlers
+from src.realtime.live_transcription import register_live_transcription_handlers
 
 # Khởi tạo Socket.IO Server
 sio = socketio.AsyncServer(
@@ -11,12 +12,14 @@ sio = socketio.AsyncServer(
 )
 
 # Khởi tạo Socket.IO ASGI App
-# Đây là ứng dụng mà FastAPI sẽ mount vào
-socket_app = socketio.ASGIApp(sio)
+# Đây là ứng dụng mà FastAPI sẽ mount vào (tại /socket.io, xem main.py).
+# socketio_path=None: mọi Request đi vào mount đều là của Socket.IO, không phụ thuộc cách Starlette cắt path.
+socket_app = socketio.ASGIApp(sio, socketio_path=None)
 
 # Đăng ký tất cả các handlers
 register_signaling_handlers(sio, {}) # Tạm thời bỏ qua current_users
 register_file_transfer_handlers(sio)
+register_live_transcription_handlers(sio)
 
 def get_socketio_app():
     """Trả về ASGI app của Socket.IO."""
@@ -1,7 +1,6 @@
 # src/realtime/signaling.py
 
 from socketio import AsyncServer
-from flask import request # Giả định sử dụng request object cho sid
 from typing import Dict, Any
 
 # Giả sử chúng ta có một đối tượng AsyncServer được truyền vào
@@ -13,7 +12,7 @@ def register_signaling_handlers(sio: AsyncServer, current_users: Dict[str, str])
     async def on_join_room(sid, data: Dict[str, Any]):
         room = data.get('room')
         if room:
-            sio.enter_room(sid, room)
+            await sio.enter_room(sid, room)
             await sio.emit('user_joined', {'sid': sid}, room=room, skip_sid=sid)
             print(f"SID {sid} joined room {room}")
 
@@ -0,0 +1,59 @@
+# src/repositories/analysis_job_repository.py
+
+from datetime import datetime, timedelta
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+from src.models.analysis_job import AnalysisJob, ACTIVE_JOB_STATUSES, JOB_QUEUED, JOB_RUNNING
+from src.repositories.base_repository import BaseRepository
+from typing import Any, Dict, Optional
+
+class AnalysisJobRepository(BaseRepository):
+    def __init__(self, db: Session):
+        super().__init__(db, AnalysisJob)
+
+    def get_latest_for_meeting(self, meeting_id: str) -> Optional[AnalysisJob]:
+        """Lấy job phân tích mới nhất của một cuộc họp."""
+        return self.db.query(AnalysisJob).filter(
+            AnalysisJob.meeting_id == meeting_id
+        ).order_by(AnalysisJob.created_at.desc()).first()
+
+    def get_active_for_meeting(self, meeting_id: str) -> Optional[AnalysisJob]:
+        """Lấy job đang chờ/đang chạy của cuộc họp (tránh xếp hàng trùng lặp)."""
+        return self.db.query(AnalysisJob).filter(
+            AnalysisJob.meeting_id == meeting_id,
+            AnalysisJob.status.in_(ACTIVE_JOB_STATUSES)
+        ).first()
+
+    def claim_next(self, worker_id: str, lease_seconds: int) -> Optional[AnalysisJob]:
+        """
+        Nhận job tiếp theo đến hạn chạy.
+        FOR UPDATE SKIP LOCKED: các worker chạy song song không bao giờ nhận trùng một job và không chờ khóa của nhau.
+        Job 'running' quá thời hạn lease (worker bị chết giữa chừng) cũng được nhận lại.
+        """
+        now = datetime.utcnow()
+        job = self.db.query(AnalysisJob).filter(
+            or_(
+                (AnalysisJob.status == JOB_QUEUED) & (AnalysisJob.run_after <= now),
+                (AnalysisJob.status == JOB_RUNNING) & (AnalysisJob.locked_at < now - timedelta(seconds=lease_seconds)),
+            )
+        ).order_by(AnalysisJob.run_after, AnalysisJob.created_at).with_for_update(skip_locked=True).first()
+
+        if not job:
+            self.db.rollback()
+            return None
+
+        job.status = JOB_RUNNING
+        job.attempts += 1
+        job.locked_by = worker_id
+        job.locked_at = now
+        self.db.commit()
+        self.db.refresh(job)
+        return job
+
+    def update_fields(self, job: AnalysisJob, fields: Dict[str, Any]) -> AnalysisJob:
+        """Cập nhật job, kể cả các trường được đặt về None (khác BaseRepository.update)."""
+        for field, value in fields.items():
+            setattr(job, field, value)
+        self.db.commit()
+        self.db.refresh(job)
+        return job
@@ -1,7 +1,8 @@
 # src/repositories/base_repository.py
 
 from sqlalchemy.orm import Session
-from sqlalchemy import exc
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import exc, select
 from typing import TypeVar, Type, Optional, Dict, Any, List
 
 # Định nghĩa TypeVar để chỉ định kiểu dữ liệu của Model (ví dụ: User, Project, Task)
@@ -62,4 +63,28 @@ class BaseRepository:
             self.db.delete(obj)
             self.db.commit()
             return True
-        return False
\ No newline at end of file
+        return False
+
+
+class AsyncBaseRepository:
+    """Phiên bản async của BaseRepository, dùng với AsyncSession (DB_ASYNC_MODE)."""
+
+    def __init__(self, db: AsyncSession, model: Type[ModelType]):
+        """
+        Khởi tạo AsyncBaseRepository.
+
+        :param db: AsyncSession SQLAlchemy để tương tác với DB.
+        :param model: Class Model (ví dụ: User, Project) mà Repository này quản lý.
+        """
+        self.db = db
+        self.model = model
+
+    async def get_by_id(self, item_id: str) -> Optional[ModelType]:
+        """Lấy một item theo ID."""
+        result = await self.db.execute(select(self.model).where(self.model.id == item_id))
+        return result.scalars().first()
+
+    async def get_all(self, skip: int = 0, limit: int = 100) -> List[ModelType]:
+        """Lấy tất cả items có phân trang."""
+        result = await self.db.execute(select(self.model).offset(skip).limit(limit))
+        return list(result.scalars().all())
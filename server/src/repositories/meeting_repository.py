@@ -1,9 +1,12 @@
 # src/repositories/meeting_repository.py
 
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.core.pagination import async_keyset_paginate, keyset_paginate
 from src.models.meeting import Meeting
-from src.repositories.base_repository import BaseRepository
-from typing import List, Optional, Dict, Any
+from src.repositories.base_repository import BaseRepository, AsyncBaseRepository
+from typing import List, Optional, Dict, Any, Tuple
 
 class MeetingRepository(BaseRepository):
     def __init__(self, db: Session):
@@ -12,10 +15,49 @@ class MeetingRepository(BaseRepository):
     def get_meetings_by_project(self, project_id: str) -> List[Meeting]:
         """Lấy danh sách các cuộc họp thuộc một Project."""
         return self.db.query(Meeting).filter(Meeting.project_id == project_id).all()
-        
+
+    def get_meetings_by_project_page(self, project_id: str, limit: Optional[int] = None,
+                                     cursor: Optional[str] = None) -> Tuple[List[Meeting], Optional[str]]:
+        """Phân trang keyset các cuộc họp của Project, theo thứ tự thời gian (start_date, id) tăng dần."""
+        query = self.db.query(Meeting).filter(Meeting.project_id == project_id)
+        return keyset_paginate(query, Meeting.start_date, Meeting.id, limit, cursor, descending=False)
+
+    def get_transcribed_meetings(self, project_id: str) -> List[Tuple[str, str, str]]:
+        """
+        Lấy (id, title, md5 của transcript) các cuộc họp đã có transcript của Project.
+        md5 tính trong DB: đối chiếu được với chỉ mục mà không tải nội dung transcript.
+        """
+        return self.db.query(Meeting.id, Meeting.title, func.md5(Meeting.transcript)).filter(
+            Meeting.project_id == project_id,
+            Meeting.transcript.isnot(None),
+            Meeting.transcript != ""
+        ).order_by(Meeting.start_date).all()
+
+    def get_transcript_digests(self) -> List[Tuple[str, str]]:
+        """Lấy (id, md5 của transcript) mọi cuộc họp đã có transcript (dùng khi đánh bù chỉ mục)."""
+        return self.db.query(Meeting.id, func.md5(Meeting.transcript)).filter(
+            Meeting.transcript.isnot(None),
+            Meeting.transcript != ""
+        ).all()
+
+    def get_transcript(self, meeting_id: str) -> Optional[str]:
+        """Chỉ tải cột transcript của một cuộc họp."""
+        return self.db.query(Meeting.transcript).filter(Meeting.id == meeting_id).scalar()
+
     def update_meeting_data(self, meeting_id: str, update_data: Dict[str, Any]) -> Optional[Meeting]:
         """Cập nhật các trường cụ thể của Meeting."""
         meeting = self.get_by_id(meeting_id)
         if meeting:
             return self.update(meeting, update_data)
-        return None
\ No newline at end of file
+        return None
+
+
+class AsyncMeetingRepository(AsyncBaseRepository):
+    def __init__(self, db: AsyncSession):
+        super().__init__(db, Meeting)
+
+    async def get_meetings_by_project_page(self, project_id: str, limit: Optional[int] = None,
+                                           cursor: Optional[str] = None) -> Tuple[List[Meeting], Optional[str]]:
+        """Phiên bản async của MeetingRepository.get_meetings_by_project_page."""
+        stmt = select(Meeting).where(Meeting.project_id == project_id)
+        return await async_keyset_paginate(self.db, stmt, Meeting.start_date, Meeting.id, limit, cursor, descending=False)
@@ -1,10 +1,37 @@
 # src/repositories/project_repository.py
 
-from sqlalchemy.orm import Session, joinedload
-from src.models.project import Project
+import os
+from sqlalchemy import select, exists, delete
+from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.core.cache import TTLCache
+from src.core.pagination import async_keyset_paginate, keyset_paginate
+from src.models.project import Project, project_members
 from src.models.user import User
-from src.repositories.base_repository import BaseRepository
-from typing import List, Optional # <--- Thêm Optional vào đây
+from src.repositories.base_repository import BaseRepository, AsyncBaseRepository
+from typing import FrozenSet, List, Optional, Tuple # <--- Thêm Optional vào đây
+
+# Cache tập hợp project_id mà mỗi User là thành viên (dùng cho phân quyền ở các Service).
+# Thay đổi thành viên trong tiến trình này sẽ xóa cache ngay; thay đổi từ tiến trình khác
+# có hiệu lực chậm nhất sau MEMBERSHIP_CACHE_TTL_SECONDS - vì vậy cache chỉ dùng cho thao tác đọc,
+# thao tác ghi / xóa kiểm tra lại bằng has_access(..., fresh=True).
+member_projects_cache = TTLCache(
+    maxsize=int(os.getenv("MEMBERSHIP_CACHE_MAXSIZE", "4096")),
+    ttl=float(os.getenv("MEMBERSHIP_CACHE_TTL_SECONDS", "60")),
+    name="member_projects",
+)
+
+def invalidate_member_projects(*user_ids: str):
+    """Xóa cache thành viên của các User (gọi khi thêm/xóa thành viên, tạo/xóa dự án)."""
+    for user_id in user_ids:
+        member_projects_cache.invalidate(str(user_id))
+
+def _membership_exists(project_id: str, user_id: str):
+    """Câu lệnh SELECT EXISTS trên bảng project_members (không tải danh sách members)."""
+    return select(exists().where(
+        project_members.c.project_id == project_id,
+        project_members.c.user_id == user_id,
+    ))
 
 class ProjectRepository(BaseRepository):
     def __init__(self, db: Session):
@@ -29,6 +56,18 @@ class ProjectRepository(BaseRepository):
                    .options(joinedload(Project.members))\
                    .all()
 
+    def get_projects_where_user_is_member_page(self, user_id: str, limit: Optional[int] = None,
+                                               cursor: Optional[str] = None) -> Tuple[List[Project], Optional[str]]:
+        """
+        Phân trang keyset các Project mà User là thành viên, theo (updated_at, id) giảm dần.
+        Lọc qua project_members và tải members bằng selectinload để LIMIT không bị nhân bản dòng.
+        """
+        member_of = select(project_members.c.project_id).where(project_members.c.user_id == user_id)
+        query = self.db.query(Project)\
+                   .filter(Project.id.in_(member_of))\
+                   .options(selectinload(Project.members))
+        return keyset_paginate(query, Project.updated_at, Project.id, limit, cursor)
+
     def add_members_to_project(self, project: Project, members: List[User]):
         """Thêm danh sách Users vào Project hiện tại (thao tác với quan hệ M:N)."""
         for member in members:
@@ -36,4 +75,131 @@ class ProjectRepository(BaseRepository):
                 project.members.append(member)
         
         self.db.add(project)
-        self.db.commit()
\ No newline at end of file
+        self.db.commit()
+        invalidate_member_projects(*[m.id for m in members])
+
+    # --- Kiểm tra thành viên (Membership) ---
+
+    def is_member(self, project_id: str, user_id: str) -> bool:
+        """Kiểm tra User có thuộc Project không bằng truy vấn EXISTS trên project_members."""
+        return bool(self.db.execute(_membership_exists(project_id, user_id)).scalar())
+
+    def get_project_ids_for_user(self, user_id: str) -> FrozenSet[str]:
+        """Lấy tập hợp ID các Project mà User là thành viên (chỉ đọc bảng project_members)."""
+        rows = self.db.execute(
+            select(project_members.c.project_id).where(project_members.c.user_id == user_id)
+        ).scalars().all()
+        return frozenset(rows)
+
+    def get_member_ids(self, project_id: str) -> List[str]:
+        """Lấy danh sách ID thành viên của Project (không tải đối tượng User)."""
+        return list(self.db.execute(
+            select(project_members.c.user_id).where(project_members.c.project_id == project_id)
+        ).scalars().all())
+
+    def get_accessible_project_ids(self, user_id: str) -> FrozenSet[str]:
+        """Tập hợp ID các Project User được truy cập, đọc qua cache member_projects_cache."""
+        project_ids = member_projects_cache.get(user_id)
+        if project_ids is None:
+            project_ids = self.get_project_ids_for_user(user_id)
+            member_projects_cache.set(user_id, project_ids)
+        return project_ids
+
+    def has_access(self, project_id: str, user_id: str, fresh: bool = False) -> bool:
+        """
+        Kiểm tra quyền truy cập Project, dùng cache project_id theo User.
+        Kết quả phủ định được xác nhận lại bằng EXISTS để không từ chối nhầm khi cache cũ.
+        fresh=True (thao tác ghi / xóa): bỏ qua cache, kiểm tra bằng EXISTS - thành viên vừa bị xóa ở
+        tiến trình khác không còn quyền sửa dữ liệu trong thời gian cache (TTL) chưa hết hạn.
+        """
+        if fresh:
+            if self.is_member(project_id, user_id):
+                return True
+            if project_id in (member_projects_cache.get(user_id) or ()):
+                invalidate_member_projects(user_id)
+            return False
+
+        if project_id in self.get_accessible_project_ids(user_id):
+            return True
+
+        if self.is_member(project_id, user_id):
+            invalidate_member_projects(user_id)
+            return True
+        return False
+
+    def add_member(self, project_id: str, user_id: str):
+        """Thêm một thành viên bằng cách ghi trực tiếp vào bảng project_members."""
+        self.db.execute(project_members.insert().values(project_id=project_id, user_id=user_id))
+        self.db.commit()
+        invalidate_member_projects(user_id)
+
+    def remove_member(self, project_id: str, user_id: str) -> bool:
+        """Xóa một thành viên khỏi bảng project_members."""
+        result = self.db.execute(delete(project_members).where(
+            project_members.c.project_id == project_id,
+            project_members.c.user_id == user_id,
+        ))
+        self.db.commit()
+        invalidate_member_projects(user_id)
+        return result.rowcount > 0
+
+
+class AsyncProjectRepository(AsyncBaseRepository):
+    """Các truy vấn đọc của ProjectRepository qua AsyncSession (DB_ASYNC_MODE), dùng chung member_projects_cache."""
+
+    def __init__(self, db: AsyncSession):
+        super().__init__(db, Project)
+
+    async def get_by_id(self, item_id: str) -> Optional[Project]:
+        """
+        Lấy Project theo ID kèm danh sách members.
+        Dùng selectinload vì AsyncSession không cho phép lazy-load quan hệ.
+        """
+        result = await self.db.execute(
+            select(Project)
+            .options(selectinload(Project.members))
+            .where(Project.id == item_id)
+        )
+        return result.scalars().first()
+
+    async def get_projects_where_user_is_member_page(self, user_id: str, limit: Optional[int] = None,
+                                                     cursor: Optional[str] = None) -> Tuple[List[Project], Optional[str]]:
+        """Phiên bản async của ProjectRepository.get_projects_where_user_is_member_page."""
+        member_of = select(project_members.c.project_id).where(project_members.c.user_id == user_id)
+        stmt = select(Project)\
+                   .where(Project.id.in_(member_of))\
+                   .options(selectinload(Project.members))
+        return await async_keyset_paginate(self.db, stmt, Project.updated_at, Project.id, limit, cursor)
+
+    async def is_member(self, project_id: str, user_id: str) -> bool:
+        """Kiểm tra User có thuộc Project không bằng truy vấn EXISTS trên project_members."""
+        result = await self.db.execute(_membership_exists(project_id, user_id))
+        return bool(result.scalar())
+
+    async def get_project_ids_for_user(self, user_id: str) -> FrozenSet[str]:
+        """Lấy tập hợp ID các Project mà User là thành viên (chỉ đọc bảng project_members)."""
+        result = await self.db.execute(
+            select(project_members.c.project_id).where(project_members.c.user_id == user_id)
+        )
+        return frozenset(result.scalars().all())
+
+    async def has_access(self, project_id: str, user_id: str, fresh: bool = False) -> bool:
+        """Phiên bản async của ProjectRepository.has_access (cùng quy tắc cache / fresh)."""
+        if fresh:
+            if await self.is_member(project_id, user_id):
+                return True
+            if project_id in (member_projects_cache.get(user_id) or ()):
+                invalidate_member_projects(user_id)
+            return False
+
+        project_ids = member_projects_cache.get(user_id)
+        if project_ids is None:
+            project_ids = await self.get_project_ids_for_user(user_id)
+            member_projects_cache.set(user_id, project_ids)
+        if project_id in project_ids:
+            return True
+
+        if await self.is_member(project_id, user_id):
+            invalidate_member_projects(user_id)
+            return True
+        return False
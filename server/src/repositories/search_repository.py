@@ -0,0 +1,101 @@
+# src/repositories/search_repository.py
+
+from sqlalchemy import case, func, literal_column, or_, select, text
+from sqlalchemy.orm import Session
+from src.models.task import Task
+from src.models.project import Project, project_members
+from src.models.meeting import Meeting
+from src.models.user import User
+from typing import Any, Iterable, List, Optional, Tuple
+
+# Cấu hình 'simple': không stemming, chỉ tách từ và viết thường (phù hợp cho Tiếng Việt lẫn Tiếng Anh)
+_TS_CONFIG = literal_column("'simple'::regconfig")
+
+# Chuẩn hóa 32 của ts_rank_cd: rank / (rank + 1) - đưa điểm về khoảng 0..1 bằng một phép biến đổi cố định,
+# cùng thang với similarity của trigram, nên điểm các loại kết quả gộp được với nhau.
+_RANK_NORMALIZATION = 32
+
+# pg_trgm có được cài trong DB hay không (kiểm tra một lần cho mỗi tiến trình).
+_trgm_available: Optional[bool] = None
+
+
+def _ts_query(ts_query_text: str):
+    return func.to_tsquery(_TS_CONFIG, ts_query_text)
+
+
+class SearchRepository:
+    """Truy vấn tìm kiếm toàn văn (tsvector + GIN) và trigram (pg_trgm) trên nhiều bảng."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def search_tasks(self, ts_query_text: str, project_ids: Iterable[str], limit: int) -> List[Tuple[Task, float]]:
+        """Tìm Task theo tiêu đề + mô tả, chỉ trong các Project được phép, xếp hạng bằng ts_rank_cd."""
+        query = _ts_query(ts_query_text)
+        rank = func.ts_rank_cd(Task.search_vector, query, _RANK_NORMALIZATION).label("rank")
+        return self.db.query(Task, rank)\
+                   .filter(Task.project_id.in_(list(project_ids)))\
+                   .filter(Task.search_vector.op("@@")(query))\
+                   .order_by(rank.desc())\
+                   .limit(limit)\
+                   .all()
+
+    def search_projects(self, ts_query_text: str, project_ids: Iterable[str], limit: int) -> List[Tuple[Project, float]]:
+        """Tìm Project theo tên + mô tả trong phạm vi các Project được phép."""
+        query = _ts_query(ts_query_text)
+        rank = func.ts_rank_cd(Project.search_vector, query, _RANK_NORMALIZATION).label("rank")
+        return self.db.query(Project, rank)\
+                   .filter(Project.id.in_(list(project_ids)))\
+                   .filter(Project.search_vector.op("@@")(query))\
+                   .order_by(rank.desc())\
+                   .limit(limit)\
+                   .all()
+
+    def search_meetings(self, ts_query_text: str, project_ids: Iterable[str], limit: int) -> List[Tuple[Meeting, float]]:
+        """Tìm Meeting theo tiêu đề, tóm tắt, mô tả và transcript trong các Project được phép."""
+        query = _ts_query(ts_query_text)
+        rank = func.ts_rank_cd(Meeting.search_vector, query, _RANK_NORMALIZATION).label("rank")
+        return self.db.query(Meeting, rank)\
+                   .filter(Meeting.project_id.in_(list(project_ids)))\
+                   .filter(Meeting.search_vector.op("@@")(query))\
+                   .order_by(rank.desc())\
+                   .limit(limit)\
+                   .all()
+
+    def _has_trgm(self) -> bool:
+        """Kiểm tra extension pg_trgm (create_db_tables bỏ qua nó khi không có quyền cài đặt)."""
+        global _trgm_available
+        if _trgm_available is None:
+            _trgm_available = bool(self.db.execute(
+                text("SELECT EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm')")
+            ).scalar())
+        return _trgm_available
+
+    def search_users(self, term: str, project_ids: Iterable[str], limit: int) -> List[Tuple[User, float]]:
+        """
+        Tìm User theo chuỗi con (ILIKE dùng index trigram), chỉ trong các thành viên cùng dự án với người tìm
+        để không dò được email / username của toàn hệ thống.
+        Xếp hạng theo similarity của pg_trgm; không có pg_trgm thì xếp theo mức khớp ILIKE (khớp đúng > tiền tố > chuỗi con).
+        """
+        pattern = f"%{term}%"
+        if self._has_trgm():
+            rank = func.greatest(
+                func.similarity(User.name, term),
+                func.similarity(User.username, term),
+                func.similarity(User.email, term),
+            )
+        else:
+            prefix = f"{term}%"
+            rank = case(
+                (or_(User.username.ilike(term), User.email.ilike(term), User.name.ilike(term)), 1.0),
+                (or_(User.username.ilike(prefix), User.email.ilike(prefix), User.name.ilike(prefix)), 0.6),
+                else_=0.3,
+            )
+        rank = rank.label("rank")
+        co_members = select(project_members.c.user_id).where(project_members.c.project_id.in_(list(project_ids)))
+        return self.db.query(User, rank)\
+                   .filter(User.id.in_(co_members))\
+                   .filter(or_(User.username.ilike(pattern), User.email.ilike(pattern), User.name.ilike(pattern)))\
+                   .order_by(rank.desc())\
+                   .limit(limit)\
+                   .all()
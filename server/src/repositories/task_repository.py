@@ -1,9 +1,12 @@
 # src/repositories/task_repository.py
 
+from sqlalchemy import select
 from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.core.pagination import async_keyset_paginate, keyset_paginate
 from src.models.task import Task
-from src.repositories.base_repository import BaseRepository
-from typing import List, Optional, Dict, Any
+from src.repositories.base_repository import BaseRepository, AsyncBaseRepository
+from typing import List, Optional, Dict, Any, Tuple
 
 class TaskRepository(BaseRepository):
     def __init__(self, db: Session):
@@ -30,6 +33,24 @@ class TaskRepository(BaseRepository):
         query = query.options(joinedload(Task.project), joinedload(Task.author))
         return query.all()
 
+    def get_tasks_by_project_page(self, project_id: str, status_filter: Optional[str] = None,
+                                  limit: Optional[int] = None, cursor: Optional[str] = None) -> Tuple[List[Task], Optional[str]]:
+        """Phân trang keyset các Tasks của Project, sắp xếp theo (updated_at, id) giảm dần."""
+        query = self.db.query(Task).filter(Task.project_id == project_id)
+        if status_filter:
+            query = query.filter(Task.status == status_filter)
+        query = query.options(joinedload(Task.assignee), joinedload(Task.author))
+        return keyset_paginate(query, Task.updated_at, Task.id, limit, cursor)
+
+    def get_tasks_by_user_page(self, user_id: str, status_filter: Optional[str] = None,
+                               limit: Optional[int] = None, cursor: Optional[str] = None) -> Tuple[List[Task], Optional[str]]:
+        """Phân trang keyset các Tasks được giao cho User, sắp xếp theo (updated_at, id) giảm dần."""
+        query = self.db.query(Task).filter(Task.assignee_id == user_id)
+        if status_filter:
+            query = query.filter(Task.status == status_filter)
+        query = query.options(joinedload(Task.project), joinedload(Task.author))
+        return keyset_paginate(query, Task.updated_at, Task.id, limit, cursor)
+
     def update_task_field(self, task_id: str, update_data: Dict[str, Any]) -> Optional[Task]:
         """Cập nhật các trường cụ thể của Task theo ID."""
         task = self.get_by_id(task_id)
@@ -37,4 +58,27 @@ class TaskRepository(BaseRepository):
             return self.update(task, update_data)
         return None
         
-    # Các hàm CRUD cơ bản (create, get_by_id,...) được thừa kế từ BaseRepository
\ No newline at end of file
+    # Các hàm CRUD cơ bản (create, get_by_id,...) được thừa kế từ BaseRepository
+
+
+class AsyncTaskRepository(AsyncBaseRepository):
+    def __init__(self, db: AsyncSession):
+        super().__init__(db, Task)
+
+    async def get_tasks_by_project_page(self, project_id: str, status_filter: Optional[str] = None,
+                                        limit: Optional[int] = None, cursor: Optional[str] = None) -> Tuple[List[Task], Optional[str]]:
+        """Phiên bản async của TaskRepository.get_tasks_by_project_page."""
+        stmt = select(Task).where(Task.project_id == project_id)
+        if status_filter:
+            stmt = stmt.where(Task.status == status_filter)
+        stmt = stmt.options(joinedload(Task.assignee), joinedload(Task.author))
+        return await async_keyset_paginate(self.db, stmt, Task.updated_at, Task.id, limit, cursor)
+
+    async def get_tasks_by_user_page(self, user_id: str, status_filter: Optional[str] = None,
+                                     limit: Optional[int] = None, cursor: Optional[str] = None) -> Tuple[List[Task], Optional[str]]:
+        """Phiên bản async của TaskRepository.get_tasks_by_user_page."""
+        stmt = select(Task).where(Task.assignee_id == user_id)
+        if status_filter:
+            stmt = stmt.where(Task.status == status_filter)
+        stmt = stmt.options(joinedload(Task.project), joinedload(Task.author))
+        return await async_keyset_paginate(self.db, stmt, Task.updated_at, Task.id, limit, cursor)
@@ -0,0 +1,33 @@
+# src/repositories/transcript_segment_repository.py
+
+from uuid import uuid4
+from sqlalchemy.orm import Session
+from src.models.transcript_segment import MeetingTranscriptSegment
+from src.repositories.base_repository import BaseRepository
+from typing import Any, Dict, List
+
+class TranscriptSegmentRepository(BaseRepository):
+    def __init__(self, db: Session):
+        super().__init__(db, MeetingTranscriptSegment)
+
+    def add_many(self, meeting_id: str, segments: List[Dict[str, Any]]) -> int:
+        """Lưu một loạt đoạn transcript (speaker, start_seconds, end_seconds, text) trong một transaction."""
+        if not segments:
+            return 0
+        self.db.add_all([
+            MeetingTranscriptSegment(id=str(uuid4()), meeting_id=meeting_id, **segment)
+            for segment in segments
+        ])
+        self.db.commit()
+        return len(segments)
+
+    def list_for_meeting(self, meeting_id: str) -> List[MeetingTranscriptSegment]:
+        """Các đoạn transcript của cuộc họp theo thứ tự thời gian."""
+        return self.db.query(MeetingTranscriptSegment).filter(
+            MeetingTranscriptSegment.meeting_id == meeting_id
+        ).order_by(MeetingTranscriptSegment.start_seconds, MeetingTranscriptSegment.created_at).all()
+
+    def exists_for_meeting(self, meeting_id: str) -> bool:
+        return self.db.query(
+            self.db.query(MeetingTranscriptSegment).filter(MeetingTranscriptSegment.meeting_id == meeting_id).exists()
+        ).scalar()
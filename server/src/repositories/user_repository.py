@@ -1,8 +1,9 @@
 # src/repositories/user_repository.py
 
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from src.models.user import User
-from src.repositories.base_repository import BaseRepository
+from src.repositories.base_repository import BaseRepository, AsyncBaseRepository
 from typing import Optional, List
 
 class UserRepository(BaseRepository):
@@ -21,4 +22,11 @@ class UserRepository(BaseRepository):
         """Lấy danh sách Users theo danh sách IDs."""
         return self.db.query(User).filter(User.id.in_(user_ids)).all()
         
-    # Các hàm CRUD cơ bản (create, get_by_id,...) được thừa kế từ BaseRepository
\ No newline at end of file
+    # Các hàm CRUD cơ bản (create, get_by_id,...) được thừa kế từ BaseRepository
+
+
+class AsyncUserRepository(AsyncBaseRepository):
+    """Truy vấn User qua AsyncSession (DB_ASYNC_MODE), dùng cho get_current_user."""
+
+    def __init__(self, db: AsyncSession):
+        super().__init__(db, User)
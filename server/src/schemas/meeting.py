@@ -54,4 +54,48 @@ class MeetingOut(MeetingBase):
     ai_tasks: List[TaskOut] = Field([], description="Tasks được AI phát hiện từ transcript.") 
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class TranscriptHit(BaseModel):
+    """Một đoạn transcript khớp với từ khóa tìm kiếm."""
+    meeting_id: str
+    meeting_title: Optional[str] = None
+    timestamp: str = Field(..., description="Thời điểm bắt đầu đoạn hội thoại (HH:MM:SS).")
+    offset_seconds: int
+    speaker: str
+    text: str
+
+
+class AnalysisJobOut(BaseModel):
+    """Trạng thái job phân tích cuộc họp trong hàng đợi."""
+    id: str
+    meeting_id: str
+    status: str = Field(..., description="queued | running | completed | failed")
+    attempts: int
+    max_attempts: int
+    run_after: datetime
+    last_error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class RecordingUploadInit(BaseModel):
+    """Khởi tạo phiên upload file ghi âm nhiều phần (tải tiếp được khi mất kết nối)."""
+    size: int = Field(..., gt=0, description="Tổng kích thước file (bytes).")
+    sha256: Optional[str] = Field(None, min_length=64, max_length=64, description="Checksum cả file, kiểm tra khi hoàn tất.")
+    filename: Optional[str] = None
+
+
+class RecordingUploadStatus(BaseModel):
+    """Trạng thái phiên upload: client gửi tiếp từ `offset`."""
+    upload_id: str
+    size: int
+    offset: int
+    chunk_size: int = Field(..., description="Kích thước phần khuyến nghị (bytes).")
+    completed: bool = False
+    url: Optional[str] = None
+    sha256: Optional[str] = None
@@ -2,13 +2,14 @@
 server/src/services/ai_service.py
 Dịch vụ tích hợp Trí tuệ nhân tạo (AI) thông qua External AI Service.
 Bao gồm: Gửi yêu cầu phân tích cuộc họp tới AI Service và nhận kết quả.
+Mọi lời gọi đều bất đồng bộ và dùng chung một Connection Pool (src/core/http_client.py).
 """
 
 import os
 import json
 from uuid import uuid4
-import requests
-from typing import List, Dict, Any, Optional
+import httpx
+from typing import AsyncIterator, List, Dict, Any, Optional
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
 
@@ -21,26 +22,42 @@ from google import genai
 from google.genai import types
 
 from src.core.logger import logger
+from src.core.http_client import CircuitOpenError, ResilientHttpClient, get_ai_http_client
+
+# Timeout (giây) riêng cho từng endpoint của AI Service
+AI_TIMEOUT_ANALYZE = float(os.getenv("AI_TIMEOUT_ANALYZE", "300"))
+AI_TIMEOUT_CONFIRM = float(os.getenv("AI_TIMEOUT_CONFIRM", "60"))
+AI_TIMEOUT_CHAT = float(os.getenv("AI_TIMEOUT_CHAT", "60"))
+AI_TIMEOUT_LIVE_STT = float(os.getenv("AI_TIMEOUT_LIVE_STT", "60"))
+
+
+def _auth_headers(token: Optional[str]) -> Dict[str, str]:
+    headers = {"Content-Type": "application/json"}
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+    return headers
+
+
+def _sse_error(detail: str) -> bytes:
+    return f"data: {json.dumps({'type': 'error', 'detail': detail}, ensure_ascii=False)}\n\n".encode("utf-8")
+
 
 class AIService:
-    def __init__(self):
+    def __init__(self, client: Optional[ResilientHttpClient] = None):
         """
         Khởi tạo AI Service Client.
-        AI Service chạy tại localhost:8001 (mặc định) hoặc cấu hình qua env.
+        AI Service chạy tại localhost:8001 (mặc định) hoặc cấu hình qua env AI_SERVICE_URL.
         """
-        self.ai_service_url = os.getenv("AI_SERVICE_URL", "http://localhost:8001/api/v1")
+        self.client = client or get_ai_http_client()
 
-    def process_meeting(self, meeting_id: str, audio_file_path: str, meeting_metadata: dict, token: Optional[str] = None, background: bool = False, skip_review: bool = True) -> Dict[str, Any]:
+    async def process_meeting(self, meeting_id: str, audio_file_path: Optional[str], meeting_metadata: dict, token: Optional[str] = None, background: bool = False, skip_review: bool = True,
+                              transcript: Optional[str] = None) -> Dict[str, Any]:
         """
         Gửi yêu cầu phân tích cuộc họp tới AI Service.
+        Có transcript (ghi chép trực tiếp trong cuộc họp) thì AI Service bỏ qua bước chuyển giọng nói thành văn bản.
         """
-        # Build query params
-        url = f"{self.ai_service_url}/meeting/analyze?background={str(background).lower()}&skip_review={str(skip_review).lower()}"
-        
-        headers = {"Content-Type": "application/json"}
-        if token:
-            headers["Authorization"] = f"Bearer {token}"
-            
+        params = {"background": str(background).lower(), "skip_review": str(skip_review).lower()}
+
         # Payload khớp với MeetingAnalyzeRequest trong AI Service
         payload = {
             "meeting_id": meeting_id,
@@ -49,74 +66,110 @@ class AIService:
             "author_id": meeting_metadata.get("author_id"), 
             "project_id": meeting_metadata.get("projectId"), 
             "audio_file_path": audio_file_path,
+            "transcript": transcript,
             "participants": meeting_metadata.get("participants", []),
         }
         
         try:
-            logger.info(f"🚀 [AIService] Sending request to {url} for Meeting {meeting_id}")
-            response = requests.post(url, json=payload, headers=headers, timeout=300) 
-            
-            if response.status_code == 200:
-                logger.info(f"✅ [AIService] Received response from AI Service")
-                return response.json()
-            else:
-                logger.error(f"❌ [AIService] Error {response.status_code}: {response.text}")
-                raise HTTPException(status_code=response.status_code, detail=f"AI Service Error: {response.text}")
-                
-        except requests.exceptions.RequestException as e:
-            logger.error(f"❌ [AIService] Connection Error: {e}")
-            raise HTTPException(status_code=503, detail=f"Could not connect to AI Service: {e}")
-
-    def confirm_meeting(self, payload: dict, token: Optional[str] = None) -> Dict[str, Any]:
+            logger.info(f"🚀 [AIService] Sending analyze request for Meeting {meeting_id}")
+            response = await self.client.post("/meeting/analyze", json=payload, headers=_auth_headers(token),
+                                              params=params, timeout=AI_TIMEOUT_ANALYZE)
+        except (httpx.HTTPError, CircuitOpenError) as e:
+            logger.error(f"❌ [AIService] Connection Error: {e!r}")
+            raise HTTPException(status_code=503, detail=f"Could not connect to AI Service: {e!r}")
+
+        if response.status_code == 200:
+            logger.info(f"✅ [AIService] Received response from AI Service")
+            return response.json()
+        logger.error(f"❌ [AIService] Error {response.status_code}: {response.text}")
+        raise HTTPException(status_code=response.status_code, detail=f"AI Service Error: {response.text}")
+
+    async def confirm_meeting(self, payload: dict, token: Optional[str] = None) -> Dict[str, Any]:
         """
         Gửi yêu cầu xác nhận kết quả phân tích tới AI Service.
         """
-        url = f"{self.ai_service_url}/meeting/confirm"
-        headers = {"Content-Type": "application/json"}
-        if token:
-            headers["Authorization"] = f"Bearer {token}"
-            
         try:
-            response = requests.post(url, json=payload, headers=headers, timeout=60)
-            if response.status_code == 200:
-                return response.json()
-            else:
-                 raise HTTPException(status_code=response.status_code, detail=f"AI Service Error: {response.text}")
-        except requests.exceptions.RequestException as e:
-            raise HTTPException(status_code=503, detail=f"Could not connect to AI Service: {e}")
-
-    def process_chat(self, message: str, thread_id: str = "general", token: Optional[str] = None) -> str:
+            response = await self.client.post("/meeting/confirm", json=payload, headers=_auth_headers(token),
+                                              timeout=AI_TIMEOUT_CONFIRM)
+        except (httpx.HTTPError, CircuitOpenError) as e:
+            raise HTTPException(status_code=503, detail=f"Could not connect to AI Service: {e!r}")
+
+        if response.status_code == 200:
+            return response.json()
+        raise HTTPException(status_code=response.status_code, detail=f"AI Service Error: {response.text}")
+
+    async def transcribe_live_window(self, pcm: bytes, sample_rate: int = 16000) -> Dict[str, Any]:
+        """
+        Gửi một cửa sổ âm thanh trực tiếp (PCM 16-bit mono) tới Local STT của AI Service.
+        Trả về {"duration", "segments": [{"start", "end", "text"}]} (thời gian tính từ đầu cửa sổ).
+        """
+        try:
+            response = await self.client.post("/meeting/stt/live", json=None, content=pcm,
+                                              headers={"Content-Type": "application/octet-stream"},
+                                              params={"sample_rate": sample_rate}, timeout=AI_TIMEOUT_LIVE_STT)
+        except (httpx.HTTPError, CircuitOpenError) as e:
+            raise HTTPException(status_code=503, detail=f"Could not connect to AI Service: {e!r}")
+
+        if response.status_code == 200:
+            return response.json()
+        raise HTTPException(status_code=response.status_code, detail=f"AI Service Error: {response.text}")
+
+    async def process_chat(self, message: str, thread_id: str = "general", token: Optional[str] = None,
+                           user_id: Optional[str] = None) -> str:
         """
         Gửi tin nhắn tới Project Manager Agent (External Service).
+        user_id: ID người dùng đã xác thực - AI Service dùng làm khóa cache ngữ nghĩa theo người dùng.
         """
-        url = f"{self.ai_service_url}/project/chat"
-        
-        headers = {"Content-Type": "application/json"}
-        if token:
-            headers["Authorization"] = f"Bearer {token}"
-            
         payload = {
             "query": message,
-            "thread_id": thread_id
+            "thread_id": thread_id,
+            "user_id": user_id
         }
         
         try:
-            # logger.info(f"🚀 [AIService] Sending chat to {url}")
-            response = requests.post(url, json=payload, headers=headers, timeout=60)
-            
-            if response.status_code == 200:
-                data = response.json()
-                return data.get("response", "No response from agent")
-            else:
-                logger.error(f"❌ [AIService] Chat Error {response.status_code}: {response.text}")
-                return "Xin lỗi, tôi đang gặp sự cố kết nối với Agent."
-                
-        except requests.exceptions.RequestException as e:
-            logger.error(f"❌ [AIService] Chat Connection Error: {e}")
+            response = await self.client.post("/project/chat", json=payload, headers=_auth_headers(token),
+                                              timeout=AI_TIMEOUT_CHAT)
+        except CircuitOpenError:
+            logger.error("❌ [AIService] Chat rejected: AI Service circuit is open")
             return "Xin lỗi, hệ thống AI đang bảo trì."
+        except httpx.HTTPError as e:
+            logger.error(f"❌ [AIService] Chat Connection Error: {e!r}")
+            return "Xin lỗi, hệ thống AI đang bảo trì."
+
+        if response.status_code == 200:
+            data = response.json()
+            return data.get("response", "No response from agent")
+        logger.error(f"❌ [AIService] Chat Error {response.status_code}: {response.text}")
+        return "Xin lỗi, tôi đang gặp sự cố kết nối với Agent."
+
+    async def stream_chat(self, message: str, thread_id: str = "general", token: Optional[str] = None,
+                          user_id: Optional[str] = None) -> AsyncIterator[bytes]:
+        """
+        Chat dạng streaming: chuyển tiếp nguyên văn Server-Sent Events từ Project Manager Agent
+        (token câu trả lời, sự kiện gọi tool, kết thúc). Lỗi kết nối được trả về dưới dạng sự kiện "error".
+        """
+        payload = {
+            "query": message,
+            "thread_id": thread_id,
+            "user_id": user_id
+        }
+
+        try:
+            async for chunk in self.client.stream_post("/project/chat/stream", json=payload, headers=_auth_headers(token),
+                                                       timeout=AI_TIMEOUT_CHAT):
+                yield chunk
+        except CircuitOpenError:
+            logger.error("❌ [AIService] Chat stream rejected: AI Service circuit is open")
+            yield _sse_error("Xin lỗi, hệ thống AI đang bảo trì.")
+        except httpx.HTTPStatusError as e:
+            logger.error(f"❌ [AIService] Chat Stream Error {e.response.status_code}: {e.response.text}")
+            yield _sse_error("Xin lỗi, tôi đang gặp sự cố kết nối với Agent.")
+        except httpx.HTTPError as e:
+            logger.error(f"❌ [AIService] Chat Stream Connection Error: {e!r}")
+            yield _sse_error("Xin lỗi, hệ thống AI đang bảo trì.")
 
-    def get_chat_response(self, prompt: str, user_id: str) -> str:
+    async def get_chat_response(self, prompt: str, user_id: str) -> str:
         """
         Legacy/Fallback method.
         """
-        return self.process_chat(message=prompt)
\ No newline at end of file
+        return await self.process_chat(message=prompt, user_id=user_id)
@@ -0,0 +1,123 @@
+"""
+server/src/services/analysis_job_service.py
+Hàng đợi job phân tích cuộc họp lưu trong Postgres (bảng analysis_jobs).
+Web tier chỉ ghi job vào hàng đợi và trả về ngay; Worker (server/worker.py) nhận và xử lý job,
+thử lại với backoff tăng dần khi lỗi tạm thời.
+"""
+
+import os
+from datetime import datetime, timedelta
+from uuid import uuid4
+from typing import Optional
+from sqlalchemy.orm import Session
+from fastapi import HTTPException, status
+
+from src.core.security import create_access_token
+from src.models.analysis_job import AnalysisJob, JOB_QUEUED, JOB_COMPLETED, JOB_FAILED
+from src.repositories.analysis_job_repository import AnalysisJobRepository
+from src.repositories.meeting_repository import MeetingRepository
+from src.repositories.project_repository import ProjectRepository
+from src.core.logger import logger
+
+# Cấu hình hàng đợi
+ANALYSIS_JOB_MAX_ATTEMPTS = int(os.getenv("ANALYSIS_JOB_MAX_ATTEMPTS", "3"))
+ANALYSIS_JOB_BACKOFF_SECONDS = float(os.getenv("ANALYSIS_JOB_BACKOFF_SECONDS", "30"))
+ANALYSIS_JOB_BACKOFF_MAX_SECONDS = float(os.getenv("ANALYSIS_JOB_BACKOFF_MAX_SECONDS", "900"))
+# Job 'running' lâu hơn thời gian này coi như worker đã chết và được nhận lại (lớn hơn timeout 300s của AI Service)
+ANALYSIS_JOB_LEASE_SECONDS = int(os.getenv("ANALYSIS_JOB_LEASE_SECONDS", "900"))
+# Thời hạn token Worker cấp cho mỗi lần chạy job (đủ cho một lần gọi AI Service, không dùng lại được lâu)
+ANALYSIS_JOB_TOKEN_MINUTES = int(os.getenv("ANALYSIS_JOB_TOKEN_MINUTES", "20"))
+
+
+def retry_delay(attempts: int) -> float:
+    """Backoff lũy thừa: 30s, 60s, 120s... tối đa ANALYSIS_JOB_BACKOFF_MAX_SECONDS."""
+    return min(ANALYSIS_JOB_BACKOFF_SECONDS * (2 ** max(attempts - 1, 0)), ANALYSIS_JOB_BACKOFF_MAX_SECONDS)
+
+
+def is_retryable(error: Exception) -> bool:
+    """Lỗi 4xx (thiếu file ghi âm, dữ liệu sai...) sẽ không tự hết nên không thử lại."""
+    if isinstance(error, HTTPException):
+        return error.status_code >= 500
+    return True
+
+
+class AnalysisJobService:
+    def __init__(self, db: Session):
+        """Khởi tạo với Repository Job, Meeting và Project."""
+        self.repo = AnalysisJobRepository(db)
+        self.meeting_repo = MeetingRepository(db)
+        self.project_repo = ProjectRepository(db)
+
+    def enqueue(self, meeting_id: str, requested_by: Optional[str] = None, skip_review: bool = True) -> AnalysisJob:
+        """
+        Xếp job phân tích vào hàng đợi.
+        Nếu cuộc họp đã có job đang chờ/đang chạy thì trả về job đó thay vì tạo job trùng.
+        Hai Request đồng thời: index UNIQUE ux_analysis_jobs_meeting_active chặn job thứ hai,
+        Request thua trả về job của Request thắng.
+        """
+        active = self.repo.get_active_for_meeting(meeting_id)
+        if active:
+            return active
+
+        try:
+            return self.repo.create({
+                "id": str(uuid4()),
+                "meeting_id": meeting_id,
+                "status": JOB_QUEUED,
+                "skip_review": skip_review,
+                "requested_by": requested_by,
+                "max_attempts": ANALYSIS_JOB_MAX_ATTEMPTS,
+                "run_after": datetime.utcnow(),
+            })
+        except ValueError:
+            # BaseRepository.create đã rollback khi vi phạm ràng buộc
+            active = self.repo.get_active_for_meeting(meeting_id)
+            if active:
+                return active
+            raise
+
+    def get_latest_job(self, meeting_id: str, user_id: str) -> AnalysisJob:
+        """Lấy trạng thái job phân tích mới nhất của cuộc họp (chỉ thành viên dự án)."""
+        meeting = self.meeting_repo.get_by_id(meeting_id)
+        if not meeting:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Không tìm thấy cuộc họp.")
+
+        if not self.project_repo.has_access(meeting.project_id, user_id):
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Bạn không có quyền truy cập cuộc họp này.")
+
+        job = self.repo.get_latest_for_meeting(meeting_id)
+        if not job:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Cuộc họp chưa có yêu cầu phân tích nào.")
+        return job
+
+    def claim_next(self, worker_id: str) -> Optional[AnalysisJob]:
+        """Nhận job tiếp theo cho worker."""
+        return self.repo.claim_next(worker_id, ANALYSIS_JOB_LEASE_SECONDS)
+
+    def job_token(self, job: AnalysisJob) -> Optional[str]:
+        """Token ngắn hạn thay mặt người kích hoạt job, cấp mới cho mỗi lần chạy (không lưu vào DB)."""
+        if not job.requested_by:
+            return None
+        return create_access_token({"sub": job.requested_by}, timedelta(minutes=ANALYSIS_JOB_TOKEN_MINUTES))
+
+    def mark_completed(self, job: AnalysisJob) -> AnalysisJob:
+        now = datetime.utcnow()
+        return self.repo.update_fields(job, {
+            "status": JOB_COMPLETED,
+            "finished_at": now,
+            "locked_by": None,
+            "locked_at": None,
+            "last_error": None,
+        })
+
+    def mark_failed(self, job: AnalysisJob, error: Exception) -> AnalysisJob:
+        """Ghi nhận lỗi: xếp lại hàng đợi với backoff nếu còn lượt thử, ngược lại đánh dấu failed."""
+        update = {"last_error": str(error)[:2000], "locked_by": None, "locked_at": None}
+        if is_retryable(error) and job.attempts < job.max_attempts:
+            delay = retry_delay(job.attempts)
+            update.update({"status": JOB_QUEUED, "run_after": datetime.utcnow() + timedelta(seconds=delay)})
+            logger.warning(f"⚠️ [JobQueue] Job {job.id} failed (attempt {job.attempts}/{job.max_attempts}), retrying in {delay:.0f}s: {error}")
+        else:
+            update.update({"status": JOB_FAILED, "finished_at": datetime.utcnow()})
+            logger.error(f"❌ [JobQueue] Job {job.id} failed permanently: {error}")
+        return self.repo.update_fields(job, update)
@@ -0,0 +1,297 @@
+"""
+server/src/services/live_transcription_service.py
+Ghi chép trực tiếp (live transcription) trong lúc họp.
+
+- Client gửi âm thanh PCM 16-bit mono 16 kHz theo từng khung nhỏ qua Socket.IO (src/realtime/live_transcription.py).
+- Mỗi luồng âm thanh có một bộ đệm vòng (AudioRingBuffer) dung lượng cố định: bộ nhớ không tăng theo độ dài cuộc họp;
+  nếu STT chậm hơn tốc độ nói quá LIVE_STT_BUFFER_SECONDS thì phần cũ nhất bị ghi đè (có cảnh báo).
+- Cứ mỗi LIVE_STT_STEP_SECONDS âm thanh mới, cửa sổ trượt [đoạn chưa chốt .. hiện tại] (tối đa LIVE_STT_WINDOW_SECONDS)
+  được gửi tới Local STT của AI Service (POST /meeting/stt/live).
+- Các đoạn kết thúc trước LIVE_STT_TAIL_GUARD_SECONDS cuối cửa sổ được chốt (có thể bị cắt giữa từ nên để lại
+  cho cửa sổ sau), lưu vào bảng meeting_transcript_segments và phát cho các client đang theo dõi cuộc họp.
+- Khi luồng cuối cùng của cuộc họp dừng: chốt nốt phần còn lại và ghép thành Meeting.transcript,
+  nên có thể phân tích cuộc họp ngay (AI Service bỏ qua bước STT cả file ghi âm).
+"""
+
+import asyncio
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from src.models.meeting import Meeting
+from src.models.transcript_segment import MeetingTranscriptSegment
+from src.repositories.project_repository import ProjectRepository
+from src.repositories.transcript_segment_repository import TranscriptSegmentRepository
+from src.services.ai_service import AIService
+from src.services.transcript_index import transcript_index
+from src.core.logger import logger
+
+SAMPLE_RATE = 16000
+# Cửa sổ tối đa gửi tới STT và bước trượt giữa hai lần gửi (giây)
+LIVE_STT_WINDOW_SECONDS = float(os.getenv("LIVE_STT_WINDOW_SECONDS", "30"))
+LIVE_STT_STEP_SECONDS = float(os.getenv("LIVE_STT_STEP_SECONDS", "8"))
+# Phần cuối cửa sổ chưa được chốt (câu nói có thể đang dở)
+LIVE_STT_TAIL_GUARD_SECONDS = float(os.getenv("LIVE_STT_TAIL_GUARD_SECONDS", "2"))
+# Dung lượng bộ đệm vòng của mỗi luồng (giây âm thanh)
+LIVE_STT_BUFFER_SECONDS = float(os.getenv("LIVE_STT_BUFFER_SECONDS", "120"))
+# Số cửa sổ gửi tới STT cùng lúc trên toàn Server (Local STT của AI Service có số worker giới hạn)
+LIVE_STT_MAX_CONCURRENCY = int(os.getenv("LIVE_STT_MAX_CONCURRENCY", "2"))
+# Bỏ qua phần đuôi quá ngắn khi dừng
+_MIN_FINAL_SAMPLES = int(0.3 * SAMPLE_RATE)
+
+DEFAULT_SPEAKER = "Người nói"
+
+SegmentsCallback = Callable[[str, List[Dict[str, Any]]], Awaitable[None]]
+
+_stt_semaphore = asyncio.Semaphore(LIVE_STT_MAX_CONCURRENCY)
+
+
+class AudioRingBuffer:
+    """
+    Bộ đệm vòng PCM 16-bit dung lượng cố định.
+    Địa chỉ là chỉ số mẫu tuyệt đối tính từ đầu luồng; chỉ giữ `capacity` mẫu mới nhất trong [start, end).
+    """
+
+    def __init__(self, capacity_samples: int):
+        self.capacity = max(1, capacity_samples)
+        self._buf = bytearray(self.capacity * 2)
+        self.start = 0
+        self.end = 0
+
+    def append(self, data: bytes) -> int:
+        """Ghi thêm mẫu; trả về số mẫu cũ bị ghi đè do đầy."""
+        data = data[:len(data) // 2 * 2]
+        count = len(data) // 2
+        if count == 0:
+            return 0
+        if count > self.capacity:
+            data = data[-self.capacity * 2:]
+
+        position = (self.end + count - len(data) // 2) % self.capacity * 2
+        first = min(len(data), len(self._buf) - position)
+        self._buf[position:position + first] = data[:first]
+        self._buf[:len(data) - first] = data[first:]
+
+        self.end += count
+        new_start = max(self.start, self.end - self.capacity)
+        dropped, self.start = new_start - self.start, new_start
+        return dropped
+
+    def read(self, start: int, end: int) -> bytes:
+        """Đọc các mẫu [start, end) (tự cắt theo phần còn giữ trong bộ đệm)."""
+        start, end = max(start, self.start), min(end, self.end)
+        if end <= start:
+            return b""
+        position = start % self.capacity * 2
+        length = (end - start) * 2
+        first = min(length, len(self._buf) - position)
+        return bytes(self._buf[position:position + first]) + bytes(self._buf[:length - first])
+
+
+class LiveTranscriptionSession:
+    """Một luồng âm thanh trực tiếp (một client) của một cuộc họp."""
+
+    def __init__(self, meeting_id: str, speaker: Optional[str], offset_seconds: float,
+                 on_segments: SegmentsCallback, ai_service: Optional[AIService] = None):
+        self.meeting_id = meeting_id
+        self.speaker = speaker
+        # Vị trí của mẫu đầu tiên trên dòng thời gian chung của cuộc họp
+        self.offset_seconds = offset_seconds
+        self.on_segments = on_segments
+        self.ai_service = ai_service or AIService()
+
+        self.buffer = AudioRingBuffer(int(LIVE_STT_BUFFER_SECONDS * SAMPLE_RATE))
+        self.committed = 0      # âm thanh trước mẫu này đã được chốt
+        self._attempted = 0     # điểm cuối của cửa sổ gửi gần nhất
+        self._step = int(LIVE_STT_STEP_SECONDS * SAMPLE_RATE)
+        self._window = int(LIVE_STT_WINDOW_SECONDS * SAMPLE_RATE)
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    def feed(self, data: bytes):
+        """Nhận một khung âm thanh; đủ một bước mới thì chạy STT ngầm (không chặn việc nhận âm thanh)."""
+        if self._stopping:
+            return
+        self.buffer.append(data)
+        if self.committed < self.buffer.start:
+            lost = (self.buffer.start - self.committed) / SAMPLE_RATE
+            logger.warning(f"⚠️ [LiveSTT] Meeting {self.meeting_id}: STT is behind, dropped {lost:.1f}s of audio")
+            self.committed = self._attempted = self.buffer.start
+        if self._task is None and self._has_new_step():
+            self._task = asyncio.create_task(self._drain())
+
+    def _has_new_step(self) -> bool:
+        return self.buffer.end - self._attempted >= self._step
+
+    async def _drain(self):
+        try:
+            while self._has_new_step() and not self._stopping:
+                await self._transcribe_window(final=False)
+        except Exception as e:
+            logger.error(f"❌ [LiveSTT] Meeting {self.meeting_id}: {e!r}")
+        finally:
+            self._task = None
+
+    async def _transcribe_window(self, final: bool) -> bool:
+        """Gửi cửa sổ [committed, ...) tới STT và chốt các đoạn đã hoàn chỉnh; trả về False nếu STT lỗi."""
+        start = self.committed
+        end = min(self.buffer.end, start + self._window)
+        self._attempted = end
+        pcm = self.buffer.read(start, end)
+        try:
+            async with _stt_semaphore:
+                result = await self.ai_service.transcribe_live_window(pcm, SAMPLE_RATE)
+        except Exception as e:
+            # Âm thanh vẫn nằm trong bộ đệm vòng, bước sau gửi lại
+            logger.warning(f"⚠️ [LiveSTT] Meeting {self.meeting_id}: window failed ({e!r})")
+            return False
+
+        segments = [s for s in result.get("segments", []) if (s.get("text") or "").strip()]
+        duration = (end - start) / SAMPLE_RATE
+        if final and end == self.buffer.end:
+            keep, committed_until = segments, end
+        else:
+            horizon = duration - LIVE_STT_TAIL_GUARD_SECONDS
+            keep = [s for s in segments if s["end"] <= horizon]
+            # Không có đoạn nào hoàn chỉnh: câu nói còn dở, chờ thêm âm thanh
+            committed_until = start + int(keep[-1]["end"] * SAMPLE_RATE) if keep else start
+            if not segments:
+                committed_until = start + int(max(horizon, 0) * SAMPLE_RATE)  # im lặng
+            elif not keep and end - start >= self._window:
+                # Cửa sổ đã đầy mà chưa đoạn nào kết thúc trước phần đuôi: chốt tất cả trừ đoạn cuối (hoặc cả cửa sổ)
+                keep = segments[:-1]
+                committed_until = start + int(keep[-1]["end"] * SAMPLE_RATE) if keep else end
+                keep = keep or segments
+        self.committed = max(self.committed, min(committed_until, end))
+
+        if keep:
+            base = self.offset_seconds + start / SAMPLE_RATE
+            await self.on_segments(self.meeting_id, [
+                {
+                    "speaker": self.speaker,
+                    "start_seconds": round(base + s["start"], 2),
+                    "end_seconds": round(base + s["end"], 2),
+                    "text": s["text"].strip(),
+                }
+                for s in keep
+            ])
+        return True
+
+    async def stop(self):
+        """Dừng nhận âm thanh, chờ cửa sổ đang chạy rồi chốt toàn bộ phần còn lại."""
+        self._stopping = True
+        if self._task is not None:
+            try:
+                await self._task
+            except Exception:
+                pass
+        while self.buffer.end - self.committed >= _MIN_FINAL_SAMPLES:
+            if not await self._transcribe_window(final=True):
+                break
+
+
+class LiveTranscriptionManager:
+    """Quản lý các luồng đang ghi chép trong tiến trình, theo khóa (sid của Socket.IO)."""
+
+    def __init__(self):
+        self._sessions: Dict[str, LiveTranscriptionSession] = {}
+        self._started_at: Dict[str, float] = {}
+
+    def start(self, key: str, meeting_id: str, speaker: Optional[str], resume_offset: float,
+              on_segments: SegmentsCallback) -> LiveTranscriptionSession:
+        """
+        Bắt đầu một luồng. Mọi luồng của cùng cuộc họp dùng chung dòng thời gian:
+        mốc 0 là lúc luồng đầu tiên bắt đầu (tiếp nối sau resume_offset giây nếu cuộc họp đã có transcript trực tiếp).
+        """
+        if meeting_id not in self._started_at:
+            self._started_at[meeting_id] = time.monotonic() - resume_offset
+        session = LiveTranscriptionSession(
+            meeting_id, speaker, time.monotonic() - self._started_at[meeting_id], on_segments
+        )
+        self._sessions[key] = session
+        return session
+
+    def feed(self, key: str, data: bytes) -> bool:
+        session = self._sessions.get(key)
+        if session is None:
+            return False
+        session.feed(data)
+        return True
+
+    async def stop(self, key: str) -> Optional[str]:
+        """Dừng luồng; trả về meeting_id nếu đó là luồng cuối cùng của cuộc họp (cần ghép transcript)."""
+        session = self._sessions.pop(key, None)
+        if session is None:
+            return None
+        await session.stop()
+        if any(s.meeting_id == session.meeting_id for s in self._sessions.values()):
+            return None
+        self._started_at.pop(session.meeting_id, None)
+        return session.meeting_id
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "streams": len(self._sessions),
+            "meetings": len(self._started_at),
+        }
+
+
+live_transcriptions = LiveTranscriptionManager()
+
+
+def format_segments(segments: List[MeetingTranscriptSegment]) -> str:
+    """Ghép các đoạn thành transcript định dạng "[HH:MM:SS] Người nói: Nội dung" (giống transcript của AI Service)."""
+    lines = []
+    for segment in segments:
+        seconds = int(max(segment.start_seconds, 0))
+        timestamp = f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+        lines.append(f"[{timestamp}] {segment.speaker or DEFAULT_SPEAKER}: {segment.text}")
+    return "\n".join(lines)
+
+
+class LiveTranscriptService:
+    """Các thao tác Database của ghi chép trực tiếp (Session sync, gọi trong threadpool)."""
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.repo = TranscriptSegmentRepository(db)
+
+    def check_access(self, meeting_id: str, user_id: Optional[str]) -> Optional[bool]:
+        """
+        None: cuộc họp không tồn tại; False: User không thuộc dự án của cuộc họp.
+        Dùng EXISTS trực tiếp (không qua cache thành viên) để thành viên vừa bị xóa không nghe lén được.
+        """
+        row = self.db.query(Meeting.project_id).filter(Meeting.id == meeting_id).first()
+        if row is None:
+            return None
+        return bool(user_id) and ProjectRepository(self.db).is_member(row.project_id, user_id)
+
+    def resume_offset(self, meeting_id: str) -> float:
+        """Điểm cuối của transcript trực tiếp đã lưu (client kết nối lại thì ghi tiếp sau đó)."""
+        value = self.db.query(func.max(MeetingTranscriptSegment.end_seconds)).filter(
+            MeetingTranscriptSegment.meeting_id == meeting_id
+        ).scalar()
+        return float(value or 0.0)
+
+    def save_segments(self, meeting_id: str, segments: List[Dict[str, Any]]) -> int:
+        return self.repo.add_many(meeting_id, segments)
+
+    def build_transcript(self, meeting_id: str) -> Optional[str]:
+        """Transcript ghép từ các đoạn đã chốt; None nếu cuộc họp không được ghi chép trực tiếp."""
+        segments = self.repo.list_for_meeting(meeting_id)
+        return format_segments(segments) if segments else None
+
+    def finalize(self, meeting_id: str) -> Optional[str]:
+        """Lưu transcript trực tiếp vào Meeting.transcript và cập nhật chỉ mục tìm kiếm."""
+        transcript = self.build_transcript(meeting_id)
+        meeting = self.db.query(Meeting).filter(Meeting.id == meeting_id).first()
+        if not transcript or not meeting:
+            return None
+        meeting.transcript = transcript
+        self.db.commit()
+        transcript_index.schedule_update(meeting_id, transcript)
+        logger.info(f"📝 [LiveSTT] Meeting {meeting_id}: live transcript saved ({len(transcript)} chars)")
+        return transcript
@@ -0,0 +1,142 @@
+"""
+server/src/services/meeting_analysis_service.py
+Dịch vụ phân tích cuộc họp bằng AI.
+Dùng chung cho chế độ đồng bộ (analyze_meeting?background=false) và cho Worker của hàng đợi job (server/worker.py).
+"""
+
+import os
+from urllib.parse import urlparse
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy.orm import Session, joinedload
+from fastapi import HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+
+from src.models.meeting import Meeting
+from src.models.user import User
+from src.services.ai_service import AIService
+from src.services.live_transcription_service import LiveTranscriptService
+from src.services.transcript_index import transcript_index
+from src.core.logger import logger
+
+
+class MeetingAnalysisService:
+    def __init__(self, db: Session, ai_service: Optional[AIService] = None):
+        """Khởi tạo với Session DB và AI Service Client."""
+        self.db = db
+        self.ai_service = ai_service or AIService()
+
+    def get_meeting(self, meeting_id: str) -> Meeting:
+        meeting = self.db.query(Meeting).options(joinedload(Meeting.attendees)).filter(Meeting.id == meeting_id).first()
+        if not meeting:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Meeting not found")
+        return meeting
+
+    def resolve_audio_path(self, meeting: Meeting, required: bool = True) -> Optional[str]:
+        """
+        Chuyển recording_url (http://localhost:8000/static/recordings/{id}.webm) thành đường dẫn tuyệt đối
+        để AI Service (tiến trình khác) đọc được file.
+        required=False: thiếu file ghi âm thì trả về None thay vì báo lỗi.
+        """
+        if not meeting.recording_url:
+            if not required:
+                return None
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No recording URL.")
+
+        path = urlparse(meeting.recording_url).path.lstrip('/')
+        if not os.path.exists(path):
+            if not required:
+                return None
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Audio file not found")
+        return os.path.abspath(path)
+
+    def build_metadata(self, meeting: Meeting) -> Dict[str, Any]:
+        """Chuẩn bị metadata (người tham gia, dự án) gửi kèm cho AI Service."""
+        attendees = self.db.query(User).filter(User.id.in_(meeting.attendee_ids)).all()
+        participants_info = [{"id": str(u.id), "name": u.name, "email": u.email} for u in attendees]
+
+        return {
+            "title": meeting.title,
+            "description": meeting.description,
+            "id": meeting.id,
+            "projectId": meeting.project_id,
+            "project_id": meeting.project_id,
+            "author_id": str(meeting.attendee_ids[0]) if meeting.attendee_ids else None,
+            "date": str(meeting.start_date),
+            "participants": participants_info
+        }
+
+    def prepare(self, meeting_id: str) -> Tuple[Meeting, Optional[str], Optional[str], Dict[str, Any]]:
+        """
+        Lấy cuộc họp, đường dẫn audio, transcript trực tiếp và metadata (ném HTTPException nếu thiếu dữ liệu).
+        Cuộc họp đã được ghi chép trực tiếp (Socket.IO /transcription) thì dùng luôn transcript đó,
+        file ghi âm khi ấy là tùy chọn.
+        """
+        meeting = self.get_meeting(meeting_id)
+        transcript = LiveTranscriptService(self.db).build_transcript(meeting_id)
+        audio_path = self.resolve_audio_path(meeting, required=transcript is None)
+        return meeting, audio_path, transcript, self.build_metadata(meeting)
+
+    def save_result(self, meeting: Meeting, result: Dict[str, Any]):
+        """Lưu transcript và bản tóm tắt (kể cả bản tạm ở chế độ chờ duyệt) rồi cập nhật chỉ mục transcript."""
+        if result.get("status") not in (None, "completed", "waiting_review"):
+            return
+        if result.get("transcript"):
+            meeting.transcript = result.get("transcript")
+        if result.get("summary"):
+            meeting.summary = result.get("summary")
+        self.db.commit()
+        self.db.refresh(meeting)
+        transcript_index.schedule_update(meeting.id, meeting.transcript)
+
+    async def analyze(self, meeting_id: str, token: Optional[str] = None, skip_review: bool = True) -> Dict[str, Any]:
+        """
+        Gọi AI Service phân tích cuộc họp (chờ kết quả) và lưu kết quả vào Database.
+        Quy trình:
+        1. Lấy file ghi âm (recording_url) hoặc transcript trực tiếp, và metadata.
+        2. Gửi yêu cầu sang AI Service (bất đồng bộ, không chiếm luồng trong lúc chờ).
+        3. Cập nhật transcript/summary ngược lại Database.
+        Các thao tác DB (Session sync) chạy trong threadpool để không chặn event loop.
+        """
+        meeting, audio_path, transcript, metadata = await run_in_threadpool(self.prepare, meeting_id)
+        if transcript:
+            logger.info(f"📝 [Analysis] Using live transcript of Meeting {meeting_id} ({len(transcript)} chars), skipping STT")
+
+        logger.info(f"⏳ Calling AI Service with {len(metadata['participants'])} participants: {[p['name'] for p in metadata['participants']]}")
+        result = await self.ai_service.process_meeting(
+            meeting_id=meeting_id,
+            audio_file_path=audio_path,
+            meeting_metadata=metadata,
+            token=token,
+            background=False,
+            skip_review=skip_review,
+            transcript=transcript
+        )
+
+        await run_in_threadpool(self.save_result, meeting, result)
+        logger.info(f"✅ [Analysis] Saved analysis result for Meeting {meeting_id}")
+        return result
+
+    def build_confirm_payload(self, meeting_id: str, updated_summary: Optional[str],
+                              updated_action_items: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Lưu bản tóm tắt đã duyệt và chuẩn bị payload xác nhận gửi cho Agent."""
+        meeting = self.get_meeting(meeting_id)
+
+        # Update local summary immediately
+        if updated_summary:
+            meeting.summary = updated_summary
+            self.db.commit()
+
+        return {
+            "meeting_id": meeting_id,
+            "updated_summary": updated_summary,
+            "updated_action_items": updated_action_items,
+            "project_id": meeting.project_id,
+            "author_id": str(meeting.attendee_ids[0]) if meeting.attendee_ids else None,
+            "participants": self.build_metadata(meeting)["participants"]
+        }
+
+    async def confirm(self, meeting_id: str, updated_summary: Optional[str],
+                      updated_action_items: List[Dict[str, Any]], token: Optional[str] = None) -> Dict[str, Any]:
+        """Xác nhận kết quả phân tích: Agent tiếp tục workflow và tạo task (gọi ngược lại API /tasks)."""
+        payload = await run_in_threadpool(self.build_confirm_payload, meeting_id, updated_summary, updated_action_items)
+        return await self.ai_service.confirm_meeting(payload, token)
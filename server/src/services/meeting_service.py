@@ -5,14 +5,47 @@ Bao gồm: Lên lịch cuộc họp, quản lý danh sách họp của dự án
 """
 
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.core.database import SessionLocal
+from src.core.logger import logger
 from src.schemas import meeting as meeting_schemas
 from src.models.meeting import Meeting
-from src.repositories.meeting_repository import MeetingRepository 
-from src.repositories.project_repository import ProjectRepository
+from src.repositories.meeting_repository import MeetingRepository, AsyncMeetingRepository
+from src.repositories.project_repository import ProjectRepository, AsyncProjectRepository
+from src.services.transcript_index import TranscriptSegment, search_text, transcript_digest, transcript_index
 from uuid import uuid4
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from fastapi import HTTPException, status
 
+
+def _load_transcript(meeting_id: str) -> Optional[str]:
+    """Đọc transcript bằng Session riêng (chạy trong luồng đánh chỉ mục, không dùng Session của Request)."""
+    db = SessionLocal()
+    try:
+        return MeetingRepository(db).get_transcript(meeting_id)
+    finally:
+        db.close()
+
+
+def backfill_transcript_indexes() -> int:
+    """
+    Xếp hàng đánh chỉ mục (chạy ngầm) cho các cuộc họp có transcript nhưng chưa có chỉ mục
+    hoặc chỉ mục đã cũ (dữ liệu trước khi có chỉ mục, transcript sửa ngoài ứng dụng). Trả về số cuộc họp.
+    """
+    db = SessionLocal()
+    try:
+        rows = MeetingRepository(db).get_transcript_digests()
+    finally:
+        db.close()
+    scheduled = 0
+    for meeting_id, content_md5 in rows:
+        if not transcript_index.is_current(meeting_id, content_md5):
+            transcript_index.schedule_backfill(meeting_id, _load_transcript)
+            scheduled += 1
+    if scheduled:
+        logger.info(f"🔎 [TranscriptIndex] Backfilling {scheduled} transcript index(es)")
+    return scheduled
+
 class MeetingService:
     def __init__(self, db: Session):
         """Khởi tạo với Repository Meeting và Project."""
@@ -29,8 +62,7 @@ class MeetingService:
         3. Lưu thông tin cuộc họp vào cơ sở dữ liệu.
         """
         # 1. Kiểm tra quyền hạn
-        project = self.project_repo.get_by_id(meeting_data.project_id)
-        if not project or creator_id not in [m.id for m in project.members]:
+        if not self.project_repo.has_access(meeting_data.project_id, creator_id, fresh=True):
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Bạn không có quyền lên lịch cuộc họp cho dự án này.")
 
         # 2. Chuẩn bị dữ liệu và lưu
@@ -44,12 +76,76 @@ class MeetingService:
         Lấy tất cả các cuộc họp thuộc về một dự án.
         Chỉ thành viên của dự án mới có quyền truy cập.
         """
-        project = self.project_repo.get_by_id(project_id)
-        if not project or user_id not in [m.id for m in project.members]:
+        if not self.project_repo.has_access(project_id, user_id):
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Bạn không có quyền truy cập danh sách cuộc họp của dự án này.")
 
         return self.repo.get_meetings_by_project(project_id)
 
+    def get_meetings_by_project_page(self, project_id: str, user_id: str, limit: Optional[int] = None,
+                                     cursor: Optional[str] = None) -> Tuple[List[Meeting], Optional[str]]:
+        """Lấy một trang cuộc họp của dự án (phân trang theo con trỏ)."""
+        if not self.project_repo.has_access(project_id, user_id):
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Bạn không có quyền truy cập danh sách cuộc họp của dự án này.")
+
+        return self.repo.get_meetings_by_project_page(project_id, limit, cursor)
+
+    @staticmethod
+    def _to_hits(meeting_id: str, title: Optional[str],
+                 segments: List[TranscriptSegment]) -> List[meeting_schemas.TranscriptHit]:
+        return [
+            meeting_schemas.TranscriptHit(
+                meeting_id=meeting_id,
+                meeting_title=title,
+                timestamp=segment.timestamp,
+                offset_seconds=segment.start_seconds,
+                speaker=segment.speaker,
+                text=segment.text,
+            )
+            for segment in segments
+        ]
+
+    def search_transcript(self, meeting_id: str, user_id: str, query: str,
+                          limit: int = 20) -> List[meeting_schemas.TranscriptHit]:
+        """
+        Tìm các đoạn hội thoại trong transcript của một cuộc họp.
+        Chỉ mục thiếu / cũ (md5 khác transcript): tìm trực tiếp trên transcript đã tải và xây lại chỉ mục chạy ngầm.
+        """
+        meeting = self.repo.get_by_id(meeting_id)
+        if not meeting:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Không tìm thấy cuộc họp.")
+
+        if not self.project_repo.has_access(meeting.project_id, user_id):
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Bạn không có quyền truy cập cuộc họp này.")
+
+        if not meeting.transcript:
+            return []
+        if transcript_index.is_current(meeting.id, transcript_digest(meeting.transcript)):
+            segments = transcript_index.search(meeting.id, query, limit)
+        else:
+            transcript_index.schedule_update(meeting.id, meeting.transcript)
+            segments = search_text(meeting.transcript, query, limit)
+        return self._to_hits(meeting.id, meeting.title, segments)
+
+    def search_project_transcripts(self, project_id: str, user_id: str, query: str,
+                                   limit: int = 20) -> List[meeting_schemas.TranscriptHit]:
+        """
+        Tìm trong transcript của tất cả cuộc họp thuộc dự án, theo thứ tự thời gian cuộc họp.
+        Chỉ dùng chỉ mục khớp md5 transcript hiện tại; cuộc họp có chỉ mục thiếu / cũ được xếp hàng đánh chỉ mục
+        chạy ngầm (không tải transcript trong Request) và có trong kết quả từ các lần tìm sau.
+        """
+        if not self.project_repo.has_access(project_id, user_id):
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Bạn không có quyền truy cập danh sách cuộc họp của dự án này.")
+
+        hits: List[meeting_schemas.TranscriptHit] = []
+        for meeting_id, title, content_md5 in self.repo.get_transcribed_meetings(project_id):
+            if not transcript_index.is_current(meeting_id, content_md5):
+                transcript_index.schedule_backfill(meeting_id, _load_transcript)
+                continue
+            hits.extend(self._to_hits(meeting_id, title, transcript_index.search(meeting_id, query, limit - len(hits))))
+            if len(hits) >= limit:
+                break
+        return hits
+
     def delete_meeting(self, meeting_id: str, user_id: str) -> bool:
         """
         Xóa một cuộc họp.
@@ -59,8 +155,25 @@ class MeetingService:
         if not meeting:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Không tìm thấy cuộc họp.")
 
-        project = self.project_repo.get_by_id(meeting.project_id)
-        if not project or user_id not in [m.id for m in project.members]:
-            raise HTTPException(status_code=status.HTTP_43_FORBIDDEN, detail="Bạn không có quyền xóa cuộc họp này.")
-            
-        return self.repo.remove(meeting_id)
\ No newline at end of file
+        if not self.project_repo.has_access(meeting.project_id, user_id, fresh=True):
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Bạn không có quyền xóa cuộc họp này.")
+
+        transcript_index.schedule_update(meeting_id, None)
+        return self.repo.remove(meeting_id)
+
+
+class AsyncMeetingService:
+    """Đọc danh sách cuộc họp qua AsyncSession (DB_ASYNC_MODE), cùng quy tắc phân quyền với MeetingService."""
+
+    def __init__(self, db: AsyncSession):
+        """Khởi tạo với Repository Meeting và Project (async)."""
+        self.repo = AsyncMeetingRepository(db)
+        self.project_repo = AsyncProjectRepository(db)
+
+    async def get_meetings_by_project_page(self, project_id: str, user_id: str, limit: Optional[int] = None,
+                                           cursor: Optional[str] = None) -> Tuple[List[Meeting], Optional[str]]:
+        """Lấy một trang cuộc họp của dự án (phân trang theo con trỏ)."""
+        if not await self.project_repo.has_access(project_id, user_id):
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Bạn không có quyền truy cập danh sách cuộc họp của dự án này.")
+
+        return await self.repo.get_meetings_by_project_page(project_id, limit, cursor)
@@ -6,12 +6,13 @@ Bao gồm: Tạo dự án, quản lý thành viên và truy vấn danh sách d
 
 from fastapi import HTTPException
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from src.schemas import project as project_schemas
 from src.models.project import Project
-from src.repositories.project_repository import ProjectRepository 
+from src.repositories.project_repository import ProjectRepository, AsyncProjectRepository, invalidate_member_projects
 from src.repositories.user_repository import UserRepository
 from uuid import uuid4
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
 class ProjectService:
     def __init__(self, db: Session):
@@ -52,34 +53,40 @@ class ProjectService:
         """Lấy tất cả dự án mà người dùng tham gia."""
         return self.repo.get_all_projects_where_user_is_member(user_id)
 
+    def get_projects_by_user_page(self, user_id: str, limit: Optional[int] = None,
+                                  cursor: Optional[str] = None) -> Tuple[List[Project], Optional[str]]:
+        """Lấy một trang dự án mà người dùng tham gia (phân trang theo con trỏ)."""
+        return self.repo.get_projects_where_user_is_member_page(user_id, limit, cursor)
+
     def get_project_by_id(self, project_id: str) -> Optional[Project]:
         """Xem chi tiết một dự án qua ID."""
         return self.repo.get_by_id(project_id)
 
+    def has_access(self, project_id: str, user_id: str) -> bool:
+        """Kiểm tra người dùng có phải thành viên dự án không (dùng cache thành viên)."""
+        return self.repo.has_access(project_id, user_id)
+
     def add_member_by_email(self, project_id: str, email: str, current_user_id: str):
         """
         Thêm một thành viên mới vào dự án bằng Email.
         
         Quy trình:
-        1. Kiểm tra dự án có tồn tại không.
+        1. Kiểm tra dự án có tồn tại và người thực hiện có thuộc dự án không.
         2. Tìm người dùng trong hệ thống qua email.
-        3. Kiểm tra xem người dùng đó đã có trong dự án chưa.
+        3. Kiểm tra xem người dùng đó đã có trong dự án chưa (EXISTS, không tải members).
         4. Thêm người dùng vào danh sách thành viên dự án.
         """
-        project = self.repo.get_by_id(project_id)
-        if not project:
+        if not self.repo.has_access(project_id, current_user_id, fresh=True):
             raise HTTPException(status_code=404, detail="Không tìm thấy dự án.")
         
         user_to_add = self.user_repo.get_user_by_email(email)
         if not user_to_add:
             raise HTTPException(status_code=404, detail="Email này chưa đăng ký tài khoản Meetly.")
             
-        if user_to_add.id in [m.id for m in project.members]:
+        if self.repo.is_member(project_id, user_to_add.id):
              raise HTTPException(status_code=400, detail="Người dùng này đã là thành viên của dự án.")
 
-        project.members.append(user_to_add)
-        self.repo.db.commit()
-        self.repo.db.refresh(project)
+        self.repo.add_member(project_id, user_to_add.id)
         
         return user_to_add
 
@@ -88,7 +95,7 @@ class ProjectService:
         Xóa thành viên khỏi dự án.
         Chỉ dành cho Manager (chủ sở hữu dự án).
         """
-        project = self.repo.get_by_id(project_id)
+        project = self.repo.db.get(Project, project_id)
         if not project:
             raise HTTPException(status_code=404, detail="Không tìm thấy dự án.")
 
@@ -102,14 +109,10 @@ class ProjectService:
         if member_id == requester_id:
              raise HTTPException(status_code=400, detail="Bạn không thể tự xóa chính mình khỏi danh sách thành viên ở đây.")
 
-        # Tìm thành viên trong dự án
-        member_to_remove = next((m for m in project.members if m.id == member_id), None)
-        if not member_to_remove:
+        # Xóa trực tiếp trên bảng thành viên
+        if not self.repo.remove_member(project_id, member_id):
             raise HTTPException(status_code=404, detail="Thành viên không tồn tại trong dự án.")
 
-        project.members.remove(member_to_remove)
-        self.repo.db.commit()
-        self.repo.db.refresh(project)
         return True
 
     def delete_project(self, project_id: str, user_id: str) -> bool:
@@ -117,11 +120,34 @@ class ProjectService:
         Xóa dự án.
         Yêu cầu người thực hiện phải là thành viên của dự án.
         """
-        project = self.repo.get_by_id(project_id)
-        if not project:
+        if not self.repo.db.get(Project, project_id):
             raise HTTPException(status_code=404, detail="Không tìm thấy dự án.")
         
-        if user_id not in [m.id for m in project.members]:
+        if not self.repo.has_access(project_id, user_id, fresh=True):
              raise HTTPException(status_code=403, detail="Bạn không có quyền xóa dự án này.")
 
-        return self.repo.remove(project_id)
\ No newline at end of file
+        member_ids = self.repo.get_member_ids(project_id)
+        success = self.repo.remove(project_id)
+        invalidate_member_projects(*member_ids)
+        return success
+
+
+class AsyncProjectService:
+    """Các thao tác đọc Project qua AsyncSession (DB_ASYNC_MODE)."""
+
+    def __init__(self, db: AsyncSession):
+        """Khởi tạo với Repository Project (async)."""
+        self.repo = AsyncProjectRepository(db)
+
+    async def get_projects_by_user_page(self, user_id: str, limit: Optional[int] = None,
+                                        cursor: Optional[str] = None) -> Tuple[List[Project], Optional[str]]:
+        """Lấy một trang dự án mà người dùng tham gia (phân trang theo con trỏ)."""
+        return await self.repo.get_projects_where_user_is_member_page(user_id, limit, cursor)
+
+    async def get_project_by_id(self, project_id: str) -> Optional[Project]:
+        """Xem chi tiết một dự án qua ID."""
+        return await self.repo.get_by_id(project_id)
+
+    async def has_access(self, project_id: str, user_id: str) -> bool:
+        """Kiểm tra người dùng có phải thành viên dự án không (dùng cache thành viên)."""
+        return await self.repo.has_access(project_id, user_id)
@@ -0,0 +1,79 @@
+"""
+server/src/services/search_service.py
+Dịch vụ tìm kiếm toàn cục (Global Search).
+Bao gồm: Chuẩn hóa từ khóa thành tsquery (hỗ trợ tìm theo tiền tố cho type-ahead),
+tìm trên Tasks/Projects/Meetings/Users trong phạm vi dự án người dùng tham gia, và gộp kết quả theo độ liên quan.
+Điểm của mọi loại đều nằm trong khoảng 0..1 (ts_rank_cd chuẩn hóa 32, similarity của trigram) nên gộp trực tiếp được.
+"""
+
+import re
+from sqlalchemy.orm import Session
+from src.repositories.search_repository import SearchRepository
+from src.repositories.project_repository import ProjectRepository
+from typing import Any, Dict, List, Optional
+
+# Giới hạn số từ khóa để tránh tsquery quá dài
+MAX_QUERY_TERMS = 8
+_TERM_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def build_prefix_tsquery(query: str) -> Optional[str]:
+    """
+    Chuyển chuỗi người dùng nhập thành tsquery dạng 'tu1:* & tu2:*'.
+    Chỉ giữ các ký tự chữ/số nên không thể chèn toán tử tsquery từ bên ngoài.
+    """
+    terms = _TERM_RE.findall(query.lower())[:MAX_QUERY_TERMS]
+    if not terms:
+        return None
+    return " & ".join(f"{term}:*" for term in terms)
+
+
+class SearchService:
+    def __init__(self, db: Session):
+        """Khởi tạo với Repository tìm kiếm và Project (để lấy phạm vi truy cập)."""
+        self.repo = SearchRepository(db)
+        self.project_repo = ProjectRepository(db)
+
+    def search(self, query: str, user_id: str, limit: int = 10) -> Dict[str, Any]:
+        """
+        Tìm kiếm trên toàn hệ thống.
+
+        Quy trình:
+        1. Chuẩn hóa từ khóa thành tsquery theo tiền tố.
+        2. Lấy danh sách dự án người dùng được phép truy cập (có cache).
+        3. Tìm Tasks, Projects, Meetings và Users (thành viên cùng dự án) trong phạm vi đó.
+        4. Gộp thành một danh sách 'results' sắp xếp theo độ liên quan.
+        """
+        result: Dict[str, Any] = {"tasks": [], "projects": [], "meetings": [], "users": [], "results": []}
+        term = query.strip()
+        ts_query_text = build_prefix_tsquery(term)
+        if not ts_query_text:
+            return result
+
+        project_ids = self.project_repo.get_accessible_project_ids(user_id)
+        ranked: List[Dict[str, Any]] = []
+        if project_ids:
+            for task, rank in self.repo.search_tasks(ts_query_text, project_ids, limit):
+                result["tasks"].append({"id": task.id, "title": task.title, "status": task.status, "project_id": task.project_id})
+                ranked.append({"type": "task", "id": task.id, "title": task.title, "rank": float(rank)})
+
+            for project, rank in self.repo.search_projects(ts_query_text, project_ids, limit):
+                result["projects"].append({"id": project.id, "name": project.name})
+                ranked.append({"type": "project", "id": project.id, "title": project.name, "rank": float(rank)})
+
+            for meeting, rank in self.repo.search_meetings(ts_query_text, project_ids, limit):
+                result["meetings"].append({
+                    "id": meeting.id,
+                    "title": meeting.title,
+                    "project_id": meeting.project_id,
+                    "start_date": meeting.start_date,
+                })
+                ranked.append({"type": "meeting", "id": meeting.id, "title": meeting.title, "rank": float(rank)})
+
+            for user, rank in self.repo.search_users(term, project_ids, limit):
+                result["users"].append({"id": user.id, "username": user.username, "email": user.email})
+                ranked.append({"type": "user", "id": user.id, "title": user.name, "rank": float(rank or 0.0)})
+
+        ranked.sort(key=lambda item: item["rank"], reverse=True)
+        result["results"] = ranked[:limit]
+        return result
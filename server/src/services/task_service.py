@@ -5,12 +5,13 @@ Bao gồm: Tạo task, cập nhật trạng thái (Kanban), lọc task theo dự
 """
 
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from src.schemas import task as task_schemas
 from src.models.task import Task
-from src.repositories.task_repository import TaskRepository 
-from src.repositories.project_repository import ProjectRepository
+from src.repositories.task_repository import TaskRepository, AsyncTaskRepository
+from src.repositories.project_repository import ProjectRepository, AsyncProjectRepository
 from uuid import uuid4
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from fastapi import HTTPException, status
 
 class TaskService:
@@ -24,14 +25,13 @@ class TaskService:
         Tạo công việc mới.
         
         Quy trình:
-        1. Kiểm tra dự án có tồn tại không.
+        1. Kiểm tra dự án có tồn tại và người tạo có thuộc dự án không.
         2. Tạo ID duy nhất (UUID).
         3. Gán người tạo (author_id).
         4. Lưu vào cơ sở dữ liệu.
         """
-        # 1. Kiểm tra dự án
-        project = self.project_repo.get_by_id(task_data.project_id)
-        if not project:
+        # 1. Kiểm tra dự án (qua bảng thành viên, không tải toàn bộ members)
+        if not self.project_repo.has_access(task_data.project_id, author_id, fresh=True):
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Không tìm thấy dự án.")
             
         # 2. Chuẩn bị dữ liệu
@@ -47,12 +47,27 @@ class TaskService:
         Lấy danh sách công việc của một dự án.
         Chỉ thành viên của dự án mới có quyền xem.
         """
-        project = self.project_repo.get_by_id(project_id)
-        if not project or user_id not in [m.id for m in project.members]:
+        if not self.project_repo.has_access(project_id, user_id):
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Bạn không có quyền truy cập công việc của dự án này.")
             
         return self.repo.get_tasks_by_project(project_id, status_filter)
 
+    def get_tasks_by_project_page(self, project_id: str, user_id: str, status_filter: Optional[str] = None,
+                                  limit: Optional[int] = None, cursor: Optional[str] = None) -> Tuple[List[Task], Optional[str]]:
+        """
+        Lấy một trang công việc của dự án (phân trang theo con trỏ).
+        Chỉ thành viên của dự án mới có quyền xem.
+        """
+        if not self.project_repo.has_access(project_id, user_id):
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Bạn không có quyền truy cập công việc của dự án này.")
+
+        return self.repo.get_tasks_by_project_page(project_id, status_filter, limit, cursor)
+
+    def get_tasks_by_user_page(self, user_id: str, status_filter: Optional[str] = None,
+                               limit: Optional[int] = None, cursor: Optional[str] = None) -> Tuple[List[Task], Optional[str]]:
+        """Lấy một trang công việc được giao cho người dùng (phân trang theo con trỏ)."""
+        return self.repo.get_tasks_by_user_page(user_id, status_filter, limit, cursor)
+
     def get_tasks_by_user(self, user_id: str, status_filter: Optional[str] = None) -> List[Task]:
         """
         Lấy tất cả công việc của một người dùng cụ thể.
@@ -69,8 +84,7 @@ class TaskService:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task not found.")
 
         # Check permission: Member of the project
-        project = self.project_repo.get_by_id(task.project_id)
-        if not project or user_id not in [m.id for m in project.members]:
+        if not self.project_repo.has_access(task.project_id, user_id, fresh=True):
              raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied.")
 
         # Convert to dict and filter None values (so we don't zero out existing data)
@@ -83,7 +97,7 @@ class TaskService:
         Cập nhật trạng thái công việc (Thường dùng cho kéo thả trên bảng Kanban).
         """
         task = self.repo.get_by_id(task_id)
-        if not task:
+        if not task or not self.project_repo.has_access(task.project_id, user_id, fresh=True):
              return None
         
         # Cập nhật thông tin status
@@ -98,8 +112,29 @@ class TaskService:
         if not task:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Không tìm thấy công việc.")
             
-        project = self.project_repo.get_by_id(task.project_id)
-        if not project or user_id not in [m.id for m in project.members]:
+        if not self.project_repo.has_access(task.project_id, user_id, fresh=True):
              raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Bạn không có quyền xóa công việc này.")
 
-        return self.repo.remove(task_id)
\ No newline at end of file
+        return self.repo.remove(task_id)
+
+
+class AsyncTaskService:
+    """Các thao tác đọc danh sách Task qua AsyncSession (DB_ASYNC_MODE), cùng quy tắc phân quyền với TaskService."""
+
+    def __init__(self, db: AsyncSession):
+        """Khởi tạo với Repository Task và Project (async)."""
+        self.repo = AsyncTaskRepository(db)
+        self.project_repo = AsyncProjectRepository(db)
+
+    async def get_tasks_by_project_page(self, project_id: str, user_id: str, status_filter: Optional[str] = None,
+                                        limit: Optional[int] = None, cursor: Optional[str] = None) -> Tuple[List[Task], Optional[str]]:
+        """Lấy một trang công việc của dự án; chỉ thành viên của dự án mới có quyền xem."""
+        if not await self.project_repo.has_access(project_id, user_id):
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Bạn không có quyền truy cập công việc của dự án này.")
+
+        return await self.repo.get_tasks_by_project_page(project_id, status_filter, limit, cursor)
+
+    async def get_tasks_by_user_page(self, user_id: str, status_filter: Optional[str] = None,
+                                     limit: Optional[int] = None, cursor: Optional[str] = None) -> Tuple[List[Task], Optional[str]]:
+        """Lấy một trang công việc được giao cho người dùng."""
+        return await self.repo.get_tasks_by_user_page(user_id, status_filter, limit, cursor)
@@ -0,0 +1,367 @@
+"""
+server/src/services/transcript_index.py
+Chỉ mục đảo ngược (Inverted Index) cho transcript cuộc họp, lưu trên đĩa và đọc bằng mmap.
+
+- Transcript được tách thành các đoạn (segment) theo định dạng "[HH:MM:SS] Người nói: Nội dung"
+  (do transcribe_audio của AI Service sinh ra), nhờ vậy kết quả tìm kiếm có thể nhảy tới đúng thời điểm.
+- Mỗi cuộc họp có một tệp chỉ mục riêng; khi transcript thay đổi chỉ tệp của cuộc họp đó được ghi lại
+  (cập nhật tăng dần), và nếu nội dung không đổi (cùng hash) thì bỏ qua.
+- Việc xây chỉ mục chạy ngầm trong một ThreadPoolExecutor để không chặn Request. Chỉ mục chỉ được dùng khi
+  md5 lưu trong header khớp với transcript hiện tại (is_current); chỉ mục thiếu / cũ được xây lại ngầm.
+
+Định dạng tệp (little-endian):
+    Header   : magic "PMTI", version, n_segments, n_terms, offset các vùng, md5 của transcript
+    Segments : n_segments x (start_seconds, speaker_off, speaker_len, text_off, text_len)
+    Terms    : n_terms x (term_off, term_len, postings_off, postings_len), sắp xếp theo bytes UTF-8
+    Postings : danh sách segment id dạng varint, mã hóa delta
+    Blob     : chuỗi UTF-8 (người nói, nội dung, từ khóa)
+"""
+
+import hashlib
+import mmap
+import os
+import re
+import struct
+import threading
+import time
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from src.core.logger import logger
+
+TRANSCRIPT_INDEX_DIR = os.getenv("TRANSCRIPT_INDEX_DIR", "data/transcript_index")
+# Số từ khóa tối đa được mở rộng khi tìm theo tiền tố
+MAX_PREFIX_EXPANSION = 64
+
+_MAGIC = b"PMTI"
+_VERSION = 1
+_HEADER = struct.Struct("<4sHIIIIII16s")
+_SEGMENT = struct.Struct("<IIHII")
+_TERM = struct.Struct("<IHII")
+
+_LINE_RE = re.compile(r"^\s*\[(\d{1,2}):(\d{2}):(\d{2})\]\s*([^:\n]{1,100}?)\s*:\s*(.*)$")
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+@dataclass
+class TranscriptSegment:
+    start_seconds: int
+    speaker: str
+    text: str
+
+    @property
+    def timestamp(self) -> str:
+        hours, rest = divmod(self.start_seconds, 3600)
+        minutes, seconds = divmod(rest, 60)
+        return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
+
+
+def parse_transcript(transcript: str) -> List[TranscriptSegment]:
+    """
+    Tách transcript thành các đoạn theo dòng "[HH:MM:SS] Người nói: Nội dung".
+    Dòng không đúng định dạng được nối vào đoạn trước (hoặc tạo đoạn tại 00:00:00).
+    """
+    segments: List[TranscriptSegment] = []
+    for line in transcript.splitlines():
+        if not line.strip():
+            continue
+        match = _LINE_RE.match(line)
+        if match:
+            hours, minutes, seconds, speaker, text = match.groups()
+            start = int(hours) * 3600 + int(minutes) * 60 + int(seconds)
+            segments.append(TranscriptSegment(start, speaker.strip(), text.strip()))
+        elif segments:
+            segments[-1].text = f"{segments[-1].text} {line.strip()}"
+        else:
+            segments.append(TranscriptSegment(0, "", line.strip()))
+    return segments
+
+
+def tokenize(text: str) -> List[str]:
+    """Tách từ (chữ/số Unicode) và viết thường; chuẩn hóa NFC để tiếng Việt gõ dựng sẵn/tổ hợp khớp nhau."""
+    return _TOKEN_RE.findall(unicodedata.normalize("NFC", text).lower())
+
+
+def _encode_varint(value: int, out: bytearray):
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _decode_postings(buf, start: int, length: int) -> List[int]:
+    ids, current, shift, value = [], 0, 0, 0
+    for byte in buf[start:start + length]:
+        value |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+            continue
+        current += value
+        ids.append(current)
+        shift, value = 0, 0
+    return ids
+
+
+def _content_hash(transcript: str) -> bytes:
+    return hashlib.md5(transcript.encode("utf-8")).digest()
+
+
+def transcript_digest(transcript: Optional[str]) -> Optional[str]:
+    """md5 (hex) của transcript, cùng giá trị với md5(transcript) của PostgreSQL."""
+    return _content_hash(transcript).hex() if transcript else None
+
+
+def search_text(transcript: str, query: str, limit: int = 20) -> List[TranscriptSegment]:
+    """
+    Tìm trực tiếp trên transcript (không cần tệp chỉ mục), cùng quy tắc với TranscriptIndexReader.search:
+    đoạn chứa TẤT CẢ từ khóa, từ cuối khớp theo tiền tố. Dùng khi chỉ mục chưa có hoặc đã cũ.
+    """
+    terms = tokenize(query)
+    if not terms:
+        return []
+    *exact, last = terms
+    hits: List[TranscriptSegment] = []
+    for segment in parse_transcript(transcript):
+        tokens = set(tokenize(f"{segment.speaker} {segment.text}"))
+        if all(term in tokens for term in exact) and any(token.startswith(last) for token in tokens):
+            hits.append(segment)
+            if len(hits) >= limit:
+                break
+    return hits
+
+
+def build_index_bytes(transcript: str) -> bytes:
+    """Xây dựng nội dung tệp chỉ mục cho một transcript."""
+    segments = parse_transcript(transcript)
+    blob = bytearray()
+
+    def add_string(value: str) -> Tuple[int, int]:
+        data = value.encode("utf-8")
+        offset = len(blob)
+        blob.extend(data)
+        return offset, len(data)
+
+    postings: Dict[bytes, List[int]] = {}
+    segment_table = bytearray()
+    for seg_id, segment in enumerate(segments):
+        speaker_off, speaker_len = add_string(segment.speaker[:1000])
+        text_off, text_len = add_string(segment.text)
+        segment_table += _SEGMENT.pack(segment.start_seconds, speaker_off, speaker_len, text_off, text_len)
+        for token in set(tokenize(f"{segment.speaker} {segment.text}")):
+            postings.setdefault(token.encode("utf-8")[:0xFFFF], []).append(seg_id)
+
+    term_table = bytearray()
+    postings_area = bytearray()
+    for term in sorted(postings):
+        term_off, term_len = len(blob), len(term)
+        blob.extend(term)
+        postings_off = len(postings_area)
+        previous = 0
+        for seg_id in postings[term]:
+            _encode_varint(seg_id - previous, postings_area)
+            previous = seg_id
+        term_table += _TERM.pack(term_off, term_len, postings_off, len(postings_area) - postings_off)
+
+    seg_off = _HEADER.size
+    term_off = seg_off + len(segment_table)
+    post_off = term_off + len(term_table)
+    blob_off = post_off + len(postings_area)
+    header = _HEADER.pack(_MAGIC, _VERSION, len(segments), len(postings),
+                          seg_off, term_off, post_off, blob_off, _content_hash(transcript))
+    return bytes(header + segment_table + term_table + postings_area + blob)
+
+
+class TranscriptIndexReader:
+    """Đọc một tệp chỉ mục qua mmap (chỉ đọc, không nạp toàn bộ tệp vào bộ nhớ)."""
+
+    def __init__(self, path: str):
+        self._file = open(path, "rb")
+        try:
+            self._buf = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Tệp rỗng không mmap được
+            self._file.close()
+            raise
+        (magic, version, self.n_segments, self.n_terms,
+         self._seg_off, self._term_off, self._post_off, self._blob_off, self.content_hash) = _HEADER.unpack_from(self._buf, 0)
+        if magic != _MAGIC or version != _VERSION:
+            self.close()
+            raise ValueError(f"Invalid transcript index file: {path}")
+
+    def close(self):
+        self._buf.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _string(self, offset: int, length: int) -> bytes:
+        start = self._blob_off + offset
+        return self._buf[start:start + length]
+
+    def _term_at(self, index: int) -> Tuple[bytes, int, int]:
+        term_off, term_len, postings_off, postings_len = _TERM.unpack_from(self._buf, self._term_off + index * _TERM.size)
+        return self._string(term_off, term_len), postings_off, postings_len
+
+    def _lower_bound(self, key: bytes) -> int:
+        lo, hi = 0, self.n_terms
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._term_at(mid)[0] < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def postings(self, term: str, prefix: bool = False) -> set:
+        """Tập segment id chứa từ khóa (hoặc mọi từ bắt đầu bằng tiền tố nếu prefix=True)."""
+        key = term.encode("utf-8")
+        result = set()
+        index = self._lower_bound(key)
+        expanded = 0
+        while index < self.n_terms and expanded < MAX_PREFIX_EXPANSION:
+            found, postings_off, postings_len = self._term_at(index)
+            if found != key and not (prefix and found.startswith(key)):
+                break
+            result.update(_decode_postings(self._buf, self._post_off + postings_off, postings_len))
+            if not prefix:
+                break
+            index += 1
+            expanded += 1
+        return result
+
+    def segment(self, seg_id: int) -> TranscriptSegment:
+        start, speaker_off, speaker_len, text_off, text_len = _SEGMENT.unpack_from(self._buf, self._seg_off + seg_id * _SEGMENT.size)
+        return TranscriptSegment(
+            start_seconds=start,
+            speaker=self._string(speaker_off, speaker_len).decode("utf-8"),
+            text=self._string(text_off, text_len).decode("utf-8"),
+        )
+
+    def search(self, query: str, limit: int = 20) -> List[TranscriptSegment]:
+        """
+        Tìm các đoạn chứa TẤT CẢ từ khóa; từ cuối cùng được khớp theo tiền tố (gõ tới đâu tìm tới đó).
+        Kết quả theo thứ tự thời gian.
+        """
+        terms = tokenize(query)
+        if not terms:
+            return []
+        matched: Optional[set] = None
+        for position, term in enumerate(terms):
+            ids = self.postings(term, prefix=(position == len(terms) - 1))
+            matched = ids if matched is None else matched & ids
+            if not matched:
+                return []
+        return [self.segment(seg_id) for seg_id in sorted(matched)[:limit]]
+
+
+class TranscriptIndex:
+    """Quản lý các tệp chỉ mục transcript (mỗi cuộc họp một tệp) và việc cập nhật chạy ngầm."""
+
+    def __init__(self, directory: str = TRANSCRIPT_INDEX_DIR):
+        self.directory = directory
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="transcript-index")
+        self._lock = threading.Lock()
+        # Cuộc họp đang chờ xây lại chỉ mục ngầm (tránh xếp hàng trùng khi nhiều Request cùng thấy chỉ mục cũ)
+        self._pending: Set[str] = set()
+        self._pending_lock = threading.Lock()
+
+    def _path(self, meeting_id: str) -> str:
+        safe_id = re.sub(r"[^A-Za-z0-9_-]", "_", meeting_id)
+        return os.path.join(self.directory, f"{safe_id}.idx")
+
+    def is_current(self, meeting_id: str, content_md5: Optional[str]) -> bool:
+        """Chỉ mục tồn tại và được xây từ đúng transcript có md5 (hex) content_md5."""
+        content_hash = self._current_hash(self._path(meeting_id))
+        return content_hash is not None and content_md5 is not None and content_hash.hex() == content_md5
+
+    def _current_hash(self, path: str) -> Optional[bytes]:
+        try:
+            with TranscriptIndexReader(path) as reader:
+                return reader.content_hash
+        except (OSError, ValueError, struct.error):
+            return None
+
+    def update(self, meeting_id: str, transcript: Optional[str]) -> bool:
+        """
+        Xây lại chỉ mục của một cuộc họp nếu transcript đã thay đổi.
+        Ghi vào tệp tạm rồi đổi tên (atomic) để người đọc không bao giờ thấy tệp dở dang.
+        Trả về True nếu tệp chỉ mục được ghi mới.
+        """
+        path = self._path(meeting_id)
+        with self._lock:
+            if not transcript:
+                if os.path.exists(path):
+                    os.remove(path)
+                return False
+            if self._current_hash(path) == _content_hash(transcript):
+                return False
+
+            os.makedirs(self.directory, exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(build_index_bytes(transcript))
+            # Trên Windows tệp đang được mmap bởi một lượt tìm kiếm khác sẽ không thể thay thế ngay
+            for attempt in range(5):
+                try:
+                    os.replace(tmp_path, path)
+                    break
+                except PermissionError:
+                    if attempt == 4:
+                        os.remove(tmp_path)
+                        raise
+                    time.sleep(0.1)
+        logger.info(f"🔎 [TranscriptIndex] Indexed transcript of meeting {meeting_id}")
+        return True
+
+    def schedule_update(self, meeting_id: str, transcript: Optional[str]):
+        """Đưa việc cập nhật chỉ mục vào hàng đợi chạy ngầm (không chặn Request)."""
+        def _run():
+            try:
+                self.update(meeting_id, transcript)
+            except Exception as e:
+                logger.error(f"❌ [TranscriptIndex] Failed to index meeting {meeting_id}: {e}")
+
+        self._executor.submit(_run)
+
+    def schedule_backfill(self, meeting_id: str, load_transcript: Callable[[str], Optional[str]]):
+        """
+        Xây lại chỉ mục thiếu / cũ chạy ngầm; transcript được đọc (load_transcript) ngay trong luồng đánh chỉ mục.
+        Bỏ qua nếu cuộc họp đã đang chờ.
+        """
+        with self._pending_lock:
+            if meeting_id in self._pending:
+                return
+            self._pending.add(meeting_id)
+
+        def _run():
+            try:
+                self.update(meeting_id, load_transcript(meeting_id))
+            except Exception as e:
+                logger.error(f"❌ [TranscriptIndex] Failed to backfill index of meeting {meeting_id}: {e}")
+            finally:
+                with self._pending_lock:
+                    self._pending.discard(meeting_id)
+
+        self._executor.submit(_run)
+
+    def search(self, meeting_id: str, query: str, limit: int = 20) -> List[TranscriptSegment]:
+        """Tìm trong transcript của một cuộc họp; trả về danh sách rỗng nếu chưa có chỉ mục."""
+        path = self._path(meeting_id)
+        if not os.path.exists(path):
+            return []
+        try:
+            with TranscriptIndexReader(path) as reader:
+                return reader.search(query, limit)
+        except (OSError, ValueError) as e:
+            logger.error(f"❌ [TranscriptIndex] Cannot read index of meeting {meeting_id}: {e}")
+            return []
+
+
+# Instance dùng chung cho toàn bộ tiến trình
+transcript_index = TranscriptIndex()
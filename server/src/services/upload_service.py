@@ -0,0 +1,311 @@
+"""
+server/src/services/upload_service.py
+Tải file lên theo luồng (streaming) và tải tiếp được (resumable) cho file ghi âm cuộc họp / ảnh đại diện.
+
+Upload nhiều phần (file ghi âm lớn, mạng chập chờn):
+    1. init     : khai báo kích thước (và sha256 nếu có) -> upload_id
+    2. PUT chunk: gửi từng phần kèm offset; mất kết nối thì hỏi lại offset hiện tại và gửi tiếp từ đó
+    3. complete : kiểm tra kích thước + checksum, rồi đổi tên nguyên tử (os.replace) sang vị trí cuối cùng
+- Dữ liệu dở dang nằm trong UPLOAD_TMP_DIR (không bị phục vụ qua /static); offset = kích thước tệp .part,
+  nên vẫn tải tiếp được sau khi Server khởi động lại.
+- Ghi đĩa chạy trong threadpool (không chặn event loop); sha256 được tính dần trong lúc nhận dữ liệu.
+- Phiên upload bỏ dở quá UPLOAD_SESSION_TTL_HOURS bị dọn khi có phiên mới.
+- Mỗi phiên gắn với người tạo (owner_id); số phiên đang mở bị giới hạn theo User và toàn Server (429).
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+import uuid
+from dataclasses import asdict, dataclass
+from typing import AsyncIterator, Dict, Optional, Tuple
+
+from fastapi import HTTPException, UploadFile, status
+from fastapi.concurrency import run_in_threadpool
+
+from src.core.logger import logger
+
+UPLOAD_TMP_DIR = os.getenv("UPLOAD_TMP_DIR", "data/uploads")
+RECORDING_MAX_BYTES = int(os.getenv("RECORDING_MAX_BYTES", str(2 * 1024 ** 3)))
+AVATAR_MAX_BYTES = int(os.getenv("AVATAR_MAX_BYTES", str(5 * 1024 ** 2)))
+# Kích thước phần khuyến nghị cho client
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", str(8 * 1024 ** 2)))
+UPLOAD_SESSION_TTL_HOURS = float(os.getenv("UPLOAD_SESSION_TTL_HOURS", "24"))
+# Giới hạn số phiên đang mở (mỗi phiên giữ một tệp .part có thể tới RECORDING_MAX_BYTES trên đĩa)
+UPLOAD_MAX_OPEN_SESSIONS_PER_USER = int(os.getenv("UPLOAD_MAX_OPEN_SESSIONS_PER_USER", "3"))
+UPLOAD_MAX_OPEN_SESSIONS = int(os.getenv("UPLOAD_MAX_OPEN_SESSIONS", "50"))
+# Gom dữ liệu nhận được thành khối cỡ này trước mỗi lần ghi đĩa
+_WRITE_BUFFER = 1024 * 1024
+
+
+@dataclass
+class UploadSession:
+    upload_id: str
+    target: str                    # ví dụ "recording:{meeting_id}"
+    size: int
+    sha256: Optional[str] = None   # checksum client khai báo (tùy chọn)
+    filename: Optional[str] = None
+    created_at: float = 0.0
+    owner_id: Optional[str] = None  # User đã mở phiên; chỉ người này được gửi tiếp / hoàn tất / hủy
+
+
+def _fsync_and_replace(src: str, dst: str):
+    """Đổi tên nguyên tử; nếu khác ổ đĩa thì chép sang tệp tạm cạnh đích rồi mới đổi tên."""
+    os.makedirs(os.path.dirname(dst) or ".", exist_ok=True)
+    with open(src, "rb+") as f:
+        os.fsync(f.fileno())
+    try:
+        os.replace(src, dst)
+    except OSError:
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(dst) or ".", prefix=".upload-")
+        os.close(fd)
+        shutil.copyfile(src, tmp)
+        os.replace(tmp, dst)
+        os.unlink(src)
+
+
+def _hash_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(_WRITE_BUFFER), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class UploadService:
+    # Trạng thái trong tiến trình: khóa theo upload_id và sha256 đang tính dần (offset, hasher).
+    # Nếu hasher không khớp offset (Server khởi động lại, worker khác nhận phần trước) thì complete() tính lại từ tệp.
+    _locks: Dict[str, asyncio.Lock] = {}
+    _hashers: Dict[str, Tuple[int, "hashlib._Hash"]] = {}
+    # Đếm + tạo phiên trong cùng một khóa để các request init đồng thời không vượt giới hạn
+    _create_lock: Optional[asyncio.Lock] = None
+
+    def __init__(self, tmp_dir: str = UPLOAD_TMP_DIR):
+        self.tmp_dir = tmp_dir
+
+    # --- Đường dẫn / lưu phiên ---
+    def _meta_path(self, upload_id: str) -> str:
+        return os.path.join(self.tmp_dir, f"{upload_id}.json")
+
+    def _part_path(self, upload_id: str) -> str:
+        return os.path.join(self.tmp_dir, f"{upload_id}.part")
+
+    def _lock(self, upload_id: str) -> asyncio.Lock:
+        return self._locks.setdefault(upload_id, asyncio.Lock())
+
+    def _create_files(self, session: UploadSession):
+        os.makedirs(self.tmp_dir, exist_ok=True)
+        open(self._part_path(session.upload_id), "wb").close()
+        with open(self._meta_path(session.upload_id), "w", encoding="utf-8") as f:
+            json.dump(asdict(session), f)
+
+    def _delete_files(self, upload_id: str):
+        for path in (self._meta_path(upload_id), self._part_path(upload_id)):
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+        self._locks.pop(upload_id, None)
+        self._hashers.pop(upload_id, None)
+
+    def _cleanup_expired(self):
+        if not os.path.isdir(self.tmp_dir):
+            return
+        deadline = time.time() - UPLOAD_SESSION_TTL_HOURS * 3600
+        for name in os.listdir(self.tmp_dir):
+            if not name.endswith(".json"):
+                continue
+            upload_id = name[:-5]
+            try:
+                if os.path.getmtime(self._part_path(upload_id)) < deadline:
+                    self._delete_files(upload_id)
+                    logger.info(f"🧹 Removed expired upload session {upload_id}")
+            except FileNotFoundError:
+                self._delete_files(upload_id)
+
+    def _count_open_sessions(self, owner_id: Optional[str]) -> Tuple[int, int]:
+        """(tổng số phiên đang mở, số phiên của owner_id)."""
+        if not os.path.isdir(self.tmp_dir):
+            return 0, 0
+        total = owned = 0
+        for name in os.listdir(self.tmp_dir):
+            if not name.endswith(".json"):
+                continue
+            total += 1
+            session = self._read_session(name[:-5])
+            if session is not None and owner_id is not None and session.owner_id == owner_id:
+                owned += 1
+        return total, owned
+
+    # --- Upload nhiều phần ---
+    async def create_session(self, target: str, size: int, max_bytes: int,
+                             sha256: Optional[str] = None, filename: Optional[str] = None,
+                             owner_id: Optional[str] = None) -> UploadSession:
+        if size <= 0:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="File size must be positive")
+        if size > max_bytes:
+            raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                                detail=f"File too large (max {max_bytes} bytes)")
+
+        session = UploadSession(
+            upload_id=uuid.uuid4().hex,
+            target=target,
+            size=size,
+            sha256=sha256.lower() if sha256 else None,
+            filename=filename,
+            created_at=time.time(),
+            owner_id=owner_id,
+        )
+        if UploadService._create_lock is None:
+            UploadService._create_lock = asyncio.Lock()
+        async with UploadService._create_lock:
+            await run_in_threadpool(self._cleanup_expired)
+            total, owned = await run_in_threadpool(self._count_open_sessions, owner_id)
+            if owned >= UPLOAD_MAX_OPEN_SESSIONS_PER_USER or total >= UPLOAD_MAX_OPEN_SESSIONS:
+                raise HTTPException(status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                                    detail="Too many open upload sessions, complete or abort one first")
+            await run_in_threadpool(self._create_files, session)
+        self._hashers[session.upload_id] = (0, hashlib.sha256())
+        return session
+
+    def _read_session(self, upload_id: str) -> Optional[UploadSession]:
+        try:
+            with open(self._meta_path(upload_id), "r", encoding="utf-8") as f:
+                return UploadSession(**json.load(f))
+        except (FileNotFoundError, ValueError, TypeError):
+            return None
+
+    async def get_session(self, upload_id: str, target: str, owner_id: Optional[str] = None) -> UploadSession:
+        # upload_id là hex do Server sinh ra; chặn mọi giá trị khác (ví dụ "../")
+        session = await run_in_threadpool(self._read_session, upload_id) if upload_id.isalnum() else None
+        # Phiên của User khác: trả 404 như không tồn tại (không lộ upload_id hợp lệ)
+        if session is None or session.target != target or session.owner_id != owner_id:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Upload session not found")
+        return session
+
+    async def get_offset(self, session: UploadSession) -> int:
+        try:
+            return await run_in_threadpool(os.path.getsize, self._part_path(session.upload_id))
+        except FileNotFoundError:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Upload session not found")
+
+    async def write_chunk(self, session: UploadSession, offset: int, stream: AsyncIterator[bytes],
+                          chunk_sha256: Optional[str] = None) -> int:
+        """
+        Ghi một phần bắt đầu tại offset; trả về offset mới.
+        - 409 nếu offset khác số byte đã nhận (client hỏi lại offset rồi gửi tiếp).
+        - Lỗi giữa chừng (mất kết nối, quá kích thước, sai checksum của phần): cắt tệp về offset cũ.
+        """
+        async with self._lock(session.upload_id):
+            current = await self.get_offset(session)
+            if offset != current:
+                raise HTTPException(status_code=status.HTTP_409_CONFLICT,
+                                    detail={"message": "Offset mismatch", "offset": current})
+
+            hashed_offset, running = self._hashers.get(session.upload_id, (-1, None))
+            running = running.copy() if running is not None and hashed_offset == offset else None
+            chunk_hash = hashlib.sha256()
+            part_path = self._part_path(session.upload_id)
+            f = await run_in_threadpool(open, part_path, "r+b")
+            written = 0
+            try:
+                await run_in_threadpool(f.seek, offset)
+                buffer = bytearray()
+                async for data in stream:
+                    if offset + written + len(buffer) + len(data) > session.size:
+                        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                                            detail="Chunk exceeds the declared file size")
+                    buffer += data
+                    if len(buffer) >= _WRITE_BUFFER:
+                        block, buffer = bytes(buffer), bytearray()
+                        await run_in_threadpool(f.write, block)
+                        chunk_hash.update(block)
+                        if running is not None:
+                            running.update(block)
+                        written += len(block)
+                if buffer:
+                    block = bytes(buffer)
+                    await run_in_threadpool(f.write, block)
+                    chunk_hash.update(block)
+                    if running is not None:
+                        running.update(block)
+                    written += len(block)
+
+                if chunk_sha256 and chunk_hash.hexdigest() != chunk_sha256.lower():
+                    raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Chunk checksum mismatch")
+            except BaseException:
+                await run_in_threadpool(f.truncate, offset)
+                await run_in_threadpool(f.close)
+                raise
+            await run_in_threadpool(f.close)
+
+            if running is not None:
+                # Chỉ lưu hasher khi phần đã ghi thành công (bản sao -> phần lỗi không làm hỏng hasher cũ)
+                self._hashers[session.upload_id] = (offset + written, running)
+            else:
+                self._hashers.pop(session.upload_id, None)
+            return offset + written
+
+    async def complete(self, session: UploadSession, destination: str) -> str:
+        """Kiểm tra kích thước + sha256 rồi chuyển tệp sang destination; trả về sha256."""
+        async with self._lock(session.upload_id):
+            received = await self.get_offset(session)
+            if received != session.size:
+                raise HTTPException(status_code=status.HTTP_409_CONFLICT,
+                                    detail={"message": "Upload incomplete", "offset": received})
+
+            part_path = self._part_path(session.upload_id)
+            hashed_offset, running = self._hashers.get(session.upload_id, (-1, None))
+            if running is not None and hashed_offset == session.size:
+                checksum = running.hexdigest()
+            else:
+                checksum = await run_in_threadpool(_hash_file, part_path)
+
+            if session.sha256 and checksum != session.sha256:
+                await run_in_threadpool(self._delete_files, session.upload_id)
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                                    detail="Checksum mismatch, please upload the file again")
+
+            await run_in_threadpool(_fsync_and_replace, part_path, destination)
+            await run_in_threadpool(self._delete_files, session.upload_id)
+            logger.info(f"📦 Upload {session.upload_id} completed -> {destination} ({session.size} bytes)")
+            return checksum
+
+    async def abort(self, session: UploadSession):
+        async with self._lock(session.upload_id):
+            await run_in_threadpool(self._delete_files, session.upload_id)
+
+    # --- Upload một lần (multipart), vẫn stream + giới hạn kích thước + ghi nguyên tử ---
+    async def save_upload_file(self, upload: UploadFile, destination: str, max_bytes: int) -> Tuple[int, str]:
+        """Ghi UploadFile vào destination qua tệp tạm cùng thư mục; trả về (số byte, sha256)."""
+        directory = os.path.dirname(destination) or "."
+        await run_in_threadpool(os.makedirs, directory, exist_ok=True)
+        fd, tmp_path = await run_in_threadpool(tempfile.mkstemp, dir=directory, prefix=".upload-")
+        f = os.fdopen(fd, "wb")
+        digest = hashlib.sha256()
+        size = 0
+        try:
+            while True:
+                block = await upload.read(_WRITE_BUFFER)
+                if not block:
+                    break
+                size += len(block)
+                if size > max_bytes:
+                    raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                                        detail=f"File too large (max {max_bytes} bytes)")
+                digest.update(block)
+                await run_in_threadpool(f.write, block)
+            await run_in_threadpool(f.close)
+            await run_in_threadpool(os.replace, tmp_path, destination)
+        except BaseException:
+            f.close()
+            try:
+                os.unlink(tmp_path)
+            except FileNotFoundError:
+                pass
+            raise
+        return size, digest.hexdigest()
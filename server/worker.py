@@ -0,0 +1,102 @@
+"""
+server/worker.py
+Worker xử lý hàng đợi phân tích cuộc họp (bảng analysis_jobs), chạy tách biệt khỏi web server.
+Có thể chạy nhiều tiến trình worker cùng lúc: job được nhận bằng FOR UPDATE SKIP LOCKED nên không bị xử lý trùng.
+
+Cách dùng:
+    python worker.py                     # Số job song song lấy từ ANALYSIS_WORKER_CONCURRENCY (mặc định 2)
+    python worker.py --concurrency 4     # Xử lý tối đa 4 cuộc họp song song
+"""
+
+import argparse
+import asyncio
+import os
+import signal
+import socket
+import threading
+
+from fastapi.concurrency import run_in_threadpool
+
+from src.core.database import SessionLocal, create_db_tables
+from src.core.http_client import close_ai_http_client
+from src.core.logger import logger
+from src.services.analysis_job_service import AnalysisJobService
+from src.services.meeting_analysis_service import MeetingAnalysisService
+
+ANALYSIS_WORKER_CONCURRENCY = int(os.getenv("ANALYSIS_WORKER_CONCURRENCY", "2"))
+ANALYSIS_WORKER_POLL_SECONDS = float(os.getenv("ANALYSIS_WORKER_POLL_SECONDS", "2"))
+
+stop_event = threading.Event()
+
+
+async def process_next_job(worker_id: str) -> bool:
+    """Nhận và xử lý một job. Trả về False nếu hàng đợi đang trống."""
+    db = SessionLocal()
+    try:
+        job_service = AnalysisJobService(db)
+        job = await run_in_threadpool(job_service.claim_next, worker_id)
+        if not job:
+            return False
+
+        logger.info(f"🚀 [Worker {worker_id}] Job {job.id}: analyzing Meeting {job.meeting_id} (attempt {job.attempts})")
+        if job.attempts > job.max_attempts:
+            # Job bị thu hồi từ worker đã chết nhưng đã hết lượt thử
+            await run_in_threadpool(job_service.mark_failed, job, RuntimeError("Worker lease expired too many times"))
+            return True
+
+        try:
+            # HTTP Client dùng chung của tiến trình worker (keep-alive tới AI Service)
+            await MeetingAnalysisService(db).analyze(job.meeting_id, token=job_service.job_token(job),
+                                                     skip_review=job.skip_review)
+        except Exception as e:
+            await run_in_threadpool(db.rollback)
+            await run_in_threadpool(job_service.mark_failed, job, e)
+        else:
+            await run_in_threadpool(job_service.mark_completed, job)
+            logger.info(f"✅ [Worker {worker_id}] Job {job.id} completed")
+        return True
+    finally:
+        await run_in_threadpool(db.close)
+
+
+async def worker_loop(worker_id: str):
+    while not stop_event.is_set():
+        try:
+            has_job = await process_next_job(worker_id)
+        except Exception as e:
+            # Lỗi kết nối DB... chờ rồi thử lại, không để vòng lặp worker dừng
+            logger.error(f"❌ [Worker {worker_id}] Error: {e}")
+            has_job = False
+        if not has_job:
+            await asyncio.sleep(ANALYSIS_WORKER_POLL_SECONDS)
+
+
+async def run_workers(concurrency: int):
+    base_id = f"{socket.gethostname()}:{os.getpid()}"
+    workers = [worker_loop(f"{base_id}:{i}") for i in range(max(concurrency, 1))]
+    logger.info(f"✅ Analysis worker started with {len(workers)} slot(s)")
+    try:
+        await asyncio.gather(*workers)
+    finally:
+        await close_ai_http_client()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Meeting analysis worker")
+    parser.add_argument("--concurrency", type=int, default=ANALYSIS_WORKER_CONCURRENCY, help="Number of jobs processed in parallel")
+    args = parser.parse_args()
+
+    create_db_tables()
+
+    def _shutdown(signum, frame):
+        logger.info("🛑 Stopping worker after current jobs finish...")
+        stop_event.set()
+
+    signal.signal(signal.SIGINT, _shutdown)
+    signal.signal(signal.SIGTERM, _shutdown)
+
+    asyncio.run(run_workers(args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
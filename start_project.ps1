@@ -7,6 +7,10 @@ $root = Get-Location
 Write-Host "Starting Main Backend on Port 8000..."
 Start-Process powershell -ArgumentList "-NoExit", "-Command", "cd server; python main.py"
 
+# 1b. Start Meeting Analysis Worker (processes the analysis job queue)
+Write-Host "Starting Meeting Analysis Worker..."
+Start-Process powershell -ArgumentList "-NoExit", "-Command", "cd server; python worker.py"
+
 # 2. Start Meeting AI Agent (Port 8001)
 Write-Host "Starting Meeting Analysis Server on Port 8001..."
 Start-Process powershell -ArgumentList "-NoExit", "-Command", "cd server/AI; python meeting_server.py"